@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized correlation engine against the original pandas implementation.
+
+Run from the backend directory: python -m benchmarks.benchmark_correlation
+"""
+
+import sys
+import time
+import random
+import argparse
+
+import pandas as pd
+
+from src.utils.correlation import CorrelationEngine
+
+FIELDS = ["Data Analysis", "Front-end Development", "Project Management", "Financial Modeling",
+          "Machine Learning", "Cloud Infrastructure", "Technical Writing", "Stakeholder Communication"]
+
+
+def legacy_correlation_matrix(job_fields, candidate_fields):
+    """The pandas implementation generate_correlation_matrix used before the engine."""
+    job_df = pd.DataFrame(job_fields)
+
+    candidate_df = pd.DataFrame([
+        {"field": cf["field"], "score": cf["score"], "evidence": cf.get("evidence", "")}
+        for cf in candidate_fields
+        if any(jf["field"] == cf["field"] for jf in job_fields)
+    ])
+
+    for jf in job_fields:
+        if not any(cf["field"] == jf["field"] for cf in candidate_fields):
+            candidate_df = pd.concat([
+                candidate_df,
+                pd.DataFrame([{
+                    "field": jf["field"],
+                    "score": 0,
+                    "evidence": "No matching evidence found"
+                }])
+            ])
+
+    merged_df = pd.merge(job_df, candidate_df, on='field', suffixes=('_job', '_candidate'))
+    merged_df['weighted_match'] = (merged_df['score_candidate'] / 100) * (merged_df['score_job'] / 100)
+
+    total_importance = sum(item["score"] for item in job_fields)
+    if total_importance > 0:
+        correlation_score = (merged_df['weighted_match'] * merged_df['score_job']).sum() / total_importance * 100
+    else:
+        correlation_score = 0
+
+    visualization_data = merged_df[['field', 'score_job', 'score_candidate', 'weighted_match', 'evidence']].to_dict('records')
+
+    return {
+        'correlation_score': round(correlation_score, 1),
+        'visualization_data': visualization_data
+    }
+
+
+def make_candidates(job_fields, count, rng):
+    candidates = []
+    for _ in range(count):
+        # Candidates usually cover most job fields, sometimes with extras the job doesn't ask for
+        fields = [jf["field"] for jf in job_fields if rng.random() < 0.85]
+        if rng.random() < 0.2:
+            fields.append("Unrelated Skill")
+        candidates.append([
+            {"field": field, "score": rng.randint(0, 100), "evidence": "Listed on resume"}
+            for field in fields
+        ])
+    return candidates
+
+
+def check_equal(expected, actual):
+    assert abs(expected["correlation_score"] - actual["correlation_score"]) < 0.05001, (expected, actual)
+    assert len(expected["visualization_data"]) == len(actual["visualization_data"])
+    for want, got in zip(expected["visualization_data"], actual["visualization_data"]):
+        assert want["field"] == got["field"] and want["evidence"] == got["evidence"], (want, got)
+        for key in ("score_job", "score_candidate", "weighted_match"):
+            assert abs(float(want[key]) - float(got[key])) < 1e-9, (key, want, got)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="1,100,100000", help="Comma-separated candidate counts")
+    parser.add_argument("--legacy-limit", type=int, default=5000,
+                        help="Skip the pandas run above this many candidates (it takes minutes at 100k)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    job_fields = [{"field": field, "score": rng.randint(20, 100)} for field in FIELDS[:6]]
+
+    print(f"{'candidates':>10} {'pandas (s)':>12} {'engine (s)':>12} {'scores only (s)':>16} {'speedup':>8}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        candidates = make_candidates(job_fields, size, rng)
+
+        started = time.perf_counter()
+        engine = CorrelationEngine(job_fields)
+        results = engine.score(candidates)
+        engine_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        CorrelationEngine(job_fields).score(candidates, visualization=False)
+        scores_time = time.perf_counter() - started
+
+        if size <= args.legacy_limit:
+            started = time.perf_counter()
+            expected = [legacy_correlation_matrix(job_fields, candidate) for candidate in candidates]
+            legacy_time = time.perf_counter() - started
+            for want, got in zip(expected, results):
+                check_equal(want, got)
+            print(f"{size:>10} {legacy_time:>12.4f} {engine_time:>12.4f} {scores_time:>16.4f} {legacy_time / engine_time:>7.1f}x")
+        else:
+            print(f"{size:>10} {'skipped':>12} {engine_time:>12.4f} {scores_time:>16.4f} {'-':>8}")
+
+    print("Outputs match the pandas implementation.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
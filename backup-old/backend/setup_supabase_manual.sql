@@ -23,6 +23,12 @@ CREATE TABLE IF NOT EXISTS job_descriptions (
   department TEXT,
   required_skills JSONB,
   soft_skills_priorities JSONB,
+  job_fields JSONB,
+  job_fields_hash TEXT,
+  question_bank JSONB,
+  question_bank_hash TEXT,
+  warmup_status TEXT,
+  warmup_started_at TIMESTAMP WITH TIME ZONE,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
@@ -33,9 +39,15 @@ CREATE TABLE IF NOT EXISTS candidates (
   email TEXT UNIQUE NOT NULL,
   resume_url TEXT,
   resume_parsed JSONB,
+  resume_sha256 TEXT,
+  resume_text_sha256 TEXT,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Content-hash lookups for resume deduplication
+CREATE INDEX IF NOT EXISTS candidates_resume_sha256_idx ON candidates (resume_sha256);
+CREATE INDEX IF NOT EXISTS candidates_resume_text_sha256_idx ON candidates (resume_text_sha256);
+
 -- Interviews Table
 CREATE TABLE IF NOT EXISTS interviews (
   id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -82,6 +94,15 @@ CREATE TABLE IF NOT EXISTS assessments (
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Candidate Scores Table (ranking scores per job, loaded by the ranking service)
+CREATE TABLE IF NOT EXISTS candidate_scores (
+  job_id UUID REFERENCES job_descriptions(id) ON DELETE CASCADE,
+  candidate_id UUID REFERENCES candidates(id) ON DELETE CASCADE,
+  metric TEXT NOT NULL,
+  score REAL NOT NULL,
+  PRIMARY KEY (job_id, candidate_id, metric)
+);
+
 -- Create Policies to allow all operations for now (for development)
 -- These can be restricted later for production
 
@@ -113,6 +134,10 @@ CREATE POLICY "Allow all operations on responses" ON responses FOR ALL USING (tr
 ALTER TABLE assessments ENABLE ROW LEVEL SECURITY;
 CREATE POLICY "Allow all operations on assessments" ON assessments FOR ALL USING (true);
 
+-- Candidate Scores Policies
+ALTER TABLE candidate_scores ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Allow all operations on candidate_scores" ON candidate_scores FOR ALL USING (true);
+
 -- Create Storage Buckets (these need to be created in the Storage section of Supabase dashboard)
 -- 1. Navigate to Storage in the Supabase dashboard
 -- 2. Create a new bucket named "resumes"
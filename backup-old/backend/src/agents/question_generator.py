@@ -1,9 +1,39 @@
 import json
-from typing import List, Dict, Any
+import hashlib
+from typing import List, Dict, Any, Iterator, Optional
 from langchain.prompts import PromptTemplate
 from langchain.chains import LLMChain
 from ..utils.llm import LLMClient
 
+# Returned when generation fails; never stored in a job's question bank
+FALLBACK_QUESTIONS = [
+    {
+        "question": "Can you describe a project you worked on that demonstrates your technical skills relevant to this position?",
+        "type": "technical",
+        "skill_assessed": "technical expertise"
+    },
+    {
+        "question": "Tell me about a time when you had to solve a complex problem. What was your approach?",
+        "type": "behavioral",
+        "skill_assessed": "problem-solving"
+    },
+    {
+        "question": "How do you approach learning new technologies or methodologies?",
+        "type": "behavioral",
+        "skill_assessed": "adaptability"
+    },
+    {
+        "question": "Describe your experience working in a team environment. How do you handle disagreements?",
+        "type": "behavioral",
+        "skill_assessed": "teamwork"
+    },
+    {
+        "question": "What motivates you professionally, and how does this position align with your goals?",
+        "type": "behavioral",
+        "skill_assessed": "motivation"
+    }
+]
+
 class QuestionGeneratorAgent:
     """Agent for generating unbiased interview questions based on job descriptions."""
     
@@ -22,7 +52,7 @@ class QuestionGeneratorAgent:
         Required Skills:
         {required_skills}
         
-        Generate 5 questions that will help evaluate if a candidate is suitable for this position.
+        Generate {question_count} questions that will help evaluate if a candidate is suitable for this position.
         The questions should:
         1. Focus solely on job-relevant skills and experience
         2. Avoid cultural references that may favor certain backgrounds
@@ -45,22 +75,38 @@ class QuestionGeneratorAgent:
         """
         
         prompt = PromptTemplate(
-            input_variables=["job_description", "required_skills"],
+            input_variables=["job_description", "required_skills", "question_count"],
             template=prompt_template
         )
+        self.prompt = prompt
+        self.system_prompt = "You are an unbiased hiring expert creating interview questions."
+        self.model = self.llm_client.get_question_generator_model()
         
         self.generation_chain = LLMChain(
             llm=self.llm_client.get_question_generator_llm(),
             prompt=prompt
         )
     
-    def generate_questions(self, job_description: str, required_skills: List[str] = None) -> List[Dict[str, str]]:
+    def question_bank_hash(self, job_description: str, required_skills: Optional[List[str]] = None) -> str:
+        """
+        Hash the inputs of question generation to tell whether a stored question bank is still current.
+        
+        Whitespace, case and the order of skills are normalised so cosmetic edits don't force a regeneration.
+        """
+        normalized = {
+            "description": " ".join(job_description.split()).lower(),
+            "required_skills": sorted(" ".join(skill.split()).lower() for skill in required_skills or [])
+        }
+        return hashlib.sha256(json.dumps(normalized).encode("utf-8")).hexdigest()
+    
+    def generate_questions(self, job_description: str, required_skills: List[str] = None, count: int = 5) -> List[Dict[str, str]]:
         """
         Generate interview questions based on job description.
         
         Args:
             job_description: Full job description text
             required_skills: List of required skills (optional)
+            count: Number of questions to generate
             
         Returns:
             List of question dictionaries with question text, type, and skill assessed
@@ -71,7 +117,8 @@ class QuestionGeneratorAgent:
         # Run the chain
         response = self.generation_chain.invoke({
             "job_description": job_description,
-            "required_skills": skills_text
+            "required_skills": skills_text,
+            "question_count": count
         })
         
         # Parse the response
@@ -92,31 +139,78 @@ class QuestionGeneratorAgent:
                 questions = json.loads(response)
                 
             # Validate and clean questions
-            return self._validate_questions(questions)
+            return self._validate_questions(questions, count)
         except Exception as e:
             # Fallback for error cases
             return self._fallback_questions(job_description, required_skills, str(e))
     
-    def _validate_questions(self, questions: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    def stream_questions(self, job_description: str, required_skills: List[str] = None, count: int = 5) -> Iterator[Dict[str, str]]:
+        """
+        Generate interview questions, yielding each one as soon as the model finishes it.
+        
+        Args:
+            job_description: Full job description text
+            required_skills: List of required skills (optional)
+            count: Number of questions to generate
+            
+        Yields:
+            Validated question dictionaries; the fallback questions if generation
+            fails before any question is produced
+        """
+        skills_text = ", ".join(required_skills) if required_skills else "Not specified"
+        user_prompt = self.prompt.format(
+            job_description=job_description,
+            required_skills=skills_text,
+            question_count=count
+        )
+        
+        produced = 0
+        try:
+            for element in self.llm_client.stream_structured_prompt(self.system_prompt, user_prompt, self.model):
+                question = self._validate_question(element)
+                if question is None:
+                    continue
+                produced += 1
+                yield question
+                if produced >= count:
+                    return
+        except Exception as e:
+            if produced:
+                # Questions already handed out can't be swapped for the fallback set
+                raise
+            yield from self._fallback_questions(job_description, required_skills, str(e))
+            return
+        
+        if not produced:
+            yield from self._fallback_questions(job_description, required_skills, "No valid questions in response")
+    
+    def _validate_question(self, q: Any) -> Optional[Dict[str, str]]:
+        """Clean one generated question, or return None if it has no text."""
+        if not isinstance(q, dict):
+            return None
+        
+        question = {
+            "question": q.get("question", ""),
+            "type": q.get("type", "behavioral"),
+            "skill_assessed": q.get("skill_assessed", "general aptitude")
+        }
+        
+        # Ensure question text exists and is not empty
+        if not question["question"] or len(question["question"].strip()) == 0:
+            return None
+        
+        # Ensure type is valid
+        if question["type"] not in ["technical", "behavioral"]:
+            question["type"] = "behavioral"
+        return question
+    
+    def _validate_questions(self, questions: List[Dict[str, str]], limit: int = 5) -> List[Dict[str, str]]:
         """Validate and ensure questions meet the format requirements."""
         valid_questions = []
         
         for q in questions:
-            if not isinstance(q, dict):
-                continue
-                
-            question = {
-                "question": q.get("question", ""),
-                "type": q.get("type", "behavioral"),
-                "skill_assessed": q.get("skill_assessed", "general aptitude")
-            }
-            
-            # Ensure question text exists and is not empty
-            if question["question"] and len(question["question"].strip()) > 0:
-                # Ensure type is valid
-                if question["type"] not in ["technical", "behavioral"]:
-                    question["type"] = "behavioral"
-                
+            question = self._validate_question(q)
+            if question is not None:
                 valid_questions.append(question)
         
         # Ensure we have at least one question
@@ -129,37 +223,11 @@ class QuestionGeneratorAgent:
                 }
             ]
         
-        # Limit to 5 questions maximum
-        return valid_questions[:5]
+        # Limit to the requested number of questions
+        return valid_questions[:limit]
     
     def _fallback_questions(self, job_description: str, required_skills: List[str], error: str) -> List[Dict[str, str]]:
         """Generate fallback questions if the main generation fails."""
         print(f"Question generation failed: {error}. Using fallback questions.")
         
-        return [
-            {
-                "question": "Can you describe a project you worked on that demonstrates your technical skills relevant to this position?",
-                "type": "technical",
-                "skill_assessed": "technical expertise"
-            },
-            {
-                "question": "Tell me about a time when you had to solve a complex problem. What was your approach?",
-                "type": "behavioral",
-                "skill_assessed": "problem-solving"
-            },
-            {
-                "question": "How do you approach learning new technologies or methodologies?",
-                "type": "behavioral",
-                "skill_assessed": "adaptability"
-            },
-            {
-                "question": "Describe your experience working in a team environment. How do you handle disagreements?",
-                "type": "behavioral",
-                "skill_assessed": "teamwork"
-            },
-            {
-                "question": "What motivates you professionally, and how does this position align with your goals?",
-                "type": "behavioral",
-                "skill_assessed": "motivation"
-            }
-        ] 
\ No newline at end of file
+        return [dict(question) for question in FALLBACK_QUESTIONS]
@@ -1,6 +1,11 @@
 import os
+import time
 import uuid
-from typing import Dict, Any, List, Set
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Callable, Dict, Any, List, Optional, Set
 from langchain.chat_models import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
 from langgraph.graph import StateGraph
@@ -8,10 +13,29 @@ from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 from ..utils.llm import LLMClient
+from ..utils.llm_scheduler import llm_deadline
 from ..utils.constants import END, START
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# How long each analysis dimension may take before the response is scored without it
+RESPONSE_BRANCH_TIMEOUT_SECONDS = float(os.getenv("RESPONSE_BRANCH_TIMEOUT_SECONDS", "30"))
+# Shared by all analyses; each response runs up to six branches at once
+RESPONSE_BRANCH_WORKERS = int(os.getenv("RESPONSE_BRANCH_WORKERS", "12"))
+
+_branch_executor: Optional[ThreadPoolExecutor] = None
+_branch_executor_lock = threading.Lock()
+
+
+def _get_branch_executor() -> ThreadPoolExecutor:
+    global _branch_executor
+    with _branch_executor_lock:
+        if _branch_executor is None:
+            _branch_executor = ThreadPoolExecutor(max_workers=RESPONSE_BRANCH_WORKERS, thread_name_prefix="analysis-branch")
+        return _branch_executor
+
 class AnalysisState(BaseModel):
     """Represents the state of the response analysis process."""
     
@@ -23,17 +47,19 @@ class AnalysisState(BaseModel):
     transcription: str = Field(description="Transcribed text of the response")
     speech_metadata: Dict[str, Any] = Field(description="Metadata about speech patterns")
     
-    empathy_score: int = Field(default=None, description="Score for empathy (0-20)")
-    collaboration_score: int = Field(default=None, description="Score for collaboration (0-20)")
-    confidence_score: int = Field(default=None, description="Score for confidence (0-20)")
-    english_proficiency: int = Field(default=None, description="Score for English proficiency (0-20)")
-    professionalism: int = Field(default=None, description="Score for professionalism (0-20)")
-    relevance_score: int = Field(default=None, description="Score for answer relevance (0-20)")
+    empathy_score: Optional[int] = Field(default=None, description="Score for empathy (0-20)")
+    collaboration_score: Optional[int] = Field(default=None, description="Score for collaboration (0-20)")
+    confidence_score: Optional[int] = Field(default=None, description="Score for confidence (0-20)")
+    english_proficiency: Optional[int] = Field(default=None, description="Score for English proficiency (0-20)")
+    professionalism: Optional[int] = Field(default=None, description="Score for professionalism (0-20)")
+    relevance_score: Optional[int] = Field(default=None, description="Score for answer relevance (0-20)")
+    
+    technical_accuracy: Optional[int] = Field(default=None, description="Score for technical accuracy (0-20), only for technical questions")
+    completeness: Optional[int] = Field(default=None, description="Score for answer completeness (0-20)")
     
-    technical_accuracy: int = Field(default=None, description="Score for technical accuracy (0-20), only for technical questions")
-    completeness: int = Field(default=None, description="Score for answer completeness (0-20)")
+    branch_timings: Optional[Dict[str, Any]] = Field(default=None, description="Latency and outcome of each analysis branch")
     
-    final_analysis: Dict[str, Any] = Field(default=None, description="Final analysis results")
+    final_analysis: Optional[Dict[str, Any]] = Field(default=None, description="Final analysis results")
 
 class ResponseAnalyzer:
     """Agent responsible for analyzing candidate responses."""
@@ -79,8 +105,9 @@ class ResponseAnalyzer:
             
             # Execute the analysis workflow
             try:
-                result = self.workflow.invoke(initial_state)
-                return result.final_analysis
+                # The graph takes its input as a dict of the fields that are set
+                result = self.workflow.invoke(initial_state.model_dump(exclude_none=True))
+                return result["final_analysis"]
             except Exception as e:
                 print(f"Error in response analysis: {str(e)}")
                 # Fallback to mock analysis in case of error
@@ -97,52 +124,60 @@ class ResponseAnalyzer:
         llm = LLMClient().get_llm("technical_analysis")
         
         # Define analysis nodes
-        def extract_key_points(state: AnalysisState) -> AnalysisState:
+        def extract_key_points(state: AnalysisState) -> Dict[str, Any]:
             """Extract key points from the response"""
             # In a real implementation, this would use an LLM
             # For now, we're simplifying for testing
-            return state
+            return {}
         
-        def analyze_empathy(state: AnalysisState) -> AnalysisState:
+        def analyze_empathy(state: AnalysisState) -> Dict[str, Any]:
             """Analyze empathy in the response"""
             # Simplified for testing
-            state.empathy_score = 15
-            return state
+            return {"empathy_score": 15}
         
-        def analyze_collaboration(state: AnalysisState) -> AnalysisState:
+        def analyze_collaboration(state: AnalysisState) -> Dict[str, Any]:
             """Analyze collaboration skills in the response"""
             # Simplified for testing
-            state.collaboration_score = 16
-            return state
+            return {"collaboration_score": 16}
         
-        def analyze_confidence(state: AnalysisState) -> AnalysisState:
+        def analyze_confidence(state: AnalysisState) -> Dict[str, Any]:
             """Analyze confidence in the response"""
             # Simplified for testing
-            state.confidence_score = 17
-            return state
+            return {"confidence_score": 17}
         
-        def analyze_english_proficiency(state: AnalysisState) -> AnalysisState:
+        def analyze_english_proficiency(state: AnalysisState) -> Dict[str, Any]:
             """Analyze English proficiency in the response"""
             # Simplified for testing
-            state.english_proficiency = 18
-            return state
+            return {"english_proficiency": 18}
         
-        def analyze_professionalism(state: AnalysisState) -> AnalysisState:
+        def analyze_professionalism(state: AnalysisState) -> Dict[str, Any]:
             """Analyze professionalism in the response"""
             # Simplified for testing
-            state.professionalism = 16
-            return state
+            return {"professionalism": 16}
         
-        def analyze_technical_details(state: AnalysisState) -> AnalysisState:
+        def analyze_technical_details(state: AnalysisState) -> Dict[str, Any]:
             """Analyze technical details if applicable"""
             if state.question_type == "technical":
                 # Simplified for testing
-                state.technical_accuracy = 15
-            return state
+                return {"technical_accuracy": 15}
+            return {}
+        
+        branches = {
+            "analyze_empathy": analyze_empathy,
+            "analyze_collaboration": analyze_collaboration,
+            "analyze_confidence": analyze_confidence,
+            "analyze_english_proficiency": analyze_english_proficiency,
+            "analyze_professionalism": analyze_professionalism,
+            "analyze_technical_details": analyze_technical_details,
+        }
         
-        def create_final_analysis(state: AnalysisState) -> AnalysisState:
+        def analyze_dimensions(state: AnalysisState) -> Dict[str, Any]:
+            """Analyze every dimension at once; they only read the response"""
+            return self._run_branches(branches, state)
+        
+        def create_final_analysis(state: AnalysisState) -> Dict[str, Any]:
             """Create the final analysis summary"""
-            state.final_analysis = {
+            final_analysis = {
                 "analysis_id": str(uuid.uuid4()),
                 "empathy_score": state.empathy_score,
                 "collaboration_score": state.collaboration_score,
@@ -158,35 +193,98 @@ class ResponseAnalyzer:
                 "areas_for_improvement": [
                     "Could provide more specific technical details",
                     "Response could be more concise"
-                ]
+                ],
+                "branch_timings": state.branch_timings
             }
-            return state
+            return {"final_analysis": final_analysis}
         
         # Create the workflow
         workflow = StateGraph(AnalysisState)
         
         # Add nodes
         workflow.add_node("extract_key_points", extract_key_points)
-        workflow.add_node("analyze_empathy", analyze_empathy)
-        workflow.add_node("analyze_collaboration", analyze_collaboration)
-        workflow.add_node("analyze_confidence", analyze_confidence)
-        workflow.add_node("analyze_english_proficiency", analyze_english_proficiency)
-        workflow.add_node("analyze_professionalism", analyze_professionalism)
-        workflow.add_node("analyze_technical_details", analyze_technical_details)
+        workflow.add_node("analyze_dimensions", analyze_dimensions)
         workflow.add_node("create_final_analysis", create_final_analysis)
         
         # Define the workflow edges
         workflow.set_entry_point("extract_key_points")
-        workflow.add_edge("extract_key_points", "analyze_empathy")
-        workflow.add_edge("analyze_empathy", "analyze_collaboration")
-        workflow.add_edge("analyze_collaboration", "analyze_confidence")
-        workflow.add_edge("analyze_confidence", "analyze_english_proficiency")
-        workflow.add_edge("analyze_english_proficiency", "analyze_professionalism")
-        workflow.add_edge("analyze_professionalism", "analyze_technical_details")
-        workflow.add_edge("analyze_technical_details", "create_final_analysis")
+        workflow.add_edge("extract_key_points", "analyze_dimensions")
+        workflow.add_edge("analyze_dimensions", "create_final_analysis")
+        workflow.set_finish_point("create_final_analysis")
         
         # Compile the workflow
         return workflow.compile()
+    
+    def _run_branches(self, branches: Dict[str, Callable[[AnalysisState], Dict[str, Any]]],
+                      state: AnalysisState, timeout: float = None) -> Dict[str, Any]:
+        """
+        Run independent analysis branches concurrently and merge their updates.
+        
+        A branch that raises or runs past the timeout contributes no scores
+        (its dimensions stay None) instead of failing the whole analysis.
+        Updates are merged in the order the branches are listed, whatever
+        order they finish in.
+        
+        Worker threads can't be interrupted, so the LLM calls a branch makes
+        run under an llm_deadline ending at the analysis deadline: queueing,
+        retries and the request itself give up then, which frees the branch's
+        worker instead of leaving it busy with an answer nobody will read.
+        Branches still waiting for a worker at the deadline are cancelled.
+        
+        Args:
+            branches: Branch name to function returning a partial state update
+            state: Current analysis state
+            timeout: Seconds the branches may take (default RESPONSE_BRANCH_TIMEOUT_SECONDS)
+            
+        Returns:
+            The merged update, with each branch's status ("ok", "timeout" or
+            "error"), its running time and how long it waited for a worker
+            under branch_timings
+        """
+        timeout = RESPONSE_BRANCH_TIMEOUT_SECONDS if timeout is None else timeout
+        executor = _get_branch_executor()
+        started_at: Dict[str, float] = {}
+        finished_at: Dict[str, float] = {}
+        
+        def run(name: str, analyze: Callable[[AnalysisState], Dict[str, Any]]) -> Dict[str, Any]:
+            started_at[name] = time.perf_counter()
+            try:
+                with llm_deadline(deadline - started_at[name]):
+                    return analyze(state)
+            finally:
+                finished_at[name] = time.perf_counter()
+        
+        submitted = time.perf_counter()
+        deadline = submitted + timeout
+        futures = {
+            name: executor.submit(contextvars.copy_context().run, run, name, analyze)
+            for name, analyze in branches.items()
+        }
+        
+        merged: Dict[str, Any] = {}
+        timings: Dict[str, Any] = {}
+        for name, future in futures.items():
+            try:
+                update = future.result(timeout=max(0.0, deadline - time.perf_counter())) or {}
+                merged.update(update)
+                status = "ok"
+            except TimeoutError:
+                future.cancel()
+                logger.warning("Analysis branch %s timed out after %ss", name, timeout)
+                status = "timeout"
+            except Exception as e:
+                logger.warning("Analysis branch %s failed: %s", name, e)
+                status = "error"
+            began = started_at.get(name)
+            ended = finished_at.get(name, time.perf_counter())
+            timings[name] = {
+                "duration": round(ended - began, 4) if began is not None else 0.0,
+                "queued": round((began if began is not None else ended) - submitted, 4),
+                "status": status
+            }
+        
+        merged["branch_timings"] = timings
+        return merged
         
     def _generate_mock_analysis(self, question_text: str, question_type: str, 
                                skill_assessed: str, response_text: str) -> Dict[str, Any]:
@@ -1,54 +1,72 @@
+import os
 import json
-from typing import Dict, List, Any, Tuple
-from langchain.document_loaders import PyPDFLoader
-from langchain.chains import LLMChain
+import asyncio
+import time
+import hashlib
+from typing import Dict, List, Any, Tuple, Optional, AsyncIterator
 from langchain.prompts import PromptTemplate
-import pandas as pd
 import numpy as np
 
 from ..utils.llm import LLMClient
+from ..utils.stage_dag import StageDAG
+from ..utils.correlation import CorrelationEngine
+from ..utils.pdf_text import extract_pdf_text
+from ..utils.skill_taxonomy import get_skill_taxonomy
+from ..utils.lexical_index import get_resume_index, resume_text as flatten_resume, PREFILTER_MIN_MATCH, PREFILTER_TOP_N
+from ..utils.llm_scheduler import llm_priority, PRIORITY_BULK
+
+# Returned by identify_job_fields when the LLM call fails; never persisted
+FALLBACK_JOB_FIELDS = [
+    {"field": "General Aptitude", "score": 100}
+]
+
+# Prompt budget (~4 characters per token) and size cap for one batched scoring request
+BATCH_SCORE_TOKEN_BUDGET = int(os.getenv("RESUME_BATCH_TOKEN_BUDGET", "6000"))
+BATCH_SCORE_MAX_CANDIDATES = int(os.getenv("RESUME_BATCH_MAX_CANDIDATES", "8"))
 
 class ResumeAnalyzer:
     """Analyzes resumes and creates job correlation matrices."""
     
     def __init__(self):
         self.llm_client = LLMClient()
+        self.skills = get_skill_taxonomy()
+        self.resume_index = get_resume_index()
         self._setup_chains()
     
     def _setup_chains(self):
-        """Setup LangChains for resume analysis."""
-        # Chain for extracting structured data from resume
+        """Setup prompts and models for resume analysis."""
+        self.resume_model = self.llm_client.get_resume_analyzer_model()
+        self.fields_model = self.llm_client.get_default_model()
+        
+        # Prompt for extracting structured data from resume
+        self.extract_system_prompt = "You are a professional resume analyst."
         extract_template = """
-        You are a professional resume analyst. Extract the following information from the resume text:
+        Extract the following information from the resume text:
         
         Resume Content:
         {resume_text}
         
         Extract and return ONLY a JSON object with the following structure:
-        {
+        {{
             "skills": ["skill1", "skill2", ...],
             "experience": [
-                {"title": "Job Title", "company": "Company Name", "duration": "X years", "description": "Brief summary"}
+                {{"title": "Job Title", "company": "Company Name", "duration": "X years", "description": "Brief summary"}}
             ],
             "education": [
-                {"degree": "Degree Name", "institution": "Institution Name", "year": "Year"}
+                {{"degree": "Degree Name", "institution": "Institution Name", "year": "Year"}}
             ]
-        }
+        }}
         """
         
-        extract_prompt = PromptTemplate(
+        self.extract_prompt = PromptTemplate(
             input_variables=["resume_text"],
             template=extract_template
         )
         
-        self.extract_chain = LLMChain(
-            llm=self.llm_client.get_resume_analyzer_llm(),
-            prompt=extract_prompt
-        )
-        
-        # Chain for identifying professional fields from job description
+        # Prompt for identifying professional fields from job description
+        self.fields_system_prompt = "You are an expert job analyzer."
         fields_template = """
-        You are an expert job analyzer. Based on the job description, identify the key professional fields that are relevant to this position.
+        Based on the job description, identify the key professional fields that are relevant to this position.
         
         Job Description:
         {job_description}
@@ -57,7 +75,7 @@ class ResumeAnalyzer:
         
         Return ONLY a JSON array of objects with this structure:
         [
-            {"field": "field_name", "score": importance_score}
+            {{"field": "field_name", "score": importance_score}}
         ]
         
         Focus on specific professional domains and skills rather than general traits.
@@ -65,20 +83,14 @@ class ResumeAnalyzer:
         Identify 5-8 fields that best represent the core requirements of this job.
         """
         
-        fields_prompt = PromptTemplate(
+        self.fields_prompt = PromptTemplate(
             input_variables=["job_description"],
             template=fields_template
         )
         
-        self.fields_chain = LLMChain(
-            llm=self.llm_client.get_llm(),
-            prompt=fields_prompt
-        )
-        
-        # Chain for scoring candidate against professional fields
+        # Prompt for scoring candidate against professional fields
+        self.scoring_system_prompt = "You are an unbiased professional skills assessor."
         scoring_template = """
-        You are an unbiased professional skills assessor.
-        
         Resume Information:
         {resume_info}
         
@@ -90,18 +102,35 @@ class ResumeAnalyzer:
         
         Return ONLY a JSON array of objects with this structure:
         [
-            {"field": "field_name", "score": candidate_score, "evidence": "brief justification"}
+            {{"field": "field_name", "score": candidate_score, "evidence": "brief justification"}}
         ]
         """
         
-        scoring_prompt = PromptTemplate(
+        self.scoring_prompt = PromptTemplate(
             input_variables=["resume_info", "job_fields"],
             template=scoring_template
         )
         
-        self.scoring_chain = LLMChain(
-            llm=self.llm_client.get_resume_analyzer_llm(),
-            prompt=scoring_prompt
+        # Prompt for scoring several candidates against the same fields in one request
+        batch_scoring_template = """
+        Job Fields Required:
+        {job_fields}
+        
+        Candidates:
+        {candidates}
+        
+        For each numbered candidate and each job field listed, assign a score from 0-100 indicating how well that candidate's skills and experience match the field.
+        Score every candidate independently. Base your scoring ONLY on concrete evidence from their own resume, not assumptions about background.
+        
+        Return ONLY a JSON object mapping each candidate number to an array of objects with this structure:
+        {{
+            "0": [{{"field": "field_name", "score": candidate_score, "evidence": "brief justification"}}]
+        }}
+        """
+        
+        self.batch_scoring_prompt = PromptTemplate(
+            input_variables=["job_fields", "candidates"],
+            template=batch_scoring_template
         )
     
     def extract_resume_data(self, resume_text: str) -> Dict[str, Any]:
@@ -114,26 +143,12 @@ class ResumeAnalyzer:
         Returns:
             Dictionary with structured resume data
         """
-        response = self.extract_chain.invoke({"resume_text": resume_text})
-        
-        # Parse the response
         try:
-            if isinstance(response, dict) and "text" in response:
-                # Extract JSON from text
-                text = response["text"]
-                if "```json" in text:
-                    json_text = text.split("```json")[1].split("```")[0].strip()
-                elif "```" in text:
-                    json_text = text.split("```")[1].split("```")[0].strip()
-                else:
-                    json_text = text
-                
-                parsed_data = json.loads(json_text)
-            else:
-                # Directly get structured output if using structured LLM response
-                parsed_data = json.loads(response)
-                
-            return parsed_data
+            return self.llm_client.structured_prompt(
+                self.extract_system_prompt,
+                self.extract_prompt.format(resume_text=resume_text),
+                self.resume_model
+            )
         except Exception as e:
             print(f"Error parsing resume data: {e}")
             # Return minimal structure for fallback
@@ -147,43 +162,59 @@ class ResumeAnalyzer:
         """
         Identify key professional fields from job description.
         
+        Concurrent calls for the same description share one LLM request.
+        
         Args:
             job_description: Full job description text
             
         Returns:
             List of fields with importance scores
         """
-        response = self.fields_chain.invoke({"job_description": job_description})
-        
-        # Parse the response
         try:
-            if isinstance(response, dict) and "text" in response:
-                # Extract JSON from text
-                text = response["text"]
-                if "```json" in text:
-                    json_text = text.split("```json")[1].split("```")[0].strip()
-                elif "```" in text:
-                    json_text = text.split("```")[1].split("```")[0].strip()
-                else:
-                    json_text = text
-                
-                fields = json.loads(json_text)
-            else:
-                # Directly get structured output if using structured LLM response
-                fields = json.loads(response)
-                
-            return fields
+            return self.llm_client.structured_prompt(
+                self.fields_system_prompt,
+                self.fields_prompt.format(job_description=job_description),
+                self.fields_model
+            )
         except Exception as e:
             print(f"Error identifying job fields: {e}")
             # Return minimal fields for fallback
-            return [
-                {"field": "General Aptitude", "score": 100}
-            ]
+            return [dict(field) for field in FALLBACK_JOB_FIELDS]
+    
+    def description_hash(self, job_description: str) -> str:
+        """
+        Hash a job description to tell whether its stored fields are still current.
+        
+        Whitespace and case are normalised so cosmetic edits don't force a recompute.
+        """
+        normalized = " ".join(job_description.split()).lower()
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    
+    def _merge_scores(self,
+                      job_fields: List[Dict[str, Any]],
+                      resolved: Dict[str, Dict[str, Any]],
+                      scores: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Combine locally resolved field scores with LLM scores, in job field order."""
+        if not resolved:
+            return scores
+        by_field = {
+            str(item.get("field", "")).strip().lower(): item
+            for item in scores if isinstance(item, dict)
+        }
+        merged = []
+        for job_field in job_fields:
+            item = resolved.get(job_field["field"]) or by_field.get(job_field["field"].strip().lower())
+            if item is not None:
+                merged.append(item)
+        return merged
     
     def score_candidate(self, resume_data: Dict[str, Any], job_fields: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Score candidate against job fields.
         
+        Fields naming a skill the candidate lists (exactly or by alias) are
+        scored from the skill taxonomy; only the rest go to the LLM.
+        
         Args:
             resume_data: Structured resume data
             job_fields: List of job fields with importance scores
@@ -191,40 +222,174 @@ class ResumeAnalyzer:
         Returns:
             List of fields with candidate scores
         """
+        resolved, pending = self.skills.match_fields(resume_data, job_fields)
+        if not pending:
+            return self._merge_scores(job_fields, resolved, [])
+        
         # Format the resume data for prompting
         resume_info = json.dumps(resume_data, indent=2)
-        job_fields_info = json.dumps(job_fields, indent=2)
-        
-        response = self.scoring_chain.invoke({
-            "resume_info": resume_info,
-            "job_fields": job_fields_info
-        })
+        job_fields_info = json.dumps(pending, indent=2)
         
-        # Parse the response
         try:
-            if isinstance(response, dict) and "text" in response:
-                # Extract JSON from text
-                text = response["text"]
-                if "```json" in text:
-                    json_text = text.split("```json")[1].split("```")[0].strip()
-                elif "```" in text:
-                    json_text = text.split("```")[1].split("```")[0].strip()
-                else:
-                    json_text = text
-                
-                scores = json.loads(json_text)
-            else:
-                # Directly get structured output if using structured LLM response
-                scores = json.loads(response)
-                
-            return scores
+            scores = self.llm_client.structured_prompt(
+                self.scoring_system_prompt,
+                self.scoring_prompt.format(resume_info=resume_info, job_fields=job_fields_info),
+                self.resume_model
+            )
         except Exception as e:
             print(f"Error scoring candidate: {e}")
             # Return minimal scores for fallback
-            return [
+            scores = [
                 {"field": field["field"], "score": 50, "evidence": "Automatic fallback score"} 
-                for field in job_fields
+                for field in pending
             ]
+        return self._merge_scores(job_fields, resolved, scores)
+    
+    async def ascore_candidate(self, resume_data: Dict[str, Any], job_fields: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Async version of score_candidate."""
+        resolved, pending = self.skills.match_fields(resume_data, job_fields)
+        if not pending:
+            return self._merge_scores(job_fields, resolved, [])
+        
+        try:
+            scores = await self.llm_client.astructured_prompt(
+                self.scoring_system_prompt,
+                self.scoring_prompt.format(
+                    resume_info=json.dumps(resume_data, indent=2),
+                    job_fields=json.dumps(pending, indent=2)
+                ),
+                self.resume_model
+            )
+        except Exception as e:
+            print(f"Error scoring candidate: {e}")
+            scores = [
+                {"field": field["field"], "score": 50, "evidence": "Automatic fallback score"} 
+                for field in pending
+            ]
+        return self._merge_scores(job_fields, resolved, scores)
+    
+    def _pack_candidates(self,
+                         candidates: List[Tuple[str, Dict[str, Any]]],
+                         job_fields: List[Dict[str, Any]]) -> List[List[Tuple[str, Dict[str, Any]]]]:
+        """Split candidates into packs that fit BATCH_SCORE_TOKEN_BUDGET and BATCH_SCORE_MAX_CANDIDATES."""
+        budget = BATCH_SCORE_TOKEN_BUDGET * 4 - len(self.batch_scoring_prompt.template) - len(json.dumps(job_fields))
+        packs = []
+        current = []
+        current_size = 0
+        
+        for candidate_id, resume_data in candidates:
+            size = len(json.dumps(resume_data)) + 16
+            if current and (current_size + size > budget or len(current) >= BATCH_SCORE_MAX_CANDIDATES):
+                packs.append(current)
+                current = []
+                current_size = 0
+            current.append((candidate_id, resume_data))
+            current_size += size
+        
+        if current:
+            packs.append(current)
+        return packs
+    
+    def _validate_candidate_scores(self, entry: Any, job_fields: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """Return one score per job field from a batched response entry, or None if any field is missing."""
+        if not isinstance(entry, list):
+            return None
+        by_field = {
+            str(item.get("field", "")).strip().lower(): item
+            for item in entry if isinstance(item, dict)
+        }
+        
+        scores = []
+        for job_field in job_fields:
+            item = by_field.get(job_field["field"].strip().lower())
+            try:
+                score = min(100, max(0, int(round(float(item["score"])))))
+            except (TypeError, ValueError, KeyError):
+                return None
+            scores.append({"field": job_field["field"], "score": score, "evidence": str(item.get("evidence", ""))})
+        return scores
+    
+    async def _ascore_pack(self,
+                           pack: List[Tuple[str, Dict[str, Any]]],
+                           job_fields: List[Dict[str, Any]]) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Score one pack in a single request; candidates the model skips are scored on their own."""
+        # Only fields some candidate in the pack didn't settle locally are sent
+        matches = [self.skills.match_fields(resume_data, job_fields) for _, resume_data in pack]
+        pending_names = {job_field["field"] for _, pending in matches for job_field in pending}
+        pack_fields = [job_field for job_field in job_fields if job_field["field"] in pending_names]
+        
+        # Ranking runs behind interactive interview traffic
+        with llm_priority(PRIORITY_BULK):
+            candidates_info = "\n\n".join(
+                f"Candidate {index}:\n{json.dumps(resume_data, indent=2)}"
+                for index, (_, resume_data) in enumerate(pack)
+            )
+            try:
+                response = await self.llm_client.astructured_prompt(
+                    self.scoring_system_prompt,
+                    self.batch_scoring_prompt.format(
+                        job_fields=json.dumps(pack_fields, indent=2),
+                        candidates=candidates_info
+                    ),
+                    self.resume_model
+                )
+            except Exception as e:
+                print(f"Error batch scoring candidates: {e}")
+                response = {}
+            
+            results = []
+            for index, ((candidate_id, resume_data), (resolved, _)) in enumerate(zip(pack, matches)):
+                entry = response.get(str(index)) if isinstance(response, dict) else None
+                scores = self._validate_candidate_scores(entry, pack_fields)
+                if scores is None:
+                    scores = await self.ascore_candidate(resume_data, job_fields)
+                else:
+                    scores = self._merge_scores(job_fields, resolved, scores)
+                results.append((candidate_id, scores))
+            return results
+    
+    async def ascore_candidates(self,
+                                candidates: List[Tuple[str, Dict[str, Any]]],
+                                job_fields: List[Dict[str, Any]]) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Score many candidates against the same job fields.
+        
+        Candidates whose every field is settled by the skill taxonomy are
+        yielded first without an LLM call. The rest are packed several to a
+        request (see _pack_candidates) and all packs are sent concurrently at
+        bulk priority. Results are yielded as each pack finishes, so callers
+        can stream them.
+        
+        Args:
+            candidates: List of (candidate_id, structured resume data) pairs
+            job_fields: List of job fields with importance scores
+            
+        Yields:
+            (candidate_id, candidate scores) pairs, in completion order
+        """
+        needs_llm = []
+        local = []
+        for candidate_id, resume_data in candidates:
+            resolved, pending = self.skills.match_fields(resume_data, job_fields)
+            if pending:
+                needs_llm.append((candidate_id, resume_data))
+            else:
+                local.append((candidate_id, self._merge_scores(job_fields, resolved, [])))
+        
+        tasks = [
+            asyncio.ensure_future(self._ascore_pack(pack, job_fields))
+            for pack in self._pack_candidates(needs_llm, job_fields)
+        ]
+        try:
+            for result in local:
+                yield result
+            for next_done in asyncio.as_completed(tasks):
+                for result in await next_done:
+                    yield result
+        finally:
+            # The consumer went away (e.g. the client disconnected)
+            for task in tasks:
+                task.cancel()
     
     def generate_correlation_matrix(self, job_fields: List[Dict[str, Any]], candidate_fields: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
@@ -237,48 +402,7 @@ class ResumeAnalyzer:
         Returns:
             Dictionary with correlation score and visualization data
         """
-        # Create dataframes
-        job_df = pd.DataFrame(job_fields)
-        
-        # Ensure candidate fields match job fields exactly
-        candidate_df = pd.DataFrame([
-            {"field": cf["field"], "score": cf["score"], "evidence": cf.get("evidence", "")}
-            for cf in candidate_fields
-            if any(jf["field"] == cf["field"] for jf in job_fields)
-        ])
-        
-        # If any job fields are missing from candidate scores, add with zero score
-        for jf in job_fields:
-            if not any(cf["field"] == jf["field"] for cf in candidate_fields):
-                candidate_df = pd.concat([
-                    candidate_df,
-                    pd.DataFrame([{
-                        "field": jf["field"], 
-                        "score": 0, 
-                        "evidence": "No matching evidence found"
-                    }])
-                ])
-        
-        # Merge dataframes on field name
-        merged_df = pd.merge(job_df, candidate_df, on='field', suffixes=('_job', '_candidate'))
-        
-        # Calculate weighted match score (normalized by dividing by 100)
-        merged_df['weighted_match'] = (merged_df['score_candidate'] / 100) * (merged_df['score_job'] / 100)
-        
-        # Calculate overall correlation score
-        total_importance = sum(item["score"] for item in job_fields)
-        if total_importance > 0:
-            correlation_score = (merged_df['weighted_match'] * merged_df['score_job']).sum() / total_importance * 100
-        else:
-            correlation_score = 0
-            
-        # Create visualization dataset
-        visualization_data = merged_df[['field', 'score_job', 'score_candidate', 'weighted_match', 'evidence']].to_dict('records')
-        
-        return {
-            'correlation_score': round(correlation_score, 1),
-            'visualization_data': visualization_data
-        }
+        return CorrelationEngine(job_fields).score([candidate_fields])[0]
     
     def parse_pdf_resume(self, pdf_path: str) -> str:
         """
@@ -290,42 +414,165 @@ class ResumeAnalyzer:
         Returns:
             Plain text content of the resume
         """
+        return self.extract_pdf_resume(pdf_path)["text"]
+    
+    def extract_pdf_resume(self, pdf_path: str) -> Dict[str, Any]:
+        """
+        Extract a PDF resume's text within the page and character budget.
+        
+        Pages are read lazily and image-only pages are skipped, so parse cost
+        is bounded by RESUME_PDF_MAX_PAGES / RESUME_PDF_MAX_CHARS rather than
+        the size of the upload.
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Returns:
+            Dictionary with text, per-page timing stats and whether the budget truncated it
+        """
         try:
-            loader = PyPDFLoader(pdf_path)
-            pages = loader.load()
-            text = "\n".join(page.page_content for page in pages)
-            return text
+            return extract_pdf_text(pdf_path)
         except Exception as e:
             print(f"Error parsing PDF resume: {e}")
-            return ""
+            return {"text": "", "pages": [], "page_count": 0, "truncated": False, "seconds": 0.0}
     
-    def analyze_resume_for_job(self, resume_text: str, job_description: str) -> Dict[str, Any]:
+    def prefilter(self, resume_text: str, job_description: str, min_match: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Cheap lexical check of a resume against a job before any LLM call.
+        
+        The resume is scored against the job description with the shared BM25
+        index's statistics but isn't added to it; resumes sharing too little of
+        the job's vocabulary fail.
+        
+        Args:
+            resume_text: Plain text content of resume
+            job_description: Job description text
+            min_match: Minimum match ratio to pass (default PREFILTER_MIN_MATCH)
+            
+        Returns:
+            Dictionary with the match ratio, BM25 score and whether the resume passed
+        """
+        min_match = PREFILTER_MIN_MATCH if min_match is None else min_match
+        scores = self.resume_index.score_text(job_description, resume_text)
+        return {
+            "match": round(scores["match"], 3),
+            "bm25": round(scores["bm25"], 3),
+            "min_match": min_match,
+            "passed": scores["match"] >= min_match
+        }
+    
+    def prefilter_candidates(self,
+                             candidates: List[Tuple[str, Dict[str, Any]]],
+                             job_description: str,
+                             top_n: Optional[int] = None,
+                             min_match: Optional[float] = None) -> Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, Dict[str, Any]]]:
+        """
+        Rank a job's applicant pool with BM25 and cut it before LLM scoring.
+        
+        Every candidate's resume is (re)indexed in the shared index first, so
+        new applicants are added and changed resumes replace their old text.
+        
+        Args:
+            candidates: List of (candidate_id, structured resume data) pairs
+            job_description: Job description text
+            top_n: Keep at most this many of the best-ranked candidates (default PREFILTER_TOP_N; 0 keeps all)
+            min_match: Minimum match ratio to keep (default PREFILTER_MIN_MATCH)
+            
+        Returns:
+            (candidates that passed in rank order, prefilter details for every candidate by ID)
+        """
+        top_n = PREFILTER_TOP_N if top_n is None else top_n
+        min_match = PREFILTER_MIN_MATCH if min_match is None else min_match
+        for candidate_id, resume_data in candidates:
+            self.resume_index.add(candidate_id, flatten_resume(resume_data))
+        
+        scores = self.resume_index.score(job_description, [candidate_id for candidate_id, _ in candidates])
+        ranked = sorted(candidates, key=lambda candidate: -scores[candidate[0]])
+        
+        passed = []
+        details = {}
+        for rank, (candidate_id, resume_data) in enumerate(ranked, start=1):
+            match = self.resume_index.match_ratio(job_description, candidate_id)
+            keep = match >= min_match and (top_n <= 0 or len(passed) < top_n)
+            details[candidate_id] = {
+                "rank": rank,
+                "match": round(match, 3),
+                "bm25": round(scores[candidate_id], 3),
+                "min_match": min_match,
+                "passed": keep
+            }
+            if keep:
+                passed.append((candidate_id, resume_data))
+        return passed, details
+    
+    def analyze_resume_for_job(self, resume_text: str, job_description: str,
+                               job_fields: Optional[List[Dict[str, Any]]] = None,
+                               min_match: Optional[float] = None) -> Dict[str, Any]:
         """
         Complete workflow to analyze a resume for a job.
         
+        A lexical pre-filter runs first when min_match (or PREFILTER_MIN_MATCH)
+        is set; resumes that clearly don't fit the job are returned with
+        "filtered": True, a zero score and no LLM calls. Otherwise resume
+        extraction and job field identification, which don't depend on each
+        other, run concurrently and scoring starts once both are done.
+        
         Args:
             resume_text: Plain text content of resume
             job_description: Job description text
+            job_fields: The job's stored fields, if known; skips identifying them again
+            min_match: Pre-filter threshold (default PREFILTER_MIN_MATCH; 0 disables)
             
         Returns:
-            Dictionary with analysis results
+            Dictionary with analysis results, pre-filter result and per-stage timings
         """
+        started = time.perf_counter()
+        prefilter = self.prefilter(resume_text, job_description, min_match)
+        prefilter_seconds = round(time.perf_counter() - started, 4)
+        prefilter_timing = {"prefilter": {"start": 0.0, "duration": prefilter_seconds}}
+        if not prefilter["passed"]:
+            return {
+                "resume_data": None,
+                "job_fields": job_fields,
+                "candidate_scores": [],
+                "correlation": {"correlation_score": 0.0, "visualization_data": []},
+                "filtered": True,
+                "prefilter": prefilter,
+                "timings": {"stages": prefilter_timing, "total": prefilter_seconds}
+            }
+        
+        dag = StageDAG()
+        
         # Extract structured data from resume
-        resume_data = self.extract_resume_data(resume_text)
+        dag.add("resume_data", lambda: self.extract_resume_data(resume_text))
         
-        # Identify job fields from description
-        job_fields = self.identify_job_fields(job_description)
+        # Identify job fields from description, unless the job already has them
+        if job_fields is not None:
+            dag.add("job_fields", lambda: job_fields)
+        else:
+            dag.add("job_fields", lambda: self.identify_job_fields(job_description))
         
         # Score candidate against fields
-        candidate_scores = self.score_candidate(resume_data, job_fields)
+        dag.add("candidate_scores", self.score_candidate, depends_on=["resume_data", "job_fields"])
         
         # Generate correlation matrix
-        correlation = self.generate_correlation_matrix(job_fields, candidate_scores)
+        dag.add("correlation", self.generate_correlation_matrix, depends_on=["job_fields", "candidate_scores"])
+        
+        results, timings = dag.run()
+        
+        # Report stage offsets from the start of the pre-filter
+        stages = dict(prefilter_timing)
+        for name, timing in timings["stages"].items():
+            stages[name] = {"start": round(timing["start"] + prefilter_seconds, 4), "duration": timing["duration"]}
+        timings = {"stages": stages, "total": round(timings["total"] + prefilter_seconds, 4)}
         
         # Combine results
         return {
-            "resume_data": resume_data,
-            "job_fields": job_fields,
-            "candidate_scores": candidate_scores,
-            "correlation": correlation
-        } 
\ No newline at end of file
+            "resume_data": results["resume_data"],
+            "job_fields": results["job_fields"],
+            "candidate_scores": results["candidate_scores"],
+            "correlation": results["correlation"],
+            "filtered": False,
+            "prefilter": prefilter,
+            "timings": timings
+        }
\ No newline at end of file
@@ -1,8 +1,12 @@
+import io
 import os
 import json
+import asyncio
+import zipfile
 from typing import List, Dict, Any, Optional
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, Body
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import uuid
 import datetime
@@ -11,6 +15,11 @@ import datetime
 from ..services.interview_manager import InterviewManager
 from ..utils.database import SupabaseClient
 from ..utils.llm import LLMClient
+from ..utils.llm_scheduler import llm_priority, PRIORITY_INTERACTIVE
+from ..utils.resume_dedup import dedup_stats
+from ..utils.lexical_index import get_resume_index
+from ..services.ranking_service import get_ranking_service, METRICS
+from ..services import bulk_ingest, job_warmup
 
 # Initialize FastAPI app
 app = FastAPI(title="Unbiased Interview System API")
@@ -43,6 +52,19 @@ class CreateJobRequest(BaseModel):
     required_skills: Optional[List[str]] = None
     soft_skills_priorities: Optional[Dict[str, int]] = None
 
+class UpdateJobRequest(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    department: Optional[str] = None
+    required_skills: Optional[List[str]] = None
+    soft_skills_priorities: Optional[Dict[str, int]] = None
+
+class ScoreCandidatesRequest(BaseModel):
+    candidate_ids: List[str] = []
+    resumes: Dict[str, Dict[str, Any]] = {}
+    top_n: Optional[int] = None
+    min_match: Optional[float] = None
+
 class CreateCandidateRequest(BaseModel):
     name: str
     email: str
@@ -74,6 +96,13 @@ def health_check():
             "version": "0.1.0",
             "database": "connected" if not db.use_mock else "mock",
             "llm": "connected" if not llm.use_mock else "mock",
+            "llm_pool": llm.pool_stats(),
+            "llm_cache": llm.cache_stats(),
+            "llm_coalescing": llm.coalescing_stats(),
+            "llm_latency": llm.latency_stats(),
+            "llm_scheduler": llm.scheduler_stats(),
+            "resume_dedup": dedup_stats(),
+            "resume_index": get_resume_index().stats(),
             "timestamp": datetime.datetime.now().isoformat()
         }
     except Exception as e:
@@ -112,7 +141,8 @@ def get_company(
 @app.post("/jobs", status_code=201)
 def create_job(
     request: CreateJobRequest,
-    db: SupabaseClient = Depends(get_db)
+    db: SupabaseClient = Depends(get_db),
+    interview_manager: InterviewManager = Depends(get_interview_manager)
 ):
     """Create a new job description."""
     try:
@@ -124,7 +154,35 @@ def create_job(
             request.required_skills,
             request.soft_skills_priorities
         )
-        return job
+        # Field model and question bank are generated in the background
+        return job_warmup.start_warmup(interview_manager, job)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.put("/jobs/{job_id}")
+def update_job(
+    job_id: str,
+    request: UpdateJobRequest,
+    db: SupabaseClient = Depends(get_db),
+    interview_manager: InterviewManager = Depends(get_interview_manager)
+):
+    """Update a job description."""
+    try:
+        db.get_job_description(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    try:
+        job = db.update_job_description(
+            job_id,
+            request.title,
+            request.description,
+            request.department,
+            request.required_skills,
+            request.soft_skills_priorities
+        )
+        # Field model and question bank are regenerated only if their inputs changed
+        return job_warmup.start_warmup(interview_manager, job)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -140,6 +198,80 @@ def get_job(
     except Exception as e:
         raise HTTPException(status_code=404, detail="Job not found")
 
+@app.get("/jobs/{job_id}/questions")
+def get_job_questions(
+    job_id: str,
+    db: SupabaseClient = Depends(get_db),
+    interview_manager: InterviewManager = Depends(get_interview_manager)
+):
+    """Get the question bank interviews for a job draw from."""
+    try:
+        job = db.get_job_description(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    try:
+        return {"job_id": job_id, "questions": interview_manager.get_question_bank(job)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/jobs/{job_id}/questions/refresh")
+def refresh_job_questions(
+    job_id: str,
+    db: SupabaseClient = Depends(get_db),
+    interview_manager: InterviewManager = Depends(get_interview_manager)
+):
+    """Regenerate a job's question bank; later interviews use the new questions."""
+    try:
+        job = db.get_job_description(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    try:
+        return {"job_id": job_id, "questions": interview_manager.get_question_bank(job, refresh=True)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/jobs/{job_id}/ranking")
+def get_job_ranking(
+    job_id: str,
+    metric: str = "correlation",
+    limit: int = 20,
+    offset: int = 0,
+    db: SupabaseClient = Depends(get_db)
+):
+    """Get the top candidates for a job, ranked by correlation or assessment score."""
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"metric must be one of: {', '.join(METRICS)}")
+    if limit < 1 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit must be positive and offset non-negative")
+    try:
+        db.get_job_description(job_id)
+    except Exception as e:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return get_ranking_service(db).get_ranking(job_id, metric, limit, offset)
+
+@app.post("/jobs/{job_id}/candidates/score")
+async def score_candidates(
+    job_id: str,
+    request: ScoreCandidatesRequest,
+    interview_manager: InterviewManager = Depends(get_interview_manager)
+):
+    """Score many candidates against a job, streaming one JSON line per candidate."""
+    if not request.candidate_ids and not request.resumes:
+        raise HTTPException(status_code=400, detail="Provide candidate_ids or resumes")
+    
+    async def results():
+        try:
+            async for result in interview_manager.score_candidates_for_job(
+                job_id, request.candidate_ids, request.resumes, request.top_n, request.min_match
+            ):
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+    
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
 # Candidate endpoints
 @app.post("/candidates", status_code=201)
 def create_candidate(
@@ -183,6 +315,36 @@ async def upload_resume(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/candidates/bulk", status_code=202)
+async def bulk_ingest_resumes(
+    archive: UploadFile = File(...)
+):
+    """Start ingesting a ZIP of PDF resumes; poll the returned ingest_id for progress."""
+    contents = await archive.read()
+    if not zipfile.is_zipfile(io.BytesIO(contents)):
+        raise HTTPException(status_code=400, detail="Upload must be a ZIP archive of PDF resumes")
+    try:
+        ingest_id = bulk_ingest.save_archive(contents)
+        return bulk_ingest.start_ingestion(ingest_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/candidates/bulk/{ingest_id}")
+def get_bulk_ingestion(ingest_id: str):
+    """Get the progress of a bulk ingestion."""
+    progress = bulk_ingest.get_ingestion(ingest_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Ingestion not found")
+    return progress
+
+@app.post("/candidates/bulk/{ingest_id}/resume", status_code=202)
+def resume_bulk_ingestion(ingest_id: str):
+    """Resume a failed or interrupted bulk ingestion from its checkpoint."""
+    try:
+        return bulk_ingest.start_ingestion(ingest_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
 # Interview endpoints
 @app.post("/interviews", status_code=201)
 def create_interview(
@@ -191,7 +353,9 @@ def create_interview(
 ):
     """Create a new interview with questions."""
     try:
-        result = interview_manager.create_interview(request.job_id, request.candidate_id)
+        # A candidate is waiting on this request, so it goes ahead of bulk LLM work
+        with llm_priority(PRIORITY_INTERACTIVE):
+            result = interview_manager.create_interview(request.job_id, request.candidate_id)
         return result
     except Exception as e:
         import traceback
@@ -222,6 +386,38 @@ def create_interview(
             "questions": mock_questions
         }
 
+@app.post("/interviews/stream")
+async def stream_interview(
+    request: CreateInterviewRequest,
+    interview_manager: InterviewManager = Depends(get_interview_manager)
+):
+    """Create an interview, streaming the record and then each question as server-sent events."""
+    async def events():
+        stream = interview_manager.stream_interview(request.job_id, request.candidate_id)
+        try:
+            with llm_priority(PRIORITY_INTERACTIVE):
+                while True:
+                    # The generator blocks on the database and the LLM, so advance it off the event loop
+                    event = await asyncio.to_thread(next, stream, None)
+                    if event is None:
+                        break
+                    yield f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+        except Exception as e:
+            print(f"Error streaming interview: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+        finally:
+            try:
+                stream.close()
+            except ValueError:
+                # Client went away while a worker thread was still advancing the generator
+                pass
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/interviews/{interview_id}")
 def get_interview(
     interview_id: str,
@@ -255,7 +451,8 @@ async def submit_response(
     """Submit an audio response to a question."""
     try:
         contents = await audio.read()
-        result = interview_manager.process_response(question_id, contents)
+        with llm_priority(PRIORITY_INTERACTIVE):
+            result = interview_manager.process_response(question_id, contents)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -267,7 +464,8 @@ def complete_interview(
 ):
     """Complete an interview and generate assessment."""
     try:
-        result = interview_manager.complete_interview(interview_id)
+        with llm_priority(PRIORITY_INTERACTIVE):
+            result = interview_manager.complete_interview(interview_id)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
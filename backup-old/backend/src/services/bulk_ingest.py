@@ -0,0 +1,400 @@
+"""
+Bulk resume ingestion from a ZIP archive or a directory of PDFs.
+
+PDF text is extracted in a process pool, structured data is extracted with
+the LLM at bulk priority, and each batch of candidates is uploaded to
+storage concurrently and written to the database in one insert. Resumes
+already processed (same file or same text) reuse the stored upload and
+extraction instead of repeating them. Finished
+files are recorded in a checkpoint file after every batch, so an
+interrupted run picks up where it stopped.
+
+Usage:
+    python -m src.services.bulk_ingest resumes.zip --checkpoint campaign.checkpoint.json
+"""
+
+import io
+import os
+import re
+import csv
+import json
+import time
+import uuid
+import zipfile
+import tempfile
+import argparse
+import threading
+import contextvars
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..utils.database import SupabaseClient
+from ..utils.pdf_text import extract_pdf_text
+from ..utils.resume_dedup import ResumeDedupIndex, file_hash, text_hash, has_resume_content
+from ..utils.lexical_index import resume_text as flatten_resume
+from ..utils.llm_scheduler import llm_priority, PRIORITY_BULK
+from ..agents.resume_analyzer import ResumeAnalyzer
+
+BULK_INGEST_WORKERS = int(os.getenv("BULK_INGEST_WORKERS", str(os.cpu_count() or 2)))
+BULK_INGEST_BATCH_SIZE = int(os.getenv("BULK_INGEST_BATCH_SIZE", "50"))
+BULK_INGEST_LLM_CONCURRENCY = int(os.getenv("BULK_INGEST_LLM_CONCURRENCY", "8"))
+
+# Optional CSV at the archive/directory root with columns: file, name, email
+MANIFEST_NAME = "manifest.csv"
+
+EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+
+
+def _parse_pdf(data: bytes) -> Dict[str, Any]:
+    """Process-pool worker: extract text from one PDF."""
+    try:
+        return extract_pdf_text(io.BytesIO(data))
+    except Exception as e:
+        return {"error": f"Could not read PDF: {e}"}
+
+
+class ResumeSource:
+    """PDF files in a ZIP archive or directory, in a stable order."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.is_zip = zipfile.is_zipfile(path) if os.path.isfile(path) else False
+        if not self.is_zip and not os.path.isdir(path):
+            raise ValueError(f"Not a ZIP archive or directory: {path}")
+
+        if self.is_zip:
+            with zipfile.ZipFile(path) as archive:
+                names = archive.namelist()
+        else:
+            names = [
+                os.path.relpath(os.path.join(root, name), path)
+                for root, _, files in os.walk(path)
+                for name in files
+            ]
+        self.files = sorted(name for name in names if name.lower().endswith(".pdf") and not name.endswith("/"))
+        self.manifest = self._load_manifest(names)
+
+    def _load_manifest(self, names: List[str]) -> Dict[str, Dict[str, str]]:
+        if MANIFEST_NAME not in names:
+            return {}
+        rows = csv.DictReader(io.StringIO(self.read(MANIFEST_NAME).decode("utf-8-sig")))
+        return {row["file"]: row for row in rows if row.get("file")}
+
+    def read(self, name: str) -> bytes:
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as archive:
+                return archive.read(name)
+        with open(os.path.join(self.path, name), "rb") as f:
+            return f.read()
+
+    def read_many(self, names: List[str]) -> Iterator[Tuple[str, bytes]]:
+        if self.is_zip:
+            with zipfile.ZipFile(self.path) as archive:
+                for name in names:
+                    yield name, archive.read(name)
+        else:
+            for name in names:
+                yield name, self.read(name)
+
+
+class Checkpoint:
+    """Files already ingested (name -> candidate id), saved atomically after each batch."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.done = json.load(f).get("done", {})
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"done": self.done}, f)
+        os.replace(temp_path, self.path)
+
+
+class BulkIngestor:
+    """Runs one bulk ingestion and tracks its progress."""
+
+    def __init__(self,
+                 source_path: str,
+                 checkpoint_path: Optional[str] = None,
+                 workers: int = BULK_INGEST_WORKERS,
+                 batch_size: int = BULK_INGEST_BATCH_SIZE,
+                 db: Optional[SupabaseClient] = None,
+                 resume_analyzer: Optional[ResumeAnalyzer] = None):
+        self.source = ResumeSource(source_path)
+        self.checkpoint = Checkpoint(checkpoint_path or f"{source_path.rstrip(os.sep)}.checkpoint.json")
+        self.workers = workers
+        self.batch_size = batch_size
+        self.db = db or SupabaseClient()
+        self.resume_analyzer = resume_analyzer or ResumeAnalyzer()
+        self.dedup = ResumeDedupIndex(self.db)
+        self._lock = threading.Lock()
+        self.progress = {
+            "status": "pending",
+            "total": len(self.source.files),
+            "resumed": 0,
+            "parsed": 0,
+            "ingested": 0,
+            "deduplicated": 0,
+            "failed": 0,
+            "errors": [],
+            "elapsed": 0.0
+        }
+
+    def _update(self, **changes):
+        with self._lock:
+            for key, value in changes.items():
+                if key == "errors":
+                    # Keep the report small on campaigns where many files fail
+                    self.progress["errors"] = (self.progress["errors"] + value)[-100:]
+                    self.progress["failed"] += len(value)
+                elif isinstance(value, int) and key != "total":
+                    self.progress[key] += value
+                else:
+                    self.progress[key] = value
+
+    def get_progress(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.progress, errors=list(self.progress["errors"]))
+
+    def _candidate_identity(self, name: str, text: str) -> Tuple[str, Optional[str]]:
+        row = self.source.manifest.get(name, {})
+        display_name = row.get("name") or re.sub(r"[_\-]+", " ", os.path.splitext(os.path.basename(name))[0]).strip().title()
+        email = row.get("email")
+        if not email:
+            match = EMAIL_PATTERN.search(text)
+            email = match.group(0).lower() if match else None
+        return display_name, email
+
+    def _extract(self, text: str) -> Dict[str, Any]:
+        with llm_priority(PRIORITY_BULK):
+            return self.resume_analyzer.extract_resume_data(text)
+
+    def _lookup(self, row: Dict[str, Any]) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Find an already processed resume with the same file or text."""
+        existing = self.dedup.find_by_file(row["resume_sha256"])
+        if existing and existing.get("resume_url"):
+            return "file", existing
+        existing = self.dedup.find_by_text(row["resume_text_sha256"])
+        if existing:
+            return "text", existing
+        return "miss", None
+
+    def _ingest_batch(self, names: List[str], pool: ProcessPoolExecutor, threads: ThreadPoolExecutor):
+        files = dict(self.source.read_many(names))
+        parsed = dict(zip(names, pool.map(_parse_pdf, [files[name] for name in names])))
+        self._update(parsed=len(names))
+
+        errors = []
+        rows = []
+        seen_emails = set()
+        for name in names:
+            if "error" in parsed[name]:
+                errors.append({"file": name, "error": parsed[name]["error"]})
+                continue
+            text = parsed[name]["text"]
+            display_name, email = self._candidate_identity(name, text)
+            if not text.strip():
+                errors.append({"file": name, "error": "No extractable text"})
+            elif not email:
+                errors.append({"file": name, "error": "No email address found; add it to manifest.csv"})
+            elif email in seen_emails:
+                errors.append({"file": name, "error": f"Duplicate email in batch: {email}"})
+            else:
+                seen_emails.add(email)
+                rows.append({
+                    "id": str(uuid.uuid4()),
+                    "name": display_name,
+                    "email": email,
+                    "resume_sha256": file_hash(files[name]),
+                    "resume_text_sha256": text_hash(text),
+                    "_file": name,
+                    "_text": text
+                })
+
+        # LLM extraction and storage uploads for the whole batch run concurrently
+        def submit(fn, *args):
+            return threads.submit(contextvars.copy_context().run, fn, *args)
+
+        def resolve(value):
+            return value.result() if isinstance(value, Future) else value
+
+        # Known files and text skip extraction; repeats within the batch share the
+        # first copy's extraction. Every candidate gets its own stored copy of the file
+        lookups = [submit(self._lookup, row) for row in rows]
+        extractions_by_text: Dict[str, Future] = {}
+        pending = []
+        deduplicated = 0
+        for row, lookup in zip(rows, lookups):
+            try:
+                outcome, existing = lookup.result()
+            except Exception:
+                outcome, existing = "miss", None
+            upload = submit(self.db.upload_resume, row["id"], files[row["_file"]], os.path.basename(row["_file"]))
+            if existing:
+                extraction = existing["resume_parsed"]
+            elif row["resume_text_sha256"] in extractions_by_text:
+                outcome = "text"
+                extraction = extractions_by_text[row["resume_text_sha256"]]
+            else:
+                extraction = submit(self._extract, row["_text"])
+                extractions_by_text[row["resume_text_sha256"]] = extraction
+            self.dedup.record(outcome)
+            deduplicated += outcome != "miss"
+            pending.append((row, upload, extraction))
+
+        ready = []
+        for row, upload, extraction in pending:
+            try:
+                resume_parsed = resolve(extraction)
+                # A failed extraction is stored without hashes so it is never reused
+                usable = has_resume_content(resume_parsed)
+                ready.append({
+                    "id": row["id"],
+                    "name": row["name"],
+                    "email": row["email"],
+                    "resume_url": resolve(upload),
+                    "resume_parsed": resume_parsed,
+                    "resume_sha256": row["resume_sha256"] if usable else None,
+                    "resume_text_sha256": row["resume_text_sha256"] if usable else None,
+                    "_file": row["_file"]
+                })
+            except Exception as e:
+                errors.append({"file": row["_file"], "error": str(e)})
+
+        created = self._write_candidates(ready, errors)
+        for row in created:
+            self.checkpoint.done[row["_file"]] = row["id"]
+            self.resume_analyzer.resume_index.add(row["id"], flatten_resume(row["resume_parsed"]))
+        self.checkpoint.save()
+        self._update(ingested=len(created), deduplicated=deduplicated, errors=errors)
+
+    def _write_candidates(self, rows: List[Dict[str, Any]], errors: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Insert the batch in one write; if that fails, insert one by one to isolate bad rows."""
+        if not rows:
+            return []
+        records = [{k: v for k, v in row.items() if not k.startswith("_")} for row in rows]
+        try:
+            self.db.create_candidates(records)
+            return rows
+        except Exception:
+            created = []
+            for row, record in zip(rows, records):
+                try:
+                    self.db.create_candidates([record])
+                    created.append(row)
+                except Exception as e:
+                    errors.append({"file": row["_file"], "error": str(e)})
+            return created
+
+    def run(self, on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Ingest every file not already in the checkpoint.
+
+        Args:
+            on_progress: Called with a progress snapshot after each batch
+
+        Returns:
+            Final progress report
+        """
+        started = time.perf_counter()
+        pending = [name for name in self.source.files if name not in self.checkpoint.done]
+        self._update(status="running", resumed=len(self.source.files) - len(pending))
+
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool, \
+                    ThreadPoolExecutor(max_workers=BULK_INGEST_LLM_CONCURRENCY, thread_name_prefix="ingest") as threads:
+                for start in range(0, len(pending), self.batch_size):
+                    self._ingest_batch(pending[start:start + self.batch_size], pool, threads)
+                    self._update(elapsed=round(time.perf_counter() - started, 2))
+                    if on_progress:
+                        on_progress(self.get_progress())
+        except Exception as e:
+            self._update(status="failed", errors=[{"file": None, "error": str(e)}],
+                         elapsed=round(time.perf_counter() - started, 2))
+            raise
+
+        self._update(status="completed", elapsed=round(time.perf_counter() - started, 2))
+        return self.get_progress()
+
+
+# Ingestions started through the API, by id
+_ingestions: Dict[str, BulkIngestor] = {}
+_ingestions_lock = threading.Lock()
+
+# Uploaded archives and their checkpoints are kept here so failed runs can be resumed
+INGEST_DIR = os.getenv("BULK_INGEST_DIR", os.path.join(tempfile.gettempdir(), "giselle_ingest"))
+
+
+def save_archive(data: bytes) -> str:
+    """Store an uploaded ZIP and return its ingestion id."""
+    os.makedirs(INGEST_DIR, exist_ok=True)
+    ingest_id = str(uuid.uuid4())
+    with open(os.path.join(INGEST_DIR, f"{ingest_id}.zip"), "wb") as f:
+        f.write(data)
+    return ingest_id
+
+
+def start_ingestion(ingest_id: str) -> Dict[str, Any]:
+    """
+    Run (or resume) the ingestion of a stored archive on a background thread.
+
+    Raises:
+        ValueError: If the archive is unknown or the ingestion is already running
+    """
+    archive_path = os.path.join(INGEST_DIR, f"{ingest_id}.zip")
+    if not os.path.exists(archive_path):
+        raise ValueError(f"Unknown ingestion: {ingest_id}")
+
+    with _ingestions_lock:
+        current = _ingestions.get(ingest_id)
+        if current is not None and current.get_progress()["status"] == "running":
+            raise ValueError(f"Ingestion {ingest_id} is already running")
+        ingestor = BulkIngestor(archive_path)
+        _ingestions[ingest_id] = ingestor
+
+    def run():
+        try:
+            ingestor.run()
+        except Exception as e:
+            print(f"Bulk ingestion {ingest_id} failed: {e}")
+
+    threading.Thread(target=run, name=f"ingest-{ingest_id}", daemon=True).start()
+    return get_ingestion(ingest_id)
+
+
+def get_ingestion(ingest_id: str) -> Optional[Dict[str, Any]]:
+    """Progress of an ingestion started in this process, or None."""
+    with _ingestions_lock:
+        ingestor = _ingestions.get(ingest_id)
+    if ingestor is None:
+        return None
+    return {"ingest_id": ingest_id, **ingestor.get_progress()}
+
+
+def _print_progress(progress: Dict[str, Any]):
+    done = progress["resumed"] + progress["ingested"] + progress["failed"]
+    print(f"[{done}/{progress['total']}] ingested {progress['ingested']}, failed {progress['failed']}, "
+          f"resumed {progress['resumed']} ({progress['elapsed']}s)", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-ingest resumes from a ZIP archive or directory.")
+    parser.add_argument("source", help="ZIP archive or directory of PDF resumes")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <source>.checkpoint.json)")
+    parser.add_argument("--workers", type=int, default=BULK_INGEST_WORKERS, help="PDF parsing processes")
+    parser.add_argument("--batch-size", type=int, default=BULK_INGEST_BATCH_SIZE, help="Files per upload/DB batch")
+    args = parser.parse_args()
+
+    ingestor = BulkIngestor(args.source, args.checkpoint, args.workers, args.batch_size)
+    report = ingestor.run(on_progress=_print_progress)
+    for error in report["errors"]:
+        print(f"  {error['file']}: {error['error']}")
+    print(f"Done: {report['ingested']} ingested, {report['failed']} failed, {report['resumed']} already done")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,36 @@
 import os
+import json
 import uuid
+import random
+import asyncio
+import queue
 import tempfile
-from typing import Dict, List, Any, BinaryIO
+import threading
+import weakref
+import contextvars
+from typing import Dict, List, Any, BinaryIO, Callable, Iterator, Optional, AsyncIterator, Union
 
 from ..utils.database import SupabaseClient
-from ..agents.question_generator import QuestionGeneratorAgent
+from ..utils.resume_dedup import ResumeDedupIndex, file_hash, text_hash, has_resume_content
+from ..utils.lexical_index import resume_text as flatten_resume
+from ..utils.minhash_lsh import get_job_index
+from ..agents.question_generator import QuestionGeneratorAgent, FALLBACK_QUESTIONS
 from ..agents.response_analyzer import ResponseAnalyzer
-from ..agents.resume_analyzer import ResumeAnalyzer
+from ..agents.resume_analyzer import ResumeAnalyzer, FALLBACK_JOB_FIELDS
 from ..services.speech_processor import ElevenLabsSpeechProcessor
+from ..services.ranking_service import get_ranking_service, METRIC_CORRELATION, METRIC_ASSESSMENT
+from ..services.job_warmup import wait_for_warmup
+from ..utils.constants import STATUS_FAILED
+
+# Questions generated once per job, and how many of them each interview asks.
+# With a larger bank, each interview gets a sample with the bank's technical/behavioral mix.
+QUESTION_BANK_SIZE = int(os.getenv("QUESTION_BANK_SIZE", "5"))
+QUESTIONS_PER_INTERVIEW = int(os.getenv("QUESTIONS_PER_INTERVIEW", "5"))
+
+# One question bank generation per job at a time, across request-scoped managers.
+# A job's lock lives only while some request holds or waits for it.
+_question_bank_locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+_question_bank_locks_guard = threading.Lock()
 
 class InterviewManager:
     """Service that coordinates the entire interview process."""
@@ -18,6 +41,11 @@ class InterviewManager:
         self.response_analyzer = ResponseAnalyzer()
         self.resume_analyzer = ResumeAnalyzer()
         self.speech_processor = ElevenLabsSpeechProcessor()
+        self.ranking = get_ranking_service(self.db)
+        self.dedup = ResumeDedupIndex(self.db)
+        self.job_index = get_job_index(
+            lambda: ((job["id"], self._job_text(job)) for job in self.db.list_job_descriptions())
+        )
     
     def create_interview(self, job_id: str, candidate_id: str) -> Dict[str, Any]:
         """
@@ -35,20 +63,13 @@ class InterviewManager:
             interview = self.db.create_interview(job_id, candidate_id)
             interview_id = interview["id"]
             
-            # Get job description to generate questions
+            # Get job description to draw questions, once any warm-up has stored them
+            wait_for_warmup(self.db, job_id)
             job = self.db.get_job_description(job_id)
-            job_description = job["description"]
-            required_skills = job.get("required_skills")
-            
-            if required_skills and isinstance(required_skills, str):
-                try:
-                    required_skills = list(eval(required_skills))
-                except:
-                    required_skills = None
             
-            # Generate interview questions
+            # Draw interview questions from the job's question bank
             try:
-                questions = self.question_generator.generate_questions(job_description, required_skills)
+                questions = self.select_questions(self.get_question_bank(job), interview_id)
             except Exception as e:
                 print(f"Error generating questions: {str(e)}")
                 # Fallback to mock questions if there's an error
@@ -95,6 +116,362 @@ class InterviewManager:
                 "questions": mock_questions
             }
     
+    def _job_text(self, job: Dict[str, Any]) -> str:
+        """Text compared when looking for near-duplicate jobs."""
+        return f"{job.get('title') or ''}\n{job['description']}"
+    
+    def _find_similar_job(self, job: Dict[str, Any], usable: Callable[[Dict[str, Any]], bool]) -> Optional[Dict[str, Any]]:
+        """
+        Find the most similar other job whose stored results can be reused.
+        
+        Args:
+            job: Job description record
+            usable: Check on a similar job's record, e.g. that its stored results are current
+            
+        Returns:
+            The similar job's record, or None
+        """
+        for job_id, similarity in self.job_index.query(self._job_text(job), exclude=job["id"]):
+            try:
+                other = self.db.get_job_description(job_id)
+            except Exception:
+                # Deleted since it was indexed
+                self.job_index.remove(job_id)
+                continue
+            if usable(other):
+                print(f"Reusing results of job {job_id} for job {job['id']} (similarity {similarity:.2f})")
+                return other
+        return None
+    
+    def _stored_job_fields(self, job: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """A job's stored fields, if they were computed from its current description."""
+        job_fields = job.get("job_fields")
+        if isinstance(job_fields, str):
+            try:
+                job_fields = json.loads(job_fields)
+            except ValueError:
+                job_fields = None
+        if job_fields and job.get("job_fields_hash") == self.resume_analyzer.description_hash(job["description"]):
+            return job_fields
+        return None
+    
+    def stream_interview(self, job_id: str, candidate_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Create an interview, yielding the record and then each question as soon as it is stored.
+        
+        When the job's question bank has to be generated, questions are
+        persisted and yielded while the model is still writing the rest. With
+        bank sampling (QUESTION_BANK_SIZE > QUESTIONS_PER_INTERVIEW) the whole
+        bank is needed before the sample can be drawn.
+        
+        Args:
+            job_id: ID of the job
+            candidate_id: ID of the candidate
+            
+        If generation fails part-way, like create_interview the interview is
+        completed with fallback questions. Any other error marks the interview
+        failed before it propagates.
+        
+        Yields:
+            {"event": "interview" | "question" | "done", "data": ...} dictionaries
+        """
+        interview = self.db.create_interview(job_id, candidate_id)
+        interview_id = interview["id"]
+        yield {"event": "interview", "data": interview}
+        
+        asked: List[Dict[str, Any]] = []
+        
+        def persist(question: Dict[str, Any]) -> Dict[str, Any]:
+            db_question = self.db.create_questions(interview_id, [question], start_index=len(asked))[0]
+            asked.append(question)
+            return {"event": "question", "data": db_question}
+        
+        try:
+            wait_for_warmup(self.db, job_id)
+            job = self.db.get_job_description(job_id)
+            if QUESTION_BANK_SIZE > QUESTIONS_PER_INTERVIEW:
+                target = QUESTIONS_PER_INTERVIEW
+                questions = lambda: iter(self.select_questions(self.get_question_bank(job), interview_id))
+            else:
+                target = QUESTION_BANK_SIZE
+                questions = lambda: self.iter_question_bank(job)
+            
+            fallback = False
+            try:
+                for question in questions():
+                    yield persist(question)
+            except Exception as e:
+                print(f"Error generating questions: {str(e)}")
+                fallback = True
+            
+            if fallback:
+                asked_texts = {question.get("question") for question in asked}
+                remaining = [question for question in FALLBACK_QUESTIONS if question["question"] not in asked_texts]
+                for question in remaining[:max(0, target - len(asked))]:
+                    yield persist(dict(question))
+        except Exception:
+            try:
+                self.db.update_interview_status(interview_id, STATUS_FAILED)
+            except Exception as e:
+                print(f"Error marking interview failed: {str(e)}")
+            raise
+        
+        yield {"event": "done", "data": {"interview_id": interview_id, "question_count": len(asked), "fallback": fallback}}
+    
+    def get_job_fields(self, job: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Get a job's professional fields and their importance.
+        
+        Fields are stored on the job record with a hash of the description they
+        were computed from, and only recomputed when the description changes.
+        A near-duplicate job's current fields are reused instead of calling the
+        LLM. The job dict is updated in place with the current values.
+        
+        Args:
+            job: Job description record
+            
+        Returns:
+            List of fields with importance scores
+        """
+        job_fields = self._stored_job_fields(job)
+        if job_fields:
+            return job_fields
+        
+        similar = self._find_similar_job(job, lambda other: self._stored_job_fields(other) is not None)
+        if similar is not None:
+            job_fields = self._stored_job_fields(similar)
+        else:
+            job_fields = self.resume_analyzer.identify_job_fields(job["description"])
+        
+        if job_fields != FALLBACK_JOB_FIELDS:
+            description_hash = self.resume_analyzer.description_hash(job["description"])
+            try:
+                self.db.update_job_fields(job["id"], job_fields, description_hash)
+                job["job_fields"] = job_fields
+                job["job_fields_hash"] = description_hash
+                self.job_index.add(job["id"], self._job_text(job))
+            except Exception as e:
+                print(f"Error storing job fields: {str(e)}")
+        return job_fields
+    
+    def _required_skills(self, job: Dict[str, Any]) -> Optional[List[str]]:
+        """A job's required skills, decoded if stored as JSON text."""
+        required_skills = job.get("required_skills")
+        if isinstance(required_skills, str):
+            try:
+                required_skills = json.loads(required_skills)
+            except ValueError:
+                required_skills = None
+        return required_skills
+    
+    def _skill_set(self, job: Dict[str, Any]) -> List[str]:
+        return sorted(" ".join(skill.split()).lower() for skill in self._required_skills(job) or [])
+    
+    def _reusable_question_bank(self, job: Dict[str, Any], other: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """A similar job's current question bank, if it was generated for the same required skills."""
+        if self._skill_set(other) != self._skill_set(job):
+            return None
+        other_hash = self.question_generator.question_bank_hash(other["description"], self._required_skills(other))
+        return self._stored_question_bank(other, other_hash)
+    
+    def _stored_question_bank(self, job: Dict[str, Any], bank_hash: str) -> Optional[List[Dict[str, Any]]]:
+        question_bank = job.get("question_bank")
+        if isinstance(question_bank, str):
+            try:
+                question_bank = json.loads(question_bank)
+            except ValueError:
+                question_bank = None
+        if question_bank and job.get("question_bank_hash") == bank_hash:
+            return question_bank
+        return None
+    
+    def get_question_bank(self, job: Dict[str, Any], refresh: bool = False,
+                          on_question: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Get a job's interview question bank, generating it only when needed.
+        
+        The bank is stored on the job record with a hash of the description
+        and required skills it was generated from, so interviews for the same
+        opening reuse one generation. A near-duplicate job's bank is reused if
+        it was generated for the same required skills. The bank is regenerated
+        when the description or skills change or when refresh is set. The job
+        dict is updated in place.
+        
+        Args:
+            job: Job description record
+            refresh: Regenerate even if the stored bank is current
+            on_question: Called with each question as the model produces it, when the bank is generated
+            
+        Returns:
+            List of question dictionaries
+        """
+        required_skills = self._required_skills(job)
+        bank_hash = self.question_generator.question_bank_hash(job["description"], required_skills)
+        if not refresh:
+            question_bank = self._stored_question_bank(job, bank_hash)
+            if question_bank:
+                return question_bank
+        
+        with _question_bank_locks_guard:
+            lock = _question_bank_locks.setdefault(job["id"], threading.Lock())
+        with lock:
+            # Another request may have generated it while this one waited
+            if not refresh:
+                try:
+                    question_bank = self._stored_question_bank(self.db.get_job_description(job["id"]), bank_hash)
+                except Exception:
+                    question_bank = None
+                if question_bank:
+                    job["question_bank"] = question_bank
+                    job["question_bank_hash"] = bank_hash
+                    return question_bank
+            
+            # A near-duplicate job with the same required skills may already have a bank
+            similar = None
+            if not refresh:
+                similar = self._find_similar_job(job, lambda other: self._reusable_question_bank(job, other) is not None)
+            if similar is not None:
+                question_bank = self._reusable_question_bank(job, similar)
+            else:
+                question_bank = []
+                for question in self.question_generator.stream_questions(job["description"], required_skills, QUESTION_BANK_SIZE):
+                    question_bank.append(question)
+                    if on_question is not None:
+                        on_question(question)
+            
+            if question_bank != FALLBACK_QUESTIONS:
+                try:
+                    self.db.update_question_bank(job["id"], question_bank, bank_hash)
+                    job["question_bank"] = question_bank
+                    job["question_bank_hash"] = bank_hash
+                    self.job_index.add(job["id"], self._job_text(job))
+                except Exception as e:
+                    print(f"Error storing question bank: {str(e)}")
+            return question_bank
+    
+    def iter_question_bank(self, job: Dict[str, Any], refresh: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over a job's question bank (see get_question_bank).
+        
+        When the bank has to be generated, questions are yielded as the model
+        produces them. Generation and storage run on a worker thread that
+        holds the job's lock, so a slow consumer never keeps other requests
+        for the job waiting.
+        """
+        updates: "queue.Queue" = queue.Queue()
+        
+        def build():
+            try:
+                question_bank = self.get_question_bank(job, refresh, on_question=lambda question: updates.put(("question", question)))
+                updates.put(("done", question_bank))
+            except BaseException as e:
+                updates.put(("error", e))
+        
+        threading.Thread(
+            target=contextvars.copy_context().run, args=(build,),
+            name=f"question-bank-{job['id']}", daemon=True
+        ).start()
+        
+        streamed = 0
+        while True:
+            kind, value = updates.get()
+            if kind == "question":
+                streamed += 1
+                yield value
+            elif kind == "done":
+                # Stored and reused banks arrive whole
+                yield from value[streamed:]
+                return
+            else:
+                raise value
+    
+    def select_questions(self, question_bank: List[Dict[str, Any]], interview_id: str) -> List[Dict[str, Any]]:
+        """
+        Pick an interview's questions from its job's bank.
+        
+        If the bank holds no more than QUESTIONS_PER_INTERVIEW questions every
+        interview gets all of them. Otherwise a sample seeded by the interview
+        ID is drawn, keeping the bank's mix of question types and its order.
+        """
+        if len(question_bank) <= QUESTIONS_PER_INTERVIEW:
+            return list(question_bank)
+        
+        rng = random.Random(interview_id)
+        by_type: Dict[str, List[int]] = {}
+        for index, question in enumerate(question_bank):
+            by_type.setdefault(question.get("type", "behavioral"), []).append(index)
+        
+        chosen = []
+        for indices in by_type.values():
+            share = round(QUESTIONS_PER_INTERVIEW * len(indices) / len(question_bank))
+            chosen += rng.sample(indices, min(share, len(indices)))
+        # Rounding the per-type shares can leave the sample one short or over
+        remaining = [index for index in range(len(question_bank)) if index not in chosen]
+        if len(chosen) < QUESTIONS_PER_INTERVIEW:
+            chosen += rng.sample(remaining, QUESTIONS_PER_INTERVIEW - len(chosen))
+        elif len(chosen) > QUESTIONS_PER_INTERVIEW:
+            chosen = rng.sample(chosen, QUESTIONS_PER_INTERVIEW)
+        return [question_bank[index] for index in sorted(chosen)]
+    
+    async def score_candidates_for_job(self,
+                                       job_id: str,
+                                       candidate_ids: Optional[List[str]] = None,
+                                       resumes: Optional[Dict[str, Dict[str, Any]]] = None,
+                                       top_n: Optional[int] = None,
+                                       min_match: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Score many candidates against a job, yielding each result as soon as it is ready.
+        
+        The pool is first ranked against the job description with BM25; only
+        candidates within top_n and above min_match are scored by the LLM, and
+        the rest are yielded straight away as filtered.
+        
+        Args:
+            job_id: ID of the job
+            candidate_ids: Candidates whose stored parsed resumes should be scored
+            resumes: Additional parsed resumes keyed by candidate ID
+            top_n: Maximum number of candidates to score with the LLM (default PREFILTER_TOP_N)
+            min_match: Minimum lexical match ratio to score with the LLM (default PREFILTER_MIN_MATCH)
+            
+        Yields:
+            Dictionary per candidate with pre-filter rank, field scores, correlation
+            and required skill matches, a filtered marker, or an error
+        """
+        # Database and job-field lookups block, so they run off the event loop
+        job = await asyncio.to_thread(self.db.get_job_description, job_id)
+        job_fields = await asyncio.to_thread(self.get_job_fields, job)
+        required_skills = self._required_skills(job)
+        
+        candidates = list((resumes or {}).items())
+        for candidate_id in candidate_ids or []:
+            try:
+                candidate = await asyncio.to_thread(self.db.get_candidate, candidate_id)
+                resume_parsed = candidate.get("resume_parsed")
+                if isinstance(resume_parsed, str):
+                    resume_parsed = json.loads(resume_parsed)
+                if not resume_parsed:
+                    raise ValueError("Candidate has no parsed resume")
+                candidates.append((candidate_id, resume_parsed))
+            except Exception as e:
+                yield {"candidate_id": candidate_id, "error": str(e)}
+        
+        candidates, prefilter = self.resume_analyzer.prefilter_candidates(candidates, job["description"], top_n, min_match)
+        for candidate_id, details in prefilter.items():
+            if not details["passed"]:
+                yield {"candidate_id": candidate_id, "filtered": True, "prefilter": details}
+        
+        resumes_by_id = dict(candidates)
+        async for candidate_id, candidate_scores in self.resume_analyzer.ascore_candidates(candidates, job_fields):
+            correlation = self.resume_analyzer.generate_correlation_matrix(job_fields, candidate_scores)
+            self.ranking.record_score(job_id, candidate_id, METRIC_CORRELATION, correlation["correlation_score"])
+            yield {
+                "candidate_id": candidate_id,
+                "candidate_scores": candidate_scores,
+                "correlation": correlation,
+                "required_skills": self.resume_analyzer.skills.match_required(resumes_by_id[candidate_id], required_skills),
+                "prefilter": prefilter[candidate_id]
+            }
+    
     def get_interview_questions(self, interview_id: str) -> List[Dict[str, Any]]:
         """
         Get all questions for an interview.
@@ -191,7 +568,6 @@ class InterviewManager:
         
         # Get job description
         job = self.db.get_job_description(job_id)
-        job_description = job["description"]
         
         # Get candidate resume data
         candidate = self.db.get_candidate(candidate_id)
@@ -233,17 +609,21 @@ class InterviewManager:
         
         # Generate correlation matrix if resume is available
         correlation_data = None
-        if resume_parsed and isinstance(resume_parsed, str):
+        if resume_parsed:
+            # The job's fields are computed once per description and reused here
+            job_fields = self.get_job_fields(job)
             try:
-                resume_data = eval(resume_parsed)
-                # Analyze resume against job
-                job_analysis = self.resume_analyzer.analyze_resume_for_job("", job_description)
-                correlation_data = job_analysis["correlation"]
-            except:
+                resume_data = json.loads(resume_parsed) if isinstance(resume_parsed, str) else resume_parsed
+                # Score the parsed resume against the job
+                candidate_scores = self.resume_analyzer.score_candidate(resume_data, job_fields)
+            except ValueError:
                 # If resume parsing fails, use the minimal structure
-                job_fields = self.resume_analyzer.identify_job_fields(job_description)
                 candidate_scores = [{"field": jf["field"], "score": 50, "evidence": "Automatic score"} for jf in job_fields]
-                correlation_data = self.resume_analyzer.generate_correlation_matrix(job_fields, candidate_scores)
+            correlation_data = {
+                "job_fields": job_fields,
+                "candidate_scores": candidate_scores,
+                **self.resume_analyzer.generate_correlation_matrix(job_fields, candidate_scores)
+            }
         
         # Create the assessment
         assessment_data = {
@@ -255,6 +635,11 @@ class InterviewManager:
         
         assessment = self.db.create_assessment(interview_id, assessment_data)
         
+        # Keep the job's candidate ranking current
+        self.ranking.record_score(job_id, candidate_id, METRIC_ASSESSMENT, sum(avg_scores.values()) / len(avg_scores))
+        if correlation_data:
+            self.ranking.record_score(job_id, candidate_id, METRIC_CORRELATION, correlation_data["correlation_score"])
+        
         # Update interview status to completed
         self.db.update_interview_status(interview_id, "completed")
         
@@ -263,42 +648,83 @@ class InterviewManager:
             "interview_id": interview_id
         }
     
-    def upload_and_parse_resume(self, candidate_id: str, resume_file: BinaryIO, filename: str) -> Dict[str, Any]:
+    def upload_and_parse_resume(self, candidate_id: str, resume_file: Union[bytes, BinaryIO], filename: str) -> Dict[str, Any]:
         """
         Upload and parse a candidate's resume.
         
+        Resumes are deduplicated by content hash: a file identical to one
+        already processed reuses its parsed data without parsing or calling
+        the LLM, and a different file whose normalised text matches reuses the
+        parsed data without the LLM. The file is still stored under this
+        candidate's own path. Failed extractions are stored without hashes so
+        the next upload of the same resume tries again.
+        
         Args:
             candidate_id: ID of the candidate
-            resume_file: Binary resume file
+            resume_file: Resume file contents or binary file object
             filename: Original filename
             
         Returns:
-            Dictionary with resume details
+            Dictionary with resume details and which dedup level served it
         """
+        file_data = resume_file if isinstance(resume_file, bytes) else resume_file.read()
+        file_sha256 = file_hash(file_data)
+        
         # Make a unique filename to avoid conflicts
         file_ext = os.path.splitext(filename)[1]
         unique_filename = f"{candidate_id}{file_ext}"
         
+        # Identical file: nothing to parse or extract
+        existing = self.dedup.find_by_file(file_sha256)
+        if existing and existing.get("resume_url"):
+            self.dedup.record("file")
+            resume_data = existing["resume_parsed"]
+            if existing["id"] == candidate_id:
+                resume_url = existing["resume_url"]
+            else:
+                # The other candidate's object can be replaced or deleted, so store our own copy
+                resume_url = self.db.upload_resume(candidate_id, file_data, unique_filename)
+                self.db.update_candidate_resume(candidate_id, resume_url, resume_data,
+                                                file_sha256, existing.get("resume_text_sha256"))
+            self.resume_analyzer.resume_index.add(candidate_id, flatten_resume(resume_data))
+            return {
+                "candidate_id": candidate_id,
+                "resume_url": resume_url,
+                "resume_data": resume_data,
+                "dedup": "file"
+            }
+        
         # Create a temporary file
         with tempfile.NamedTemporaryFile(suffix=file_ext, delete=False) as temp_file:
-            temp_file.write(resume_file.read())
+            temp_file.write(file_data)
             temp_path = temp_file.name
         
         try:
             # Upload to storage
-            resume_url = self.db.upload_resume(temp_path, unique_filename)
+            resume_url = self.db.upload_resume(candidate_id, file_data, unique_filename)
             
-            # Parse the resume
+            # Parse the resume; the same text (e.g. a re-exported PDF) reuses earlier extraction
             resume_text = self.resume_analyzer.parse_pdf_resume(temp_path)
-            resume_data = self.resume_analyzer.extract_resume_data(resume_text)
+            text_sha256 = text_hash(resume_text) if resume_text.strip() else None
+            existing = self.dedup.find_by_text(text_sha256) if text_sha256 else None
+            if existing:
+                self.dedup.record("text")
+                resume_data = existing["resume_parsed"]
+            else:
+                self.dedup.record("miss")
+                resume_data = self.resume_analyzer.extract_resume_data(resume_text)
             
-            # Update candidate with resume info
-            self.db.update_candidate_resume(candidate_id, resume_url, resume_data)
+            # Update candidate with resume info; a failed extraction isn't offered to later uploads
+            if not has_resume_content(resume_data):
+                file_sha256 = text_sha256 = None
+            self.db.update_candidate_resume(candidate_id, resume_url, resume_data, file_sha256, text_sha256)
+            self.resume_analyzer.resume_index.add(candidate_id, flatten_resume(resume_data))
             
             return {
                 "candidate_id": candidate_id,
                 "resume_url": resume_url,
-                "resume_data": resume_data
+                "resume_data": resume_data,
+                "dedup": "text" if existing else None
             }
         finally:
             # Clean up the temporary file
@@ -0,0 +1,154 @@
+import os
+import time
+import threading
+from datetime import datetime, timezone
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Any, Dict, Optional
+
+from ..utils.stage_dag import StageDAG
+
+JOB_WARMUP_WORKERS = int(os.getenv("JOB_WARMUP_WORKERS", "2"))
+# How long interview creation waits for a job's warm-up before going ahead without it
+JOB_WARMUP_WAIT_SECONDS = float(os.getenv("JOB_WARMUP_WAIT_SECONDS", "120"))
+# A warm-up still "warming" this long after it started is assumed lost (e.g. the process died)
+JOB_WARMUP_STALE_SECONDS = float(os.getenv("JOB_WARMUP_STALE_SECONDS", "600"))
+
+# Values of a job's warmup_status
+WARMUP_RUNNING = "warming"
+WARMUP_READY = "ready"
+WARMUP_FAILED = "failed"
+
+# Interval for polling the status of a warm-up running in another process
+POLL_SECONDS = 0.5
+
+_executor: Optional[ThreadPoolExecutor] = None
+_warmups: Dict[str, Future] = {}
+_warmups_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=JOB_WARMUP_WORKERS, thread_name_prefix="job-warmup")
+    return _executor
+
+
+def _warm(interview_manager, job: Dict[str, Any], previous: Optional[Future]) -> str:
+    # A newer warm-up for the same job (after an edit) starts once the older one is done
+    if previous is not None:
+        try:
+            previous.result()
+        except Exception:
+            pass
+
+    # Field identification and question generation are independent LLM calls
+    dag = StageDAG()
+    dag.add("job_fields", lambda: interview_manager.get_job_fields(job))
+    dag.add("question_bank", lambda: interview_manager.get_question_bank(job))
+    try:
+        dag.run()
+        status = WARMUP_READY
+    except Exception as e:
+        print(f"Warm-up failed for job {job['id']}: {e}")
+        status = WARMUP_FAILED
+
+    try:
+        interview_manager.db.update_job_status(job["id"], status)
+    except Exception as e:
+        print(f"Error storing warm-up status: {e}")
+    return status
+
+
+def start_warmup(interview_manager, job: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Queue background generation of a job's field model and question bank.
+
+    The job is marked "warming" before this returns, so the response to job
+    creation already shows the status; the job dict is updated in place.
+
+    Args:
+        interview_manager: InterviewManager whose agents and database the warm-up uses
+        job: Job description record
+
+    Returns:
+        The job record with its warmup_status
+    """
+    started_at = datetime.now(timezone.utc).isoformat()
+    try:
+        interview_manager.db.update_job_status(job["id"], WARMUP_RUNNING, started_at)
+    except Exception as e:
+        print(f"Error storing warm-up status: {e}")
+    job["warmup_status"] = WARMUP_RUNNING
+    job["warmup_started_at"] = started_at
+
+    with _warmups_lock:
+        previous = _warmups.get(job["id"])
+        future = _get_executor().submit(_warm, interview_manager, dict(job), previous)
+        _warmups[job["id"]] = future
+
+    def forget(done: Future):
+        with _warmups_lock:
+            if _warmups.get(job["id"]) is done:
+                del _warmups[job["id"]]
+
+    future.add_done_callback(forget)
+    return job
+
+
+def _warmup_age(job: Dict[str, Any]) -> Optional[float]:
+    """Seconds since the job's warm-up started, or None if the start time is unknown."""
+    started_at = job.get("warmup_started_at")
+    if not started_at:
+        return None
+    try:
+        started = datetime.fromisoformat(str(started_at).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if started.tzinfo is None:
+        started = started.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - started).total_seconds()
+
+
+def wait_for_warmup(db, job_id: str, timeout: Optional[float] = None) -> Optional[str]:
+    """
+    Block until a job's warm-up finishes, if one is in progress.
+
+    Warm-ups started by this process are awaited directly; one started by
+    another process is followed through the job's stored status. A stored
+    "warming" status with no start time, or older than
+    JOB_WARMUP_STALE_SECONDS, belongs to a warm-up that will never finish
+    and counts as failed without waiting.
+
+    Args:
+        db: SupabaseClient
+        job_id: ID of the job
+        timeout: Maximum seconds to wait (default JOB_WARMUP_WAIT_SECONDS)
+
+    Returns:
+        The job's warm-up status after waiting (None for jobs that never had one)
+    """
+    timeout = JOB_WARMUP_WAIT_SECONDS if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+
+    with _warmups_lock:
+        future = _warmups.get(job_id)
+    if future is not None:
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            return WARMUP_RUNNING
+
+    while True:
+        try:
+            job = db.get_job_description(job_id)
+        except Exception:
+            return None
+        status = job.get("warmup_status")
+        if status != WARMUP_RUNNING:
+            return status
+        age = _warmup_age(job)
+        if age is None or age >= JOB_WARMUP_STALE_SECONDS:
+            return WARMUP_FAILED
+        if time.monotonic() >= deadline:
+            return status
+        time.sleep(min(POLL_SECONDS, JOB_WARMUP_STALE_SECONDS - age))
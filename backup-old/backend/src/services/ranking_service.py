@@ -0,0 +1,276 @@
+import os
+import time
+import bisect
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..utils.single_flight import SingleFlight
+
+# Age after which a job's in-memory ranking is reloaded, to pick up scores written by other workers
+RANKING_RELOAD_SECONDS = float(os.getenv("RANKING_RELOAD_SECONDS", "30"))
+
+# Score kinds candidates can be ranked by
+METRIC_CORRELATION = "correlation"
+METRIC_ASSESSMENT = "assessment"
+METRICS = (METRIC_CORRELATION, METRIC_ASSESSMENT)
+
+
+class SortedScores:
+    """
+    Candidate scores for one job and metric, kept in rank order.
+
+    Scores are stored negated in an ascending list with a parallel list of
+    candidate ids, so top-k and page queries are list slices and an update is
+    one binary search plus a list insert. Ties keep insertion order.
+    """
+
+    def __init__(self):
+        self._keys: List[float] = []
+        self._ids: List[str] = []
+        self._scores: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _position(self, candidate_id: str, score: float) -> int:
+        position = bisect.bisect_left(self._keys, -score)
+        while self._ids[position] != candidate_id:
+            position += 1
+        return position
+
+    def update(self, candidate_id: str, score: float):
+        """Insert a candidate's score, replacing any previous one."""
+        self.remove(candidate_id)
+        position = bisect.bisect_right(self._keys, -score)
+        self._keys.insert(position, -score)
+        self._ids.insert(position, candidate_id)
+        self._scores[candidate_id] = score
+
+    def remove(self, candidate_id: str):
+        score = self._scores.pop(candidate_id, None)
+        if score is not None:
+            position = self._position(candidate_id, score)
+            del self._keys[position]
+            del self._ids[position]
+
+    def page(self, offset: int, limit: int) -> List[Tuple[int, str, float]]:
+        """Return (rank, candidate_id, score) for ranks offset+1 .. offset+limit."""
+        end = offset + limit
+        return [
+            (offset + index + 1, candidate_id, -key)
+            for index, (key, candidate_id) in enumerate(zip(self._keys[offset:end], self._ids[offset:end]))
+        ]
+
+    def rank_of(self, candidate_id: str) -> Optional[int]:
+        """1-based rank of a candidate, or None if it has no score."""
+        score = self._scores.get(candidate_id)
+        if score is None:
+            return None
+        return self._position(candidate_id, score) + 1
+
+    def score_of(self, candidate_id: str) -> Optional[float]:
+        return self._scores.get(candidate_id)
+
+
+class _Write:
+    """A score change made in this process, kept until a reload is known to include it."""
+
+    def __init__(self, metric: str, candidate_id: str, score: Optional[float]):
+        self.metric = metric
+        self.candidate_id = candidate_id
+        self.score = score
+        self.stored_at: Optional[float] = None
+
+
+class RankingService:
+    """
+    Per-job candidate rankings, updated as scores are written.
+
+    Resume analysis records correlation scores and completed interviews record
+    assessment scores (plus the correlation used in the assessment). Scores
+    are written through to the candidate_scores table; a job's ranking is
+    loaded from there the first time it is needed and reloaded once it is
+    RANKING_RELOAD_SECONDS old, so restarts and other workers see the same
+    ranking. Jobs without scores keep no rankings in memory.
+
+    The stored scores are fetched outside the service lock, one fetch per job
+    at a time, so a reload only delays reads of that job; writes never wait
+    for one. Scores written while a fetch is in flight are replayed onto the
+    reloaded ranking.
+    """
+
+    def __init__(self, db=None):
+        self.db = db
+        self._lock = threading.Lock()
+        self._jobs: Dict[Tuple[str, str], SortedScores] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._writes: Dict[str, List[_Write]] = {}
+        self._reloads = SingleFlight()
+
+    def _ensure_loaded(self, job_id: str):
+        """Reload a job's rankings from its stored scores if they are missing or stale."""
+        if self.db is None or self._is_fresh(job_id):
+            return
+        self._reloads.do(job_id, lambda: self._reload(job_id))
+
+    def _is_fresh(self, job_id: str) -> bool:
+        with self._lock:
+            loaded_at = self._loaded_at.get(job_id)
+        return loaded_at is not None and time.monotonic() - loaded_at < RANKING_RELOAD_SECONDS
+
+    def _reload(self, job_id: str):
+        # Another caller may have finished a reload since this one checked
+        if self._is_fresh(job_id):
+            return
+        fetched_at = time.monotonic()
+        try:
+            rows = self.db.list_candidate_scores(job_id)
+        except Exception as e:
+            print(f"Error loading candidate scores: {e}")
+            return
+
+        rankings = {metric: SortedScores() for metric in METRICS}
+        for row in rows:
+            if row["metric"] in METRICS:
+                rankings[row["metric"]].update(row["candidate_id"], float(row["score"]))
+
+        with self._lock:
+            # Writes not yet stored when the fetch began may be missing from it
+            writes = [
+                write for write in self._writes.get(job_id, [])
+                if write.stored_at is None or write.stored_at >= fetched_at
+            ]
+            for write in writes:
+                if write.score is None:
+                    rankings[write.metric].remove(write.candidate_id)
+                else:
+                    rankings[write.metric].update(write.candidate_id, write.score)
+            if writes:
+                self._writes[job_id] = writes
+            else:
+                self._writes.pop(job_id, None)
+            for metric, scores in rankings.items():
+                if len(scores):
+                    self._jobs[(job_id, metric)] = scores
+                else:
+                    self._jobs.pop((job_id, metric), None)
+            if any(len(scores) for scores in rankings.values()):
+                self._loaded_at[job_id] = fetched_at
+            else:
+                self._loaded_at.pop(job_id, None)
+
+    def _scores(self, job_id: str, metric: str, create: bool = False) -> SortedScores:
+        if metric not in METRICS:
+            raise ValueError(f"Unknown ranking metric: {metric}")
+        scores = self._jobs.get((job_id, metric))
+        if scores is None:
+            scores = SortedScores()
+            # Reads of jobs without scores get a throwaway empty ranking
+            if create:
+                self._jobs[(job_id, metric)] = scores
+        return scores
+
+    def _apply(self, job_id: str, writes: List[_Write], store: Callable[[], Any], action: str):
+        """Apply score changes in memory, then store them; stored writes are stamped for reloads."""
+        with self._lock:
+            for write in writes:
+                if write.score is None:
+                    self._scores(job_id, write.metric).remove(write.candidate_id)
+                else:
+                    self._scores(job_id, write.metric, create=True).update(write.candidate_id, write.score)
+            if self.db is not None:
+                self._writes.setdefault(job_id, []).extend(writes)
+        if self.db is None:
+            return
+        try:
+            store()
+        except Exception as e:
+            print(f"Error {action} candidate scores: {e}")
+        finally:
+            stored_at = time.monotonic()
+            with self._lock:
+                for write in writes:
+                    write.stored_at = stored_at
+
+    def record_score(self, job_id: str, candidate_id: str, metric: str, score: float):
+        """
+        Record (or replace) a candidate's score for a job.
+
+        Args:
+            job_id: ID of the job
+            candidate_id: ID of the candidate
+            metric: METRIC_CORRELATION or METRIC_ASSESSMENT
+            score: The candidate's score; higher ranks first
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown ranking metric: {metric}")
+        score = float(score)
+        self._apply(job_id, [_Write(metric, candidate_id, score)],
+                    lambda: self.db.upsert_candidate_score(job_id, candidate_id, metric, score), "storing")
+
+    def remove_candidate(self, job_id: str, candidate_id: str):
+        """Drop a candidate from every ranking for a job."""
+        self._apply(job_id, [_Write(metric, candidate_id, None) for metric in METRICS],
+                    lambda: self.db.delete_candidate_scores(job_id, candidate_id), "deleting")
+
+    def get_ranking(self, job_id: str, metric: str = METRIC_CORRELATION,
+                    limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+        """
+        Get one page of a job's candidate ranking.
+
+        Args:
+            job_id: ID of the job
+            metric: Score to rank by
+            limit: Maximum number of candidates to return
+            offset: Number of top candidates to skip
+
+        Returns:
+            Dictionary with the total count and ranked candidates, each with both scores
+        """
+        other_metric = METRIC_ASSESSMENT if metric == METRIC_CORRELATION else METRIC_CORRELATION
+        self._ensure_loaded(job_id)
+        with self._lock:
+            ranked = self._scores(job_id, metric)
+            other = self._scores(job_id, other_metric)
+            candidates = [
+                {
+                    "rank": rank,
+                    "candidate_id": candidate_id,
+                    f"{metric}_score": score,
+                    f"{other_metric}_score": other.score_of(candidate_id)
+                }
+                for rank, candidate_id, score in ranked.page(offset, limit)
+            ]
+            return {
+                "job_id": job_id,
+                "metric": metric,
+                "total": len(ranked),
+                "offset": offset,
+                "candidates": candidates
+            }
+
+    def get_rank(self, job_id: str, candidate_id: str, metric: str = METRIC_CORRELATION) -> Optional[int]:
+        """1-based rank of a candidate for a job, or None if unscored."""
+        self._ensure_loaded(job_id)
+        with self._lock:
+            return self._scores(job_id, metric).rank_of(candidate_id)
+
+
+_ranking_service = None
+_ranking_lock = threading.Lock()
+
+
+def get_ranking_service(db=None) -> RankingService:
+    """
+    Get the process-wide ranking service.
+
+    Args:
+        db: SupabaseClient scores are stored in and loaded from; the first caller to pass one sets it
+    """
+    global _ranking_service
+    with _ranking_lock:
+        if _ranking_service is None:
+            _ranking_service = RankingService(db)
+        elif _ranking_service.db is None and db is not None:
+            _ranking_service.db = db
+        return _ranking_service
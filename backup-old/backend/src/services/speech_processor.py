@@ -2,9 +2,12 @@ import os
 import requests
 import json
 import tempfile
+import hashlib
 from typing import Dict, Any, BinaryIO, Tuple
 from dotenv import load_dotenv
 
+from ..utils.cassette import get_cassette
+
 load_dotenv()
 
 class ElevenLabsSpeechProcessor:
@@ -13,6 +16,7 @@ class ElevenLabsSpeechProcessor:
     def __init__(self):
         self.api_key = os.getenv("ELEVENLABS_API_KEY")
         self.base_url = "https://api.elevenlabs.io/v1"
+        self.cassette = get_cassette()
     
     def transcribe_audio(self, audio_data: BinaryIO) -> Dict[str, Any]:
         """
@@ -24,12 +28,24 @@ class ElevenLabsSpeechProcessor:
         Returns:
             Dictionary with transcription and metadata about speech patterns
         """
+        audio_bytes = audio_data.read()
+        
+        # Recorded transcriptions are keyed by the audio content
+        return self.cassette.call(
+            "speech",
+            {"audio_sha256": hashlib.sha256(audio_bytes).hexdigest()},
+            lambda: self._request_transcription(audio_bytes),
+            label="speech-to-text"
+        )
+    
+    def _request_transcription(self, audio_bytes: bytes) -> Dict[str, Any]:
+        """Send the audio to the Eleven Labs speech-to-text endpoint."""
         if not self.api_key:
             raise ValueError("ELEVENLABS_API_KEY environment variable not set")
         
         # Create a temporary file to store the audio data
         with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
-            temp_file.write(audio_data.read())
+            temp_file.write(audio_bytes)
             temp_path = temp_file.name
         
         try:
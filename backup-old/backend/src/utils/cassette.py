@@ -0,0 +1,181 @@
+import os
+import gzip
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+
+class CassetteMiss(KeyError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+class Cassette:
+    """
+    Records external calls (LLM completions, transcriptions) and replays them offline.
+
+    Entries are stored one JSON object per line - gzip-compressed when the path
+    ends in .gz - keyed by a hash of the request, so cassettes stay small and
+    contain no prompts. Repeated identical requests replay in recorded order.
+
+    Replay timing is controlled by `timing`: 0 returns instantly, 1 reproduces
+    the recorded latency and anything in between compresses it.
+    """
+
+    def __init__(self, path: str, mode: str = MODE_OFF, timing: float = 0.0):
+        if mode not in (MODE_OFF, MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"Invalid cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.timing = timing
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._positions: Dict[str, int] = {}
+        self.recorded = 0
+        self.replayed = 0
+
+        if mode == MODE_REPLAY:
+            self._load()
+        elif mode == MODE_RECORD and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    @property
+    def active(self) -> bool:
+        return self.mode != MODE_OFF
+
+    def _open(self, mode: str):
+        if self.path.endswith(".gz"):
+            return gzip.open(self.path, mode + "t", encoding="utf-8")
+        return open(self.path, mode, encoding="utf-8")
+
+    def _load(self):
+        with self._open("r") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+
+    @staticmethod
+    def make_key(kind: str, request: Any) -> str:
+        """Hash a JSON-serialisable request description into a cassette key."""
+        payload = json.dumps([kind, request], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == MODE_REPLAY
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == MODE_RECORD
+
+    def replay(self, kind: str, request: Any) -> Tuple[Any, float]:
+        """
+        Return the next recorded response for a request and how long to wait before using it.
+
+        Repeated identical requests get their responses in recorded order; once
+        those run out the last one is reused.
+
+        Raises:
+            CassetteMiss: If the request is not on the cassette
+        """
+        key = self.make_key(kind, request)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMiss(f"No recorded {kind} response in {self.path} for request {key[:12]}")
+            position = self._positions.get(key, 0)
+            entry = entries[min(position, len(entries) - 1)]
+            self._positions[key] = position + 1
+            self.replayed += 1
+        return entry["response"], entry["elapsed"] * self.timing
+
+    def record(self, kind: str, request: Any, response: Any, elapsed: float, label: Optional[str] = None):
+        """Append one request/response pair to the cassette file (record mode only)."""
+        entry = {
+            "kind": kind,
+            "key": self.make_key(kind, request),
+            "label": label,
+            "elapsed": round(elapsed, 4),
+            "response": response
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            with self._open("a") as f:
+                f.write(line)
+            self.recorded += 1
+
+    def call(self, kind: str, request: Any, fn: Callable[[], Any], label: Optional[str] = None) -> Any:
+        """
+        Run fn through the cassette.
+
+        Args:
+            kind: Category of call, e.g. "llm" or "speech"
+            request: JSON-serialisable description identifying the request
+            fn: Zero-argument callable making the real call; must return JSON-serialisable data
+            label: Short human-readable tag stored with the entry (e.g. the model name)
+
+        Returns:
+            The live or replayed response
+        """
+        if self.replaying:
+            response, delay = self.replay(kind, request)
+            if delay > 0:
+                time.sleep(delay)
+            return response
+        if not self.recording:
+            return fn()
+
+        started = time.perf_counter()
+        response = fn()
+        self.record(kind, request, response, time.perf_counter() - started, label)
+        return response
+
+    async def acall(self, kind: str, request: Any, fn: Callable[[], Awaitable[Any]],
+                    label: Optional[str] = None) -> Any:
+        """Async version of call."""
+        if self.replaying:
+            response, delay = self.replay(kind, request)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return response
+        if not self.recording:
+            return await fn()
+
+        started = time.perf_counter()
+        response = await fn()
+        self.record(kind, request, response, time.perf_counter() - started, label)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the mode and how many entries were recorded or replayed."""
+        return {"mode": self.mode, "path": self.path, "recorded": self.recorded, "replayed": self.replayed}
+
+
+_cassette = None
+_cassette_lock = threading.Lock()
+
+
+def get_cassette() -> Cassette:
+    """
+    Get the process-wide cassette configured from the environment.
+
+    CASSETTE_MODE is off, record or replay; CASSETTE_PATH is the file
+    (default cassettes/session.jsonl.gz); CASSETTE_TIMING scales recorded
+    latency on replay (0 = instant, 1 = real time).
+    """
+    global _cassette
+    with _cassette_lock:
+        if _cassette is None:
+            _cassette = Cassette(
+                os.getenv("CASSETTE_PATH", os.path.join("cassettes", "session.jsonl.gz")),
+                os.getenv("CASSETTE_MODE", MODE_OFF).lower(),
+                float(os.getenv("CASSETTE_TIMING", "0"))
+            )
+        return _cassette
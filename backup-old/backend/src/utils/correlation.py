@@ -0,0 +1,111 @@
+from typing import Dict, List, Any, Tuple
+import numpy as np
+
+
+class CorrelationEngine:
+    """
+    Scores candidates against one job's field importance vector.
+
+    Candidate field scores are laid out as a candidates x job-fields matrix so
+    the correlation for every candidate is a single weighted matrix-vector
+    product. Results match the original DataFrame merge: candidate fields not
+    in the job are ignored, job fields the candidate lacks score 0, and
+    repeated field names contribute once per matching pair.
+    """
+
+    def __init__(self, job_fields: List[Dict[str, Any]]):
+        self.job_fields = job_fields
+        self.importance = np.array([jf["score"] for jf in job_fields], dtype=float)
+        self.total_importance = float(np.sum(self.importance))
+
+        # Job field name -> columns (a name may appear more than once)
+        self._columns: Dict[str, List[int]] = {}
+        for column, jf in enumerate(job_fields):
+            self._columns.setdefault(jf["field"], []).append(column)
+
+    def candidate_matrix(self, candidates: List[List[Dict[str, Any]]]) -> np.ndarray:
+        """
+        Build the candidates x job-fields score matrix.
+
+        Args:
+            candidates: Per candidate, a list of fields with candidate scores
+
+        Returns:
+            Float array where cell (c, f) is the sum of candidate c's scores for job field f's name
+        """
+        width = len(self.job_fields)
+        cells = []
+        values = []
+        columns_for = self._columns.get
+        for row, candidate_fields in enumerate(candidates):
+            offset = row * width
+            for cf in candidate_fields:
+                columns = columns_for(cf["field"])
+                if columns is not None:
+                    for column in columns:
+                        cells.append(offset + column)
+                        values.append(cf["score"])
+
+        # One scatter-add over the flattened matrix instead of an indexed write per entry
+        flat = np.bincount(np.array(cells, dtype=np.intp), weights=np.array(values, dtype=float),
+                           minlength=len(candidates) * width)
+        return flat.reshape(len(candidates), width)
+
+    def correlation_scores(self, matrix: np.ndarray) -> np.ndarray:
+        """
+        Compute the correlation score of every candidate at once.
+
+        Args:
+            matrix: Output of candidate_matrix
+
+        Returns:
+            Array of correlation scores (0-100, unrounded), one per candidate
+        """
+        if self.total_importance <= 0:
+            return np.zeros(matrix.shape[0])
+        # sum_f (candidate/100) * (importance/100) * importance, over total importance
+        return (matrix / 100) @ (self.importance ** 2 / 100) / self.total_importance * 100
+
+    def _visualization_rows(self, candidate_fields: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        entries: Dict[str, List[Tuple[Any, str]]] = {}
+        for cf in candidate_fields:
+            if cf["field"] in self._columns:
+                entries.setdefault(cf["field"], []).append((cf["score"], cf.get("evidence", "")))
+
+        rows = []
+        # The merge groups rows by field name, in order of each name's first job field
+        for column in [column for columns in self._columns.values() for column in columns]:
+            jf = self.job_fields[column]
+            matches = entries.get(jf["field"])
+            if matches is None:
+                # The merge saw one zero-score row per missing job field entry
+                matches = [(0, "No matching evidence found")] * len(self._columns[jf["field"]])
+            for score, evidence in matches:
+                rows.append({
+                    "field": jf["field"],
+                    "score_job": jf["score"],
+                    "score_candidate": score,
+                    "weighted_match": (score / 100) * (jf["score"] / 100),
+                    "evidence": evidence
+                })
+        return rows
+
+    def score(self, candidates: List[List[Dict[str, Any]]], visualization: bool = True) -> List[Dict[str, Any]]:
+        """
+        Score candidates, returning what generate_correlation_matrix returns for each.
+
+        Args:
+            candidates: Per candidate, a list of fields with candidate scores
+            visualization: Set to False to skip building the per-field rows
+
+        Returns:
+            One dictionary per candidate with correlation_score (and visualization_data)
+        """
+        scores = np.round(self.correlation_scores(self.candidate_matrix(candidates)), 1)
+        results = []
+        for candidate_fields, correlation_score in zip(candidates, scores.tolist()):
+            result = {"correlation_score": correlation_score}
+            if visualization:
+                result["visualization_data"] = self._visualization_rows(candidate_fields)
+            results.append(result)
+        return results
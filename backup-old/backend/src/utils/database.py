@@ -108,6 +108,100 @@ class SupabaseClient:
             logger.error(f"Error retrieving job description: {str(e)}")
             raise
     
+    def list_job_descriptions(self) -> List[Dict[str, Any]]:
+        """Get the ID, title and description of every job."""
+        try:
+            result = self.client.table("job_descriptions").select("id, title, description").execute()
+            
+            return result.data
+        except Exception as e:
+            logger.error(f"Error listing job descriptions: {str(e)}")
+            raise
+    
+    def update_job_description(self, job_id: str, title: Optional[str] = None, 
+                             description: Optional[str] = None, 
+                             department: Optional[str] = None, 
+                             required_skills: Optional[List[str]] = None,
+                             soft_skills_priorities: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+        """Update a job description; only the given values are changed."""
+        try:
+            data = {}
+            if title is not None:
+                data["title"] = title
+            if description is not None:
+                data["description"] = description
+            if department is not None:
+                data["department"] = department
+            if required_skills is not None:
+                data["required_skills"] = json.dumps(required_skills)
+            if soft_skills_priorities is not None:
+                data["soft_skills_priorities"] = json.dumps(soft_skills_priorities)
+            
+            if not data:
+                return self.get_job_description(job_id)
+            
+            result = self.client.table("job_descriptions").update(data).eq("id", job_id).execute()
+            
+            if not result.data:
+                raise ValueError(f"Failed to update job description for ID: {job_id}")
+                
+            return result.data[0]
+        except Exception as e:
+            logger.error(f"Error updating job description: {str(e)}")
+            raise
+    
+    def update_job_fields(self, job_id: str, job_fields: List[Dict[str, Any]], job_fields_hash: str) -> Dict[str, Any]:
+        """Store a job's professional fields along with the hash of the description they came from."""
+        try:
+            data = {
+                "job_fields": json.dumps(job_fields),
+                "job_fields_hash": job_fields_hash
+            }
+            
+            result = self.client.table("job_descriptions").update(data).eq("id", job_id).execute()
+            
+            if not result.data:
+                raise ValueError(f"Failed to update job fields for ID: {job_id}")
+                
+            return result.data[0]
+        except Exception as e:
+            logger.error(f"Error updating job fields: {str(e)}")
+            raise
+    
+    def update_question_bank(self, job_id: str, question_bank: List[Dict[str, Any]], question_bank_hash: str) -> Dict[str, Any]:
+        """Store a job's interview question bank along with the hash of the description and skills it came from."""
+        try:
+            data = {
+                "question_bank": json.dumps(question_bank),
+                "question_bank_hash": question_bank_hash
+            }
+            
+            result = self.client.table("job_descriptions").update(data).eq("id", job_id).execute()
+            
+            if not result.data:
+                raise ValueError(f"Failed to update question bank for ID: {job_id}")
+                
+            return result.data[0]
+        except Exception as e:
+            logger.error(f"Error updating question bank: {str(e)}")
+            raise
+    
+    def update_job_status(self, job_id: str, warmup_status: str, started_at: Optional[str] = None) -> Dict[str, Any]:
+        """Set the status of a job's background warm-up (warming, ready or failed) and, when starting, its start time."""
+        try:
+            data = {"warmup_status": warmup_status}
+            if started_at:
+                data["warmup_started_at"] = started_at
+            result = self.client.table("job_descriptions").update(data).eq("id", job_id).execute()
+            
+            if not result.data:
+                raise ValueError(f"Failed to update warm-up status for ID: {job_id}")
+                
+            return result.data[0]
+        except Exception as e:
+            logger.error(f"Error updating job warm-up status: {str(e)}")
+            raise
+    
     # Candidate operations
     def create_candidate(self, name: str, email: str, resume_url: Optional[str] = None) -> Dict[str, Any]:
         """Create a new candidate."""
@@ -128,6 +222,26 @@ class SupabaseClient:
             logger.error(f"Error creating candidate: {str(e)}")
             raise
     
+    def create_candidates(self, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many candidates (with resume data) in one insert."""
+        try:
+            insert_data = []
+            for candidate in candidates:
+                data = dict(candidate)
+                if data.get("resume_parsed") is not None:
+                    data["resume_parsed"] = json.dumps(data["resume_parsed"])
+                insert_data.append(data)
+            
+            result = self.client.table("candidates").insert(insert_data).execute()
+            
+            if not result.data:
+                raise ValueError("Failed to create candidates")
+                
+            return result.data
+        except Exception as e:
+            logger.error(f"Error creating candidates: {str(e)}")
+            raise
+    
     def get_candidate(self, candidate_id: str) -> Dict[str, Any]:
         """Get a candidate by ID."""
         try:
@@ -141,12 +255,21 @@ class SupabaseClient:
             logger.error(f"Error retrieving candidate: {str(e)}")
             raise
     
-    def update_candidate_resume(self, candidate_id: str, resume_url: str, resume_parsed: Dict[str, Any]) -> Dict[str, Any]:
-        """Update a candidate's resume data."""
+    def update_candidate_resume(self, candidate_id: str, resume_url: str, resume_parsed: Dict[str, Any],
+                                resume_sha256: Optional[str] = None,
+                                resume_text_sha256: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Update a candidate's resume data, with the content hashes used for deduplication.
+        
+        Hashes left as None are cleared, so the previous resume's hashes never
+        point at the new resume's data.
+        """
         try:
             data = {
                 "resume_url": resume_url,
-                "resume_parsed": json.dumps(resume_parsed)
+                "resume_parsed": json.dumps(resume_parsed),
+                "resume_sha256": resume_sha256,
+                "resume_text_sha256": resume_text_sha256
             }
             
             result = self.client.table("candidates").update(data).eq("id", candidate_id).execute()
@@ -159,6 +282,55 @@ class SupabaseClient:
             logger.error(f"Error updating candidate resume: {str(e)}")
             raise
     
+    def find_candidate_by(self, column: str, value: str) -> Optional[Dict[str, Any]]:
+        """Get the first candidate with the given column value, or None."""
+        try:
+            result = self.client.table("candidates").select("*").eq(column, value).execute()
+            
+            return result.data[0] if result.data else None
+        except Exception as e:
+            logger.error(f"Error finding candidate by {column}: {str(e)}")
+            raise
+    
+    # Ranking score operations
+    def upsert_candidate_score(self, job_id: str, candidate_id: str, metric: str, score: float) -> Dict[str, Any]:
+        """Store a candidate's ranking score for a job, replacing any previous one for the metric."""
+        try:
+            data = {
+                "job_id": job_id,
+                "candidate_id": candidate_id,
+                "metric": metric,
+                "score": score
+            }
+            
+            result = self.client.table("candidate_scores").upsert(data, on_conflict="job_id,candidate_id,metric").execute()
+            
+            if not result.data:
+                raise ValueError(f"Failed to store {metric} score for candidate ID: {candidate_id}")
+                
+            return result.data[0]
+        except Exception as e:
+            logger.error(f"Error storing candidate score: {str(e)}")
+            raise
+    
+    def delete_candidate_scores(self, job_id: str, candidate_id: str):
+        """Delete every ranking score of a candidate for a job."""
+        try:
+            self.client.table("candidate_scores").delete().eq("job_id", job_id).eq("candidate_id", candidate_id).execute()
+        except Exception as e:
+            logger.error(f"Error deleting candidate scores: {str(e)}")
+            raise
+    
+    def list_candidate_scores(self, job_id: str) -> List[Dict[str, Any]]:
+        """Get every stored ranking score for a job."""
+        try:
+            result = self.client.table("candidate_scores").select("candidate_id, metric, score").eq("job_id", job_id).execute()
+            
+            return result.data
+        except Exception as e:
+            logger.error(f"Error listing candidate scores: {str(e)}")
+            raise
+    
     # Interview operations
     def create_interview(self, job_id: str, candidate_id: str) -> Dict[str, Any]:
         """Create a new interview."""
@@ -213,14 +385,14 @@ class SupabaseClient:
             raise
     
     # Question operations
-    def create_questions(self, interview_id: str, questions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Create questions for an interview."""
+    def create_questions(self, interview_id: str, questions: List[Dict[str, Any]], start_index: int = 0) -> List[Dict[str, Any]]:
+        """Create questions for an interview, numbered from start_index."""
         try:
             insert_data = []
-            for idx, question in enumerate(questions):
+            for idx, question in enumerate(questions, start=start_index):
                 insert_data.append({
                     "interview_id": interview_id,
-                    "text": question.get("text", ""),
+                    "text": question.get("text") or question.get("question", ""),
                     "type": question.get("type", "technical"),
                     "skill_assessed": question.get("skill_assessed", ""),
                     "order_index": idx
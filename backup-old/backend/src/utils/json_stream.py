@@ -0,0 +1,145 @@
+import json
+from typing import Any, List, Optional
+
+
+class IncrementalJSONParser:
+    """
+    Incremental parser for JSON arriving in chunks from a streaming LLM response.
+
+    Text before the first '{' or '[' (prose, markdown fences) is skipped. Every
+    element of the top-level array - or of an array that is a direct value of a
+    top-level object, such as {"questions": [...]} - is returned from feed() as
+    soon as it is complete, so callers can act on it before generation ends.
+    """
+
+    def __init__(self):
+        self._buffer = []
+        self._length = 0
+        self._root_start: Optional[int] = None
+        self._root_end: Optional[int] = None
+        # Stack of (bracket, is_tracked_array)
+        self._stack: List[tuple] = []
+        self._in_string = False
+        self._escape = False
+        self._element_start: Optional[int] = None
+        self.items: List[Any] = []
+
+    @property
+    def done(self) -> bool:
+        """True once the top-level JSON value has been closed."""
+        return self._root_end is not None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Consume the next chunk of text.
+
+        Args:
+            chunk: Newly generated text
+
+        Returns:
+            List of array elements completed by this chunk
+        """
+        completed = []
+        if not chunk or self.done:
+            return completed
+
+        start = self._length
+        self._buffer.append(chunk)
+        self._length += len(chunk)
+        text = None
+
+        for offset, char in enumerate(chunk):
+            pos = start + offset
+
+            if self._root_start is None:
+                if char in "[{":
+                    self._root_start = pos
+                    self._stack.append((char, char == "["))
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            tracked = bool(self._stack) and self._stack[-1][1]
+
+            if tracked and self._element_start is None and char not in " \t\r\n,]":
+                self._element_start = pos
+
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                parent = self._stack[-1]
+                # Arrays directly under a root object are tracked as well
+                track = char == "[" and len(self._stack) == 1 and parent[0] == "{"
+                self._stack.append((char, track))
+            elif char in "]}":
+                if tracked and self._element_start is not None:
+                    # Scalar element terminated by the closing bracket
+                    text = text or "".join(self._buffer)
+                    completed.append(self._emit(text, pos))
+                self._stack.pop()
+                if not self._stack:
+                    self._root_end = pos + 1
+                    break
+                if self._stack[-1][1] and self._element_start is not None:
+                    # A nested object/array element just closed
+                    text = text or "".join(self._buffer)
+                    completed.append(self._emit(text, pos + 1))
+            elif char == "," and tracked and self._element_start is not None:
+                text = text or "".join(self._buffer)
+                completed.append(self._emit(text, pos))
+
+        return completed
+
+    def _emit(self, text: str, end: int) -> Any:
+        element = json.loads(text[self._element_start:end])
+        self._element_start = None
+        self.items.append(element)
+        return element
+
+    def result(self) -> Any:
+        """
+        Parse the complete top-level JSON value.
+
+        Returns:
+            The parsed document
+
+        Raises:
+            ValueError: If no complete JSON value has been received
+        """
+        if not self.done:
+            raise ValueError("Incomplete JSON in streamed response")
+        text = "".join(self._buffer)
+        return json.loads(text[self._root_start:self._root_end])
+
+
+def extract_json(text: str) -> Any:
+    """
+    Find and parse the first complete JSON object or array embedded in text.
+
+    Unlike a regex, this handles arbitrarily deep nesting and braces inside strings.
+
+    Args:
+        text: LLM response that may contain prose around the JSON
+
+    Returns:
+        The parsed JSON value
+
+    Raises:
+        ValueError: If no JSON value can be found
+    """
+    decoder = json.JSONDecoder()
+    for index, char in enumerate(text):
+        if char in "[{":
+            try:
+                value, _ = decoder.raw_decode(text, index)
+                return value
+            except json.JSONDecodeError:
+                continue
+    raise ValueError(f"Could not parse JSON from response: {text}")
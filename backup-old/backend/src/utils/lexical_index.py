@@ -0,0 +1,210 @@
+import os
+import re
+import math
+import hashlib
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+# Pre-filter cut-offs: resumes matching less than PREFILTER_MIN_MATCH of a job's
+# weighted vocabulary, or ranked below PREFILTER_TOP_N in a batch, skip the LLM (0 disables, the default)
+PREFILTER_MIN_MATCH = float(os.getenv("PREFILTER_MIN_MATCH", "0"))
+PREFILTER_TOP_N = int(os.getenv("PREFILTER_TOP_N", "0"))
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is",
+    "it", "its", "of", "on", "or", "our", "that", "the", "their", "this", "to", "we", "will",
+    "with", "you", "your", "who", "what", "which", "can", "all", "any", "more", "other",
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens of a text, without stopwords."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+def resume_text(resume_data: Dict[str, Any]) -> str:
+    """Flatten structured resume data into text for indexing."""
+    parts: List[str] = []
+
+    def collect(value: Any):
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, dict):
+            for item in value.values():
+                collect(item)
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+
+    collect(resume_data)
+    return "\n".join(parts)
+
+
+class LexicalIndex:
+    """
+    Incremental BM25 index over resume text.
+
+    An inverted index (term -> document -> term frequency) plus document
+    lengths is updated as each resume is added or replaced, so collection
+    statistics (document count, average length, document frequencies) are
+    always current without a rebuild. Queries are job descriptions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._documents: Dict[str, Counter] = {}
+        self._lengths: Dict[str, int] = {}
+        self._hashes: Dict[str, str] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._documents
+
+    def add(self, doc_id: str, text: str):
+        """Index a document, replacing any previous version with the same id; unchanged text is skipped."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if self._hashes.get(doc_id) == digest:
+            return
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove_locked(doc_id)
+            self._documents[doc_id] = terms
+            self._hashes[doc_id] = digest
+            length = sum(terms.values())
+            self._lengths[doc_id] = length
+            self._total_length += length
+            for term, count in terms.items():
+                self._postings.setdefault(term, {})[doc_id] = count
+
+    def remove(self, doc_id: str):
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id: str):
+        terms = self._documents.pop(doc_id, None)
+        if terms is None:
+            return
+        del self._hashes[doc_id]
+        self._total_length -= self._lengths.pop(doc_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def _idf(self, term: str, extra: Optional[Counter] = None) -> float:
+        # extra: an unindexed document counted as part of the collection
+        df = len(self._postings.get(term, ()))
+        count = len(self._documents)
+        if extra is not None:
+            df += 1 if term in extra else 0
+            count += 1
+        return math.log(1 + (count - df + 0.5) / (df + 0.5))
+
+    def score(self, query: str, doc_ids: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """
+        BM25 score of documents against a query.
+
+        Args:
+            query: Query text (a job description)
+            doc_ids: Documents to score (default: every document containing a query term)
+
+        Returns:
+            Dictionary of document id to score; requested documents with no
+            matching terms score 0
+        """
+        wanted = set(doc_ids) if doc_ids is not None else None
+        with self._lock:
+            if not self._documents:
+                return {doc_id: 0.0 for doc_id in wanted or ()}
+            average_length = self._total_length / len(self._documents) or 1.0
+            scores: Dict[str, float] = {doc_id: 0.0 for doc_id in wanted or ()}
+            # Term-at-a-time over the postings of each distinct query term
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = self._idf(term)
+                for doc_id, tf in postings.items():
+                    if wanted is not None and doc_id not in wanted:
+                        continue
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[doc_id] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+            return scores
+
+    def match_ratio(self, query: str, doc_id: str) -> float:
+        """
+        Fraction of a query's IDF-weighted terms that occur in a document (0-1).
+
+        Unlike BM25 scores this doesn't depend on the rest of the batch, so it
+        works as an absolute threshold for a single resume.
+        """
+        with self._lock:
+            terms = self._documents.get(doc_id)
+            if terms is None:
+                return 0.0
+            weights = {term: self._idf(term) for term in set(tokenize(query))}
+            total = sum(weights.values())
+            if total <= 0:
+                return 0.0
+            return sum(weight for term, weight in weights.items() if term in terms) / total
+
+    def score_text(self, query: str, text: str) -> Dict[str, float]:
+        """
+        Match ratio and BM25 score of a text that is not kept in the index.
+
+        The text is scored as if it were one more document in the collection,
+        so ad-hoc checks see the same statistics as indexed resumes without
+        leaving a document behind.
+
+        Returns:
+            Dictionary with "match" (see match_ratio) and "bm25"
+        """
+        terms = Counter(tokenize(text))
+        length = sum(terms.values())
+        with self._lock:
+            count = len(self._documents) + 1
+            average_length = (self._total_length + length) / count or 1.0
+            weights = {term: self._idf(term, terms) for term in set(tokenize(query))}
+            total = sum(weights.values())
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+            bm25 = 0.0
+            for term, weight in weights.items():
+                tf = terms.get(term, 0)
+                if tf:
+                    bm25 += weight * tf * (BM25_K1 + 1) / (tf + norm)
+            match = sum(weight for term, weight in weights.items() if term in terms) / total if total > 0 else 0.0
+            return {"match": match, "bm25": bm25}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = len(self._documents)
+            return {
+                "documents": count,
+                "terms": len(self._postings),
+                "average_length": round(self._total_length / count, 1) if count else 0.0
+            }
+
+
+_resume_index = None
+_resume_index_lock = threading.Lock()
+
+
+def get_resume_index() -> LexicalIndex:
+    """Get the process-wide resume index."""
+    global _resume_index
+    with _resume_index_lock:
+        if _resume_index is None:
+            _resume_index = LexicalIndex()
+        return _resume_index
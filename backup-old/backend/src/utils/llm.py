@@ -1,13 +1,45 @@
 import os
+import re
 import json
-from typing import Dict, List, Any, Optional
+import time
+import logging
+import asyncio
+import itertools
+from contextlib import AsyncExitStack
+from typing import Dict, List, Any, Callable, Optional, Tuple, Iterator, AsyncIterator
 from langchain.chat_models import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+
+from .llm_pool import ModelClientRegistry, ModelConcurrencyLimiter
+from .llm_cache import LLMResponseCache, LLMResponse, make_cache_key
+from .json_stream import IncrementalJSONParser, extract_json
+from .single_flight import SingleFlight
+from .llm_hedging import HedgingPolicy
+from .llm_scheduler import LLMScheduler, remaining_time
+from .cassette import get_cassette
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Point at a local stand-in (see openrouter_standin.py) for load tests
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+OPENROUTER_HEADERS = {
+    "HTTP-Referer": "https://giselle-interview.app",
+    "X-Title": "Giselle Interview AI"
+}
+
+# Model used by generate_text / classify_text
+GENERATION_MODEL = "gpt-4o"  # Can be configured from env var later
+
+# Rough prompt budget for one batched scoring request (~4 characters per token)
+BATCH_SCORE_MAX_PROMPT_CHARS = int(os.getenv("LLM_BATCH_MAX_PROMPT_CHARS", "16000"))
+
+# Completion size assumed when reserving tokens/minute for a call without max_tokens
+EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "500"))
+
 class LLMClient:
     """Client for LLM operations using OpenRouter."""
     
@@ -17,91 +49,326 @@ class LLMClient:
         if cls._instance is None:
             cls._instance = super(LLMClient, cls).__new__(cls)
             
-            # Check if we're using mock data
-            use_mock = os.getenv("USE_MOCK_DATA", "true").lower() == "true"
+            # Long-lived chat models and HTTP pools shared by every caller
+            cls._instance.registry = ModelClientRegistry()
+            
+            # Content-addressed response cache (memory LRU + SQLite)
+            cls._instance.cache = LLMResponseCache()
+            
+            # Per-model in-flight limits for the async API
+            cls._instance.concurrency = ModelConcurrencyLimiter()
+            
+            # Shares one upstream call between concurrent identical prompts
+            cls._instance.single_flight = SingleFlight()
+            
+            # Per-model latency history and hedging to a secondary model
+            cls._instance.hedging = HedgingPolicy()
+            
+            # Rate limits, priority classes and 429/5xx retries per model
+            cls._instance.scheduler = LLMScheduler()
+            
+            # Record/replay of upstream calls (CASSETTE_MODE); the response cache
+            # is bypassed so every call reaches the cassette
+            cls._instance.cassette = get_cassette()
+            if cls._instance.cassette.active:
+                cls._instance.cache.enabled = False
+            
+            # Check if we're using mock data (USE_MOCK_LLM overrides USE_MOCK_DATA for the LLM only)
+            use_mock = os.getenv("USE_MOCK_LLM", os.getenv("USE_MOCK_DATA", "true")).lower() == "true"
             
             # Get OpenRouter API key
             openrouter_api_key = os.getenv("OPENROUTER_API_KEY")
             
-            if not use_mock and openrouter_api_key:
+            if cls._instance.cassette.replaying:
+                print(f"Replaying LLM responses from cassette {cls._instance.cassette.path}")
+                cls._instance.client = None
+                cls._instance.use_mock = False
+            elif not use_mock and openrouter_api_key:
                 print("Using real OpenRouter API for LLM operations...")
                 cls._instance.client = OpenAI(
-                    base_url="https://openrouter.ai/api/v1",
+                    base_url=OPENROUTER_BASE_URL,
                     api_key=openrouter_api_key,
-                    default_headers={
-                        "HTTP-Referer": "https://giselle-interview.app", 
-                        "X-Title": "Giselle Interview AI"
-                    }
+                    default_headers=OPENROUTER_HEADERS,
+                    http_client=cls._instance.registry.get_http_client(GENERATION_MODEL),
+                    max_retries=0  # Retries are handled by the scheduler
                 )
                 cls._instance.use_mock = False
             else:
                 print("WARNING: Using mock LLM - set USE_MOCK_DATA=false and provide OPENROUTER_API_KEY to use real LLM")
                 cls._instance.client = None
                 cls._instance.use_mock = True
-                
+        
         return cls._instance
     
-    def get_llm(self, model_name: Optional[str] = None):
+    def get_llm(self, model_name: Optional[str] = None, temperature: float = 0.2):
         """
-        Get an LLM instance from OpenRouter.
+        Get a pooled LLM instance from OpenRouter.
+        
+        Instances are created once per (model, temperature) and reused, so every
+        call shares the model's keep-alive connection pool instead of paying
+        client construction and TLS setup again.
         
         Args:
             model_name: Specific model to use. Defaults to DEFAULT_MODEL from env.
+            temperature: Sampling temperature. Lower values give more consistent, deterministic outputs.
         
         Returns:
             ChatOpenAI instance configured for the requested model
         """
-        if not model_name:
-            model_name = os.getenv("DEFAULT_MODEL", "deepseek/deepseek-chat-v3-0324:free")
-            
-        return ChatOpenAI(
-            openai_api_base="https://openrouter.ai/api/v1",
-            openai_api_key=os.getenv("OPENROUTER_API_KEY"),
-            model=model_name,
-            temperature=0.2,  # Lower temperature for more consistent, deterministic outputs
-            headers={
-                "HTTP-Referer": "https://giselle-interview.app", 
-                "X-Title": "Giselle Interview AI"
-            }
-        )
+        model_name = self._resolve_model_name(model_name)
+        
+        def build(http_client):
+            return ChatOpenAI(
+                openai_api_base=OPENROUTER_BASE_URL,
+                openai_api_key=os.getenv("OPENROUTER_API_KEY"),
+                model=model_name,
+                temperature=temperature,
+                http_client=http_client,
+                default_headers=OPENROUTER_HEADERS,
+                max_retries=0  # Retries are handled by the scheduler
+            )
+        
+        return self.registry.get(model_name, temperature, build)
+    
+    def get_async_client(self, model_name: Optional[str] = None) -> AsyncOpenAI:
+        """
+        Get the pooled async OpenRouter client for a model on the running event loop.
+        
+        Args:
+            model_name: Specific model to use. Defaults to DEFAULT_MODEL from env.
+        
+        Returns:
+            AsyncOpenAI instance backed by the model's async connection pool
+        """
+        model_name = self._resolve_model_name(model_name)
+        
+        def build(http_client):
+            return AsyncOpenAI(
+                base_url=OPENROUTER_BASE_URL,
+                api_key=os.getenv("OPENROUTER_API_KEY"),
+                default_headers=OPENROUTER_HEADERS,
+                http_client=http_client,
+                max_retries=0  # Retries are handled by the scheduler
+            )
+        
+        return self.registry.get_async(model_name, build, self.concurrency.get_limit(model_name))
+    
+    def set_concurrency_limit(self, model_name: str, limit: int):
+        """
+        Set how many async requests a model may have in flight at once.
+        
+        Args:
+            model_name: Model identifier
+            limit: Maximum number of concurrent requests
+        """
+        self.concurrency.set_limit(model_name, limit)
+    
+    def _resolve_model_name(self, model_name: Optional[str]) -> str:
+        """Return the requested model, or DEFAULT_MODEL from env."""
+        return model_name or os.getenv("DEFAULT_MODEL", "deepseek/deepseek-chat-v3-0324:free")
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters for the LLM response cache.
+        
+        Returns:
+            Dictionary with per-tier hits, misses, hit rate and entry counts
+        """
+        return self.cache.stats()
+    
+    def coalescing_stats(self) -> Dict[str, int]:
+        """
+        Get counters for request coalescing.
+        
+        Returns:
+            Dictionary with upstream calls executed, calls deduplicated and calls in flight
+        """
+        return self.single_flight.stats()
+    
+    def set_hedge_model(self, model_name: str, secondary_model: Optional[str]):
+        """
+        Configure the model a slow request to model_name is hedged to.
+        
+        Args:
+            model_name: Primary model
+            secondary_model: Model to hedge to, or None to disable hedging for the primary
+        """
+        self.hedging.set_secondary(model_name, secondary_model)
+    
+    def latency_stats(self) -> Dict[str, Any]:
+        """
+        Get per-model latency percentiles and hedging counters.
+        
+        Returns:
+            Dictionary with hedges sent, wins by primary/secondary and latency per model
+        """
+        return self.hedging.stats()
+    
+    def scheduler_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get rate limiter queue depth, wait times and retry counts per model.
+        
+        Returns:
+            Dictionary keyed by model name with queue depth per priority class and wait statistics
+        """
+        return self.scheduler.stats()
+    
+    def pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get pool hit and connection reuse counters for every model used so far.
+        
+        Returns:
+            Dictionary keyed by model name with hit/miss and connection counters
+        """
+        stats = self.registry.stats()
+        for model_name, concurrency in self.concurrency.stats().items():
+            stats.setdefault(model_name, {})["concurrency"] = concurrency
+        return stats
+    
+    def get_default_model(self) -> str:
+        """Get the name of the default model."""
+        return self._resolve_model_name(None)
+    
+    def get_question_generator_model(self) -> str:
+        """Get the name of the model used for generating interview questions."""
+        return os.getenv("TECHNICAL_ANALYSIS_MODEL", "anthropic/claude-3-opus")
+    
+    def get_resume_analyzer_model(self) -> str:
+        """Get the name of the model used for resume analysis."""
+        return os.getenv("RESUME_ANALYSIS_MODEL", "google/gemini-1.5-pro")
     
     def get_question_generator_llm(self):
         """Get LLM instance optimized for generating interview questions."""
-        return self.get_llm(os.getenv("TECHNICAL_ANALYSIS_MODEL", "anthropic/claude-3-opus"))
+        return self.get_llm(self.get_question_generator_model())
     
     def get_resume_analyzer_llm(self):
         """Get LLM instance optimized for resume analysis."""
-        return self.get_llm(os.getenv("RESUME_ANALYSIS_MODEL", "google/gemini-1.5-pro"))
+        return self.get_llm(self.get_resume_analyzer_model())
     
     def simple_prompt(self, 
                     system_prompt: str, 
                     user_prompt: str, 
-                    model_name: Optional[str] = None) -> str:
+                    model_name: Optional[str] = None,
+                    temperature: float = 0.2,
+                    use_cache: bool = True,
+                    validate: Optional[Callable[[str], Any]] = None) -> str:
         """
         Send a simple prompt to the LLM and get a response.
         
+        Identical prompts are served from the response cache. The returned
+        string carries `cache_hit` and `cache_tier` attributes for the call.
+        
         Args:
             system_prompt: Instructions for the LLM
             user_prompt: User's specific query
             model_name: Optional specific model to use
-            
+            temperature: Sampling temperature
+            use_cache: Set to False to bypass the cache for this call
+            validate: Called on the response; responses it raises on are
+                returned but not cached, so a retry asks the model again
+        
         Returns:
             String response from the LLM
         """
-        llm = self.get_llm(model_name)
+        model_name = self._resolve_model_name(model_name)
+        cache_key = make_cache_key(model_name, system_prompt, user_prompt, temperature)
+        
+        if use_cache:
+            cached = self._cache_lookup(cache_key, model_name, validate)
+            if cached is not None:
+                return cached
         
         messages = [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_prompt)
         ]
         
-        response = llm.invoke(messages)
-        return response.content
+        tokens = self._estimate_tokens([system_prompt, user_prompt])
+        
+        def send(model):
+            return self.cassette.call(
+                "llm",
+                self._cassette_request(model, system_prompt, user_prompt, temperature),
+                lambda: self.scheduler.call(
+                    model,
+                    lambda: self.hedging.timed(
+                        model,
+                        lambda: self.get_llm(model, temperature).invoke(messages, **self._request_options()).content
+                    ),
+                    tokens
+                ),
+                label=model
+            )
+        
+        def invoke():
+            # Slow primaries are hedged to a secondary model if one is configured
+            content = self.hedging.call(model_name, send)
+            if use_cache and self._is_valid(content, validate):
+                self.cache.set(cache_key, content)
+            return content
+        
+        # Concurrent callers with the same prompt share one upstream call
+        content = self.single_flight.do(cache_key, invoke)
+        return LLMResponse(content, cache_hit=False)
+    
+    def _request_options(self) -> Dict[str, Any]:
+        """Per-request options for the upstream call; inside llm_deadline its timeout is the time left."""
+        remaining = remaining_time()
+        if remaining is None:
+            return {}
+        if remaining <= 0:
+            raise TimeoutError("LLM call ran out of time before it was sent")
+        return {"timeout": remaining}
+    
+    def _estimate_tokens(self, texts: List[str], max_tokens: Optional[int] = None) -> int:
+        """Rough token count for rate limiting: ~4 characters per prompt token plus the completion."""
+        return sum(len(text) for text in texts) // 4 + (max_tokens or EXPECTED_COMPLETION_TOKENS)
+    
+    def _cassette_request(self,
+                          model_name: str,
+                          system_prompt: str,
+                          user_prompt: str,
+                          temperature: float,
+                          max_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """Describe a chat completion for the cassette; sync and async calls share entries."""
+        return {
+            "model": model_name,
+            "system": system_prompt,
+            "user": user_prompt,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+    
+    def _cache_lookup(self,
+                      cache_key: str,
+                      model_name: str,
+                      validate: Optional[Callable[[str], Any]] = None) -> Optional[LLMResponse]:
+        """Return the cached response for a key, or None on a miss or an entry that fails validation."""
+        cached, tier = self.cache.get(cache_key)
+        if cached is None:
+            logger.debug(f"LLM cache miss for {model_name}")
+            return None
+        if not self._is_valid(cached, validate):
+            logger.warning(f"Dropping invalid cached LLM response for {model_name}")
+            self.cache.delete(cache_key)
+            return None
+        logger.debug(f"LLM cache hit ({tier}) for {model_name}")
+        return LLMResponse(cached, cache_hit=True, cache_tier=tier)
+    
+    def _is_valid(self, content: str, validate: Optional[Callable[[str], Any]]) -> bool:
+        if validate is None:
+            return True
+        try:
+            validate(content)
+            return True
+        except Exception:
+            return False
     
     def structured_prompt(self, 
                         system_prompt: str, 
                         user_prompt: str, 
-                        model_name: Optional[str] = None) -> Dict[str, Any]:
+                        model_name: Optional[str] = None,
+                        use_cache: bool = True) -> Dict[str, Any]:
         """
         Send a prompt to the LLM and parse the response as JSON.
         
@@ -109,32 +376,108 @@ class LLMClient:
             system_prompt: Instructions for the LLM
             user_prompt: User's specific query
             model_name: Optional specific model to use
-            
+            use_cache: Set to False to bypass the response cache for this call
+        
         Returns:
             Dictionary parsed from JSON response
         """
-        system_prompt_with_json_instruction = f"{system_prompt}\n\nYou MUST respond with valid JSON only, no other text."
-        response_text = self.simple_prompt(system_prompt_with_json_instruction, user_prompt, model_name)
-        
+        system_prompt_with_json_instruction = self._json_system_prompt(system_prompt)
+        response_text = self.simple_prompt(system_prompt_with_json_instruction, user_prompt, model_name,
+                                           use_cache=use_cache, validate=self._parse_json_response)
+        return self._parse_json_response(response_text)
+    
+    def _json_system_prompt(self, system_prompt: str) -> str:
+        return f"{system_prompt}\n\nYou MUST respond with valid JSON only, no other text."
+    
+    def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
+        """Parse JSON out of an LLM response, tolerating markdown code fences."""
         # Clean the response in case there are markdown code blocks
         cleaned_response = response_text
         if "```json" in response_text:
             cleaned_response = response_text.split("```json")[1].split("```")[0].strip()
         elif "```" in response_text:
             cleaned_response = response_text.split("```")[1].split("```")[0].strip()
-            
+        
         try:
             return json.loads(cleaned_response)
         except json.JSONDecodeError:
             # Fallback: Try to extract only the JSON part if there's other text
-            import re
-            json_pattern = r'\{(?:[^{}]|(?:\{[^{}]*\}))*\}'
-            match = re.search(json_pattern, cleaned_response)
-            if match:
-                return json.loads(match.group(0))
-            else:
-                raise ValueError(f"Could not parse JSON from response: {response_text}")
-                
+            return extract_json(response_text)
+    
+    def _parse_streamed_json(self, response_text: str) -> Any:
+        """Parse a whole streamed response the way the streaming parser does; raises if it never closed its JSON."""
+        parser = IncrementalJSONParser()
+        parser.feed(response_text)
+        return parser.result()
+    
+    def stream_structured_prompt(self,
+                                 system_prompt: str,
+                                 user_prompt: str,
+                                 model_name: Optional[str] = None,
+                                 use_cache: bool = True) -> Iterator[Any]:
+        """
+        Stream a JSON response, yielding array elements as soon as each one closes.
+        
+        Elements of a top-level array, or of arrays directly inside a top-level
+        object (e.g. {"questions": [...]}), are yielded while the model is still
+        generating the rest of the response. Opening the stream goes through
+        the scheduler, so 429/5xx failures before the first chunk are retried
+        with backoff; the response is cached only once its JSON has closed.
+        
+        Args:
+            system_prompt: Instructions for the LLM
+            user_prompt: User's specific query
+            model_name: Optional specific model to use
+            use_cache: Set to False to bypass the response cache for this call
+            
+        Yields:
+            Each completed array element
+        """
+        system_prompt = self._json_system_prompt(system_prompt)
+        model_name = self._resolve_model_name(model_name)
+        cache_key = make_cache_key(model_name, system_prompt, user_prompt, 0.2)
+        parser = IncrementalJSONParser()
+        
+        if use_cache:
+            # Entries that don't parse as a whole are dropped instead of replayed
+            cached = self._cache_lookup(cache_key, model_name, self._parse_streamed_json)
+            if cached is not None:
+                yield from parser.feed(cached)
+                return
+        
+        request = self._cassette_request(model_name, system_prompt, user_prompt, 0.2)
+        if self.cassette.replaying:
+            content, delay = self.cassette.replay("llm", request)
+            time.sleep(delay)
+            yield from parser.feed(content)
+            parser.result()
+            return
+        
+        messages = [
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_prompt)
+        ]
+        
+        def open_stream():
+            stream = iter(self.get_llm(model_name).stream(messages, **self._request_options()))
+            # Rate limits and server errors surface on the first chunk, so it is read inside the retried call
+            return stream, next(stream, None)
+        
+        started = time.perf_counter()
+        stream, first = self.scheduler.call(model_name, open_stream, self._estimate_tokens([system_prompt, user_prompt]))
+        
+        chunks = []
+        for chunk in itertools.chain([first] if first is not None else [], stream):
+            chunks.append(chunk.content)
+            yield from parser.feed(chunk.content)
+        
+        parser.result()  # Raises if the response never closed its JSON, before anything is cached
+        content = "".join(chunks)
+        if self.cassette.recording:
+            self.cassette.record("llm", request, content, time.perf_counter() - started, model_name)
+        if use_cache:
+            self.cache.set(cache_key, content)
+    
     def analyze_text_with_score(self, 
                               text: str, 
                               criteria: str, 
@@ -148,26 +491,153 @@ class LLMClient:
             criteria: What to evaluate in the text
             scale: The scoring scale (default "0-20")
             model_name: Optional specific model to use
-            
+        
         Returns:
             Integer score
         """
-        system_prompt = f"""
+        response = self.simple_prompt(self._score_system_prompt(criteria, scale), text, model_name)
+        return self._extract_score(response)
+    
+    def _score_system_prompt(self, criteria: str, scale: str) -> str:
+        return f"""
         You are an expert communication analyst. Analyze the text for {criteria}.
         Score on a scale of {scale} based ONLY on concrete evidence in the text.
         Provide ONLY a numerical score as your answer, with no explanation or other text.
         """
-        
-        response = self.simple_prompt(system_prompt, text, model_name)
-        
-        # Extract just the number from the response
-        import re
+    
+    def _extract_score(self, response: str) -> int:
+        """Extract just the number from a scoring response."""
         score_match = re.search(r'\d+', response)
         if score_match:
             return int(score_match.group(0))
         else:
             raise ValueError(f"Could not extract numerical score from response: {response}")
     
+    def analyze_text_with_scores(self,
+                                 text: str,
+                                 criteria: List[str],
+                                 scale: str = "0-20",
+                                 model_name: Optional[str] = None) -> Dict[str, int]:
+        """
+        Score one text against several criteria in a single LLM call.
+        
+        Args:
+            text: Text to analyze
+            criteria: What to evaluate in the text, e.g. ["empathy", "confidence"]
+            scale: The scoring scale (default "0-20")
+            model_name: Optional specific model to use
+        
+        Returns:
+            Dictionary mapping each criterion to its integer score
+        """
+        return self.analyze_texts_with_scores([(text, criteria)], scale, model_name)[0]
+    
+    def analyze_texts_with_scores(self,
+                                  items: List[Tuple[str, List[str]]],
+                                  scale: str = "0-20",
+                                  model_name: Optional[str] = None) -> List[Dict[str, int]]:
+        """
+        Score many (text, criteria) pairs with as few LLM calls as possible.
+        
+        Pairs are packed into one request until the prompt reaches
+        BATCH_SCORE_MAX_PROMPT_CHARS, then split into further requests.
+        Scores are validated against the scale; any criterion the model leaves
+        out is re-scored individually with analyze_text_with_score.
+        
+        Args:
+            items: List of (text, criteria) pairs
+            scale: The scoring scale (default "0-20")
+            model_name: Optional specific model to use
+        
+        Returns:
+            One dictionary of criterion -> score per input pair, in input order
+        """
+        results = []
+        for chunk in self._chunk_score_items(items, scale):
+            response = self.structured_prompt(
+                self._batch_score_system_prompt(scale),
+                self._batch_score_user_prompt(chunk),
+                model_name
+            )
+            for (text, criteria), scores in zip(chunk, self._validate_batch_scores(response, chunk, scale)):
+                for criterion in criteria:
+                    if scores[criterion] is None:
+                        scores[criterion] = self.analyze_text_with_score(text, criterion, scale, model_name)
+                results.append(scores)
+        return results
+    
+    def _batch_score_system_prompt(self, scale: str) -> str:
+        return f"""
+        You are an expert communication analyst. Each numbered text below lists the criteria to evaluate.
+        Score every criterion on a scale of {scale} based ONLY on concrete evidence in that text.
+        Respond with a JSON object mapping each text number to an object of criterion: integer score, for example:
+        {{"0": {{"empathy": 12, "confidence": 15}}, "1": {{"professionalism": 17}}}}
+        Use the criterion names exactly as given.
+        """
+    
+    def _batch_score_user_prompt(self, chunk: List[Tuple[str, List[str]]]) -> str:
+        sections = []
+        for index, (text, criteria) in enumerate(chunk):
+            sections.append(f"Text {index}\nCriteria: {json.dumps(list(criteria))}\n\"\"\"\n{text}\n\"\"\"")
+        return "\n\n".join(sections)
+    
+    def _chunk_score_items(self, items: List[Tuple[str, List[str]]], scale: str) -> List[List[Tuple[str, List[str]]]]:
+        """Split (text, criteria) pairs into chunks that fit the prompt budget."""
+        budget = BATCH_SCORE_MAX_PROMPT_CHARS - len(self._batch_score_system_prompt(scale))
+        chunks = []
+        current = []
+        current_size = 0
+        
+        for text, criteria in items:
+            size = len(text) + sum(len(c) + 4 for c in criteria) + 32
+            if current and current_size + size > budget:
+                chunks.append(current)
+                current = []
+                current_size = 0
+            current.append((text, list(criteria)))
+            current_size += size
+        
+        if current:
+            chunks.append(current)
+        return chunks
+    
+    def _validate_batch_scores(self,
+                               response: Dict[str, Any],
+                               chunk: List[Tuple[str, List[str]]],
+                               scale: str) -> List[Dict[str, Optional[int]]]:
+        """
+        Check a batched scoring response against the requested criteria.
+        
+        Scores are coerced to integers and clamped to the scale. Criteria that
+        are missing, unreadable or not finite come back as None.
+        """
+        low, high = self._parse_scale(scale)
+        validated = []
+        
+        for index, (_, criteria) in enumerate(chunk):
+            entry = response.get(str(index)) if isinstance(response, dict) else None
+            if not isinstance(entry, dict):
+                entry = {}
+            by_name = {str(k).strip().lower(): v for k, v in entry.items()}
+            
+            scores = {}
+            for criterion in criteria:
+                value = by_name.get(criterion.strip().lower())
+                try:
+                    scores[criterion] = min(high, max(low, int(round(float(value)))))
+                except (TypeError, ValueError, OverflowError):
+                    scores[criterion] = None
+            validated.append(scores)
+        
+        return validated
+    
+    def _parse_scale(self, scale: str) -> Tuple[int, int]:
+        """Turn a scale such as "0-20" into its (low, high) bounds."""
+        match = re.match(r'\s*(\d+)\s*-\s*(\d+)', scale)
+        if not match:
+            raise ValueError(f"Invalid scoring scale: {scale}")
+        return int(match.group(1)), int(match.group(2))
+    
     def generate_text(self, 
                      prompt: str, 
                      system_prompt: str = "You are a helpful AI assistant.",
@@ -181,59 +651,71 @@ class LLMClient:
             system_prompt: The system prompt (role setting)
             temperature: Controls randomness (0-1)
             max_tokens: Maximum number of tokens to generate
-            
+        
         Returns:
             Generated text as a string
         """
         if self.use_mock:
-            # Return mock data based on the prompt
-            if "interview questions" in prompt.lower():
-                return json.dumps([
-                    {"question": "Tell me about your experience with frontend development.", "type": "experience", "skill_assessed": "technical_knowledge"},
-                    {"question": "How do you handle difficult team dynamics?", "type": "behavioral", "skill_assessed": "collaboration"},
-                    {"question": "Describe a challenging project you worked on.", "type": "behavioral", "skill_assessed": "problem_solving"},
-                    {"question": "How do you stay updated with the latest technologies?", "type": "behavioral", "skill_assessed": "learning"},
-                    {"question": "What's your approach to responsive design?", "type": "technical", "skill_assessed": "frontend_skills"}
-                ])
-            elif "analyze response" in prompt.lower():
-                return json.dumps({
-                    "relevance_score": 8,
-                    "content_score": 7,
-                    "communication_score": 9,
-                    "scores": {
-                        "empathy": 8,
-                        "collaboration": 9,
-                        "confidence": 7,
-                        "english_proficiency": 8,
-                        "professionalism": 9
-                    },
-                    "feedback": "Good response that demonstrates strong communication skills. Consider providing more specific examples."
-                })
-            elif "extract skills" in prompt.lower() or "resume" in prompt.lower():
-                return json.dumps({
-                    "skills": ["JavaScript", "React", "CSS", "HTML", "Node.js"],
-                    "experience": [
-                        {"role": "Senior Frontend Developer", "company": "Tech Co", "duration": "3 years"},
-                        {"role": "Frontend Developer", "company": "Web Solutions", "duration": "2 years"}
-                    ],
-                    "education": [
-                        {"degree": "BSc Computer Science", "institution": "University Tech", "year": 2018}
-                    ]
-                })
-            else:
-                return "I don't have specific mock data for this prompt type."
+            return self._mock_generate_text(prompt)
         else:
             # Use real OpenAI API
-            response = self.client.chat.completions.create(
-                model="gpt-4o",  # Can be configured from env var later
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens
+            return self.cassette.call(
+                "llm",
+                self._cassette_request(GENERATION_MODEL, system_prompt, prompt, temperature, max_tokens),
+                lambda: self.scheduler.call(
+                    GENERATION_MODEL,
+                    lambda: self.client.chat.completions.create(
+                        model=GENERATION_MODEL,
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        **self._request_options()
+                    ),
+                    self._estimate_tokens([system_prompt, prompt], max_tokens)
+                ).choices[0].message.content,
+                label=GENERATION_MODEL
             )
-            return response.choices[0].message.content
+    
+    def _mock_generate_text(self, prompt: str) -> str:
+        """Return mock data based on the prompt."""
+        if "interview questions" in prompt.lower():
+            return json.dumps([
+                {"question": "Tell me about your experience with frontend development.", "type": "experience", "skill_assessed": "technical_knowledge"},
+                {"question": "How do you handle difficult team dynamics?", "type": "behavioral", "skill_assessed": "collaboration"},
+                {"question": "Describe a challenging project you worked on.", "type": "behavioral", "skill_assessed": "problem_solving"},
+                {"question": "How do you stay updated with the latest technologies?", "type": "behavioral", "skill_assessed": "learning"},
+                {"question": "What's your approach to responsive design?", "type": "technical", "skill_assessed": "frontend_skills"}
+            ])
+        elif "analyze response" in prompt.lower():
+            return json.dumps({
+                "relevance_score": 8,
+                "content_score": 7,
+                "communication_score": 9,
+                "scores": {
+                    "empathy": 8,
+                    "collaboration": 9,
+                    "confidence": 7,
+                    "english_proficiency": 8,
+                    "professionalism": 9
+                },
+                "feedback": "Good response that demonstrates strong communication skills. Consider providing more specific examples."
+            })
+        elif "extract skills" in prompt.lower() or "resume" in prompt.lower():
+            return json.dumps({
+                "skills": ["JavaScript", "React", "CSS", "HTML", "Node.js"],
+                "experience": [
+                    {"role": "Senior Frontend Developer", "company": "Tech Co", "duration": "3 years"},
+                    {"role": "Frontend Developer", "company": "Web Solutions", "duration": "2 years"}
+                ],
+                "education": [
+                    {"degree": "BSc Computer Science", "institution": "University Tech", "year": 2018}
+                ]
+            })
+        else:
+            return "I don't have specific mock data for this prompt type."
     
     def classify_text(self, text: str, categories: List[str]) -> str:
         """
@@ -242,7 +724,7 @@ class LLMClient:
         Args:
             text: The text to classify
             categories: List of possible categories
-            
+        
         Returns:
             The selected category
         """
@@ -254,13 +736,331 @@ class LLMClient:
                 return "unknown"
         else:
             # Use real OpenAI API
-            prompt = f"Classify the following text into exactly one of these categories: {', '.join(categories)}.\n\nText: {text}\n\nCategory:"
+            prompt = self._classification_prompt(text, categories)
             response = self.generate_text(prompt, "You are a classification assistant. Respond with only the category name.", 0.1, 20)
+            return self._match_category(response, categories)
+    
+    def _classification_prompt(self, text: str, categories: List[str]) -> str:
+        return f"Classify the following text into exactly one of these categories: {', '.join(categories)}.\n\nText: {text}\n\nCategory:"
+    
+    def _match_category(self, response: str, categories: List[str]) -> str:
+        # Check if the response matches any of the categories
+        for category in categories:
+            if category.lower() in response.lower():
+                return category
+        
+        # If no match, return the first category as a fallback
+        return categories[0] if categories else "unknown"
+    
+    # Async API
+    #
+    # These mirror the blocking methods above but await the HTTP call on the
+    # event loop instead of parking a threadpool worker. Each model has its own
+    # semaphore (LLM_CONCURRENCY_LIMIT / LLM_MODEL_CONCURRENCY_LIMITS) so one
+    # loop can keep many requests in flight without overrunning a provider.
+    
+    async def _achat(self,
+                     model_name: str,
+                     messages: List[Dict[str, str]],
+                     temperature: float,
+                     max_tokens: Optional[int] = None) -> str:
+        """Send one chat completion through the scheduler, the model's async pool and its semaphore."""
+        client = None if self.cassette.replaying else self.get_async_client(model_name)
+        params = {"model": model_name, "messages": messages, "temperature": temperature}
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        
+        async def send():
+            async with self.concurrency.slot(model_name):
+                return await self.hedging.atimed(
+                    model_name, lambda: client.chat.completions.create(**params, **self._request_options())
+                )
+        
+        async def complete():
+            response = await self.scheduler.acall(model_name, send, tokens)
+            return response.choices[0].message.content
+        
+        tokens = self._estimate_tokens([m["content"] for m in messages], max_tokens)
+        request = self._cassette_request(model_name, messages[0]["content"], messages[1]["content"],
+                                         temperature, max_tokens)
+        return await self.cassette.acall("llm", request, complete, label=model_name)
+    
+    async def asimple_prompt(self,
+                             system_prompt: str,
+                             user_prompt: str,
+                             model_name: Optional[str] = None,
+                             temperature: float = 0.2,
+                             use_cache: bool = True,
+                             validate: Optional[Callable[[str], Any]] = None) -> str:
+        """
+        Async version of simple_prompt.
+        
+        Args:
+            system_prompt: Instructions for the LLM
+            user_prompt: User's specific query
+            model_name: Optional specific model to use
+            temperature: Sampling temperature
+            use_cache: Set to False to bypass the cache for this call
+            validate: Called on the response; responses it raises on are not cached
+        
+        Returns:
+            String response from the LLM
+        """
+        model_name = self._resolve_model_name(model_name)
+        cache_key = make_cache_key(model_name, system_prompt, user_prompt, temperature)
+        
+        if use_cache:
+            cached = self._cache_lookup(cache_key, model_name, validate)
+            if cached is not None:
+                return cached
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+        
+        async def invoke():
+            content = await self.hedging.acall(
+                model_name,
+                lambda model: self._achat(model, messages, temperature)
+            )
+            if use_cache and self._is_valid(content, validate):
+                self.cache.set(cache_key, content)
+            return content
+        
+        content = await self.single_flight.ado(cache_key, invoke)
+        return LLMResponse(content, cache_hit=False)
+    
+    async def astructured_prompt(self,
+                                 system_prompt: str,
+                                 user_prompt: str,
+                                 model_name: Optional[str] = None,
+                                 use_cache: bool = True) -> Dict[str, Any]:
+        """
+        Async version of structured_prompt.
+        
+        Args:
+            system_prompt: Instructions for the LLM
+            user_prompt: User's specific query
+            model_name: Optional specific model to use
+            use_cache: Set to False to bypass the response cache for this call
+        
+        Returns:
+            Dictionary parsed from JSON response
+        """
+        response_text = await self.asimple_prompt(
+            self._json_system_prompt(system_prompt), user_prompt, model_name,
+            use_cache=use_cache, validate=self._parse_json_response
+        )
+        return self._parse_json_response(response_text)
+    
+    async def astream_structured_prompt(self,
+                                        system_prompt: str,
+                                        user_prompt: str,
+                                        model_name: Optional[str] = None,
+                                        use_cache: bool = True) -> AsyncIterator[Any]:
+        """
+        Async version of stream_structured_prompt. The model's concurrency slot
+        is held for the whole stream.
+        
+        Args:
+            system_prompt: Instructions for the LLM
+            user_prompt: User's specific query
+            model_name: Optional specific model to use
+            use_cache: Set to False to bypass the response cache for this call
             
-            # Check if the response matches any of the categories
-            for category in categories:
-                if category.lower() in response.lower():
-                    return category
-                    
-            # If no match, return the first category as a fallback
-            return categories[0] if categories else "unknown" 
\ No newline at end of file
+        Yields:
+            Each completed array element
+        """
+        system_prompt = self._json_system_prompt(system_prompt)
+        model_name = self._resolve_model_name(model_name)
+        cache_key = make_cache_key(model_name, system_prompt, user_prompt, 0.2)
+        parser = IncrementalJSONParser()
+        
+        if use_cache:
+            cached = self._cache_lookup(cache_key, model_name, self._parse_streamed_json)
+            if cached is not None:
+                for element in parser.feed(cached):
+                    yield element
+                return
+        
+        request = self._cassette_request(model_name, system_prompt, user_prompt, 0.2)
+        if self.cassette.replaying:
+            content, delay = self.cassette.replay("llm", request)
+            await asyncio.sleep(delay)
+            for element in parser.feed(content):
+                yield element
+            parser.result()
+            return
+        
+        client = self.get_async_client(model_name)
+        
+        async def open_stream():
+            # Each attempt takes its own slot and gives it back if opening fails
+            slot = AsyncExitStack()
+            await slot.enter_async_context(self.concurrency.slot(model_name))
+            try:
+                stream = await client.chat.completions.create(
+                    model=model_name,
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.2,
+                    stream=True,
+                    **self._request_options()
+                )
+                # Rate limits and server errors surface on the first event, so it is read inside the retried call
+                first = await stream.__anext__()
+            except StopAsyncIteration:
+                first = None
+            except BaseException:
+                await slot.aclose()
+                raise
+            return slot, stream, first
+        
+        started = time.perf_counter()
+        slot, stream, first = await self.scheduler.acall(
+            model_name, open_stream, self._estimate_tokens([system_prompt, user_prompt])
+        )
+        chunks = []
+        
+        def feed(event) -> List[Any]:
+            if not event.choices:
+                return []
+            content = event.choices[0].delta.content or ""
+            chunks.append(content)
+            return parser.feed(content)
+        
+        async with slot:
+            if first is not None:
+                for element in feed(first):
+                    yield element
+                async for event in stream:
+                    for element in feed(event):
+                        yield element
+        
+        parser.result()  # Raises if the response never closed its JSON, before anything is cached
+        content = "".join(chunks)
+        if self.cassette.recording:
+            self.cassette.record("llm", request, content, time.perf_counter() - started, model_name)
+        if use_cache:
+            self.cache.set(cache_key, content)
+    
+    async def aanalyze_text_with_score(self,
+                                       text: str,
+                                       criteria: str,
+                                       scale: str = "0-20",
+                                       model_name: Optional[str] = None) -> int:
+        """
+        Async version of analyze_text_with_score.
+        
+        Args:
+            text: Text to analyze
+            criteria: What to evaluate in the text
+            scale: The scoring scale (default "0-20")
+            model_name: Optional specific model to use
+        
+        Returns:
+            Integer score
+        """
+        response = await self.asimple_prompt(self._score_system_prompt(criteria, scale), text, model_name)
+        return self._extract_score(response)
+    
+    async def aanalyze_text_with_scores(self,
+                                        text: str,
+                                        criteria: List[str],
+                                        scale: str = "0-20",
+                                        model_name: Optional[str] = None) -> Dict[str, int]:
+        """
+        Async version of analyze_text_with_scores.
+        
+        Args:
+            text: Text to analyze
+            criteria: What to evaluate in the text
+            scale: The scoring scale (default "0-20")
+            model_name: Optional specific model to use
+        
+        Returns:
+            Dictionary mapping each criterion to its integer score
+        """
+        return (await self.aanalyze_texts_with_scores([(text, criteria)], scale, model_name))[0]
+    
+    async def aanalyze_texts_with_scores(self,
+                                         items: List[Tuple[str, List[str]]],
+                                         scale: str = "0-20",
+                                         model_name: Optional[str] = None) -> List[Dict[str, int]]:
+        """
+        Async version of analyze_texts_with_scores. Chunks are sent concurrently.
+        
+        Args:
+            items: List of (text, criteria) pairs
+            scale: The scoring scale (default "0-20")
+            model_name: Optional specific model to use
+        
+        Returns:
+            One dictionary of criterion -> score per input pair, in input order
+        """
+        async def score_chunk(chunk):
+            response = await self.astructured_prompt(
+                self._batch_score_system_prompt(scale),
+                self._batch_score_user_prompt(chunk),
+                model_name
+            )
+            chunk_scores = self._validate_batch_scores(response, chunk, scale)
+            for (text, criteria), scores in zip(chunk, chunk_scores):
+                for criterion in criteria:
+                    if scores[criterion] is None:
+                        scores[criterion] = await self.aanalyze_text_with_score(text, criterion, scale, model_name)
+            return chunk_scores
+        
+        chunk_results = await asyncio.gather(*[score_chunk(chunk) for chunk in self._chunk_score_items(items, scale)])
+        return [scores for chunk_scores in chunk_results for scores in chunk_scores]
+    
+    async def agenerate_text(self,
+                             prompt: str,
+                             system_prompt: str = "You are a helpful AI assistant.",
+                             temperature: float = 0.7,
+                             max_tokens: int = 500) -> str:
+        """
+        Async version of generate_text.
+        
+        Args:
+            prompt: The prompt to send to the model
+            system_prompt: The system prompt (role setting)
+            temperature: Controls randomness (0-1)
+            max_tokens: Maximum number of tokens to generate
+        
+        Returns:
+            Generated text as a string
+        """
+        if self.use_mock:
+            return self._mock_generate_text(prompt)
+        
+        return await self._achat(
+            GENERATION_MODEL,
+            [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature,
+            max_tokens
+        )
+    
+    async def aclassify_text(self, text: str, categories: List[str]) -> str:
+        """
+        Async version of classify_text.
+        
+        Args:
+            text: The text to classify
+            categories: List of possible categories
+        
+        Returns:
+            The selected category
+        """
+        if self.use_mock:
+            return categories[0] if categories else "unknown" 
+        
+        prompt = self._classification_prompt(text, categories)
+        response = await self.agenerate_text(prompt, "You are a classification assistant. Respond with only the category name.", 0.1, 20)
+        return self._match_category(response, categories)
@@ -0,0 +1,294 @@
+import os
+import time
+import json
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+
+class LLMResponse(str):
+    """String response from the LLM that also records whether it came from the cache."""
+
+    def __new__(cls, content: str, cache_hit: bool = False, cache_tier: Optional[str] = None):
+        response = super(LLMResponse, cls).__new__(cls, content)
+        response.cache_hit = cache_hit
+        response.cache_tier = cache_tier
+        return response
+
+
+def make_cache_key(model_name: str, system_prompt: str, user_prompt: str, temperature: float) -> str:
+    """
+    Build a content-addressed cache key for a prompt.
+
+    Args:
+        model_name: Model the prompt is sent to
+        system_prompt: System instructions
+        user_prompt: User query
+        temperature: Sampling temperature
+
+    Returns:
+        SHA-256 hex digest of the prompt contents
+    """
+    payload = json.dumps([model_name, system_prompt, user_prompt, float(temperature)], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheTier:
+    """In-memory LRU tier with size- and TTL-based eviction."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self.ttl > 0 and time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, stored_at: Optional[float] = None):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (stored_at or time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCacheTier:
+    """
+    Persistent on-disk tier backed by SQLite with size- and TTL-based eviction.
+
+    Prompts and responses contain resume and interview text, so the database
+    is created readable by its owner only. Eviction runs in batches once the
+    table outgrows max_entries, not on every write.
+    """
+
+    # Share of max_entries removed per eviction pass
+    EVICT_FRACTION = 0.1
+    # Minimum seconds between sweeps for expired rows (expired rows are never served)
+    PURGE_INTERVAL = 300.0
+
+    def __init__(self, path: str, max_entries: int, ttl: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        # SQLite gives its -wal/-shm files the database file's permissions
+        os.close(os.open(path, os.O_CREAT | os.O_RDWR, 0o600))
+        os.chmod(path, 0o600)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_accessed ON llm_cache (accessed_at)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        self._purged_at = time.time()
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            if self.ttl > 0 and now - stored_at > self.ttl:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return stored_at, value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now)
+            )
+            if not exists:
+                self._count += 1
+            if self.ttl > 0 and now - self._purged_at > self.PURGE_INTERVAL:
+                self._purge_expired(now)
+            if self.max_entries > 0 and self._count > self.max_entries:
+                self._evict(now)
+            self._conn.commit()
+
+    def _purge_expired(self, now: float):
+        self._conn.execute("DELETE FROM llm_cache WHERE stored_at < ?", (now - self.ttl,))
+        self._count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        self._purged_at = now
+
+    def _evict(self, now: float):
+        # Other processes may share the file, so recount before deciding
+        if self.ttl > 0:
+            self._purge_expired(now)
+        else:
+            self._count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if self._count <= self.max_entries:
+            return
+        # Drop the least recently used rows, down to a margin below the limit
+        excess = self._count - self.max_entries + max(1, int(self.max_entries * self.EVICT_FRACTION))
+        self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            " SELECT key FROM llm_cache ORDER BY accessed_at LIMIT ?)",
+            (excess,)
+        )
+        self._count = max(0, self._count - excess)
+
+    def delete(self, key: str):
+        with self._lock:
+            if self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,)).rowcount:
+                self._count -= 1
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self._count = 0
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+class LLMResponseCache:
+    """
+    Two-tier (memory, then disk) cache for LLM responses keyed on prompt content.
+
+    The disk tier keeps prompts and responses across restarts, so it is only
+    enabled when LLM_CACHE_PATH names a file for it.
+    """
+
+    def __init__(self):
+        self.enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.memory = MemoryCacheTier(
+            max_entries=int(os.getenv("LLM_CACHE_MEMORY_SIZE", "1024")),
+            ttl=float(os.getenv("LLM_CACHE_MEMORY_TTL", "3600"))
+        )
+
+        disk_path = os.getenv("LLM_CACHE_PATH", "")
+        self.disk = None
+        if self.enabled and disk_path:
+            try:
+                self.disk = SQLiteCacheTier(
+                    disk_path,
+                    max_entries=int(os.getenv("LLM_CACHE_DISK_SIZE", "50000")),
+                    ttl=float(os.getenv("LLM_CACHE_DISK_TTL", str(7 * 24 * 3600)))
+                )
+            except (sqlite3.Error, OSError) as e:
+                print(f"WARNING: Disk LLM cache disabled, could not open {disk_path}: {e}")
+
+        self._lock = threading.Lock()
+        self.hits = {"memory": 0, "disk": 0}
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Look a key up in the memory tier, then the disk tier.
+
+        Args:
+            key: Cache key from make_cache_key
+
+        Returns:
+            Tuple of (cached value or None, tier name or None)
+        """
+        if not self.enabled:
+            return None, None
+
+        value = self.memory.get(key)
+        if value is not None:
+            self._record("memory")
+            return value, "memory"
+
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                # Promote to memory so repeats stay off the disk
+                self.memory.set(key, value, stored_at)
+                self._record("disk")
+                return value, "disk"
+
+        self._record(None)
+        return None, None
+
+    def set(self, key: str, value: str):
+        """Store a response in both tiers."""
+        if not self.enabled:
+            return
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def delete(self, key: str):
+        """Drop one response from both tiers."""
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def clear(self):
+        """Drop every cached response from both tiers."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def _record(self, tier: Optional[str]):
+        with self._lock:
+            if tier is None:
+                self.misses += 1
+            else:
+                self.hits[tier] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier sizes."""
+        with self._lock:
+            hits = sum(self.hits.values())
+            lookups = hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "memory_hits": self.hits["memory"],
+                "disk_hits": self.hits["disk"],
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self.memory),
+                "disk_entries": len(self.disk) if self.disk is not None else 0
+            }
@@ -0,0 +1,249 @@
+import os
+import time
+import asyncio
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+
+class LatencyTracker:
+    """Keeps a rolling window of successful call latencies per model."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, model_name: str, seconds: float):
+        """Record the latency of one successful call."""
+        with self._lock:
+            samples = self._samples.get(model_name)
+            if samples is None:
+                samples = deque(maxlen=self.window)
+                self._samples[model_name] = samples
+            samples.append(seconds)
+
+    def count(self, model_name: str) -> int:
+        with self._lock:
+            return len(self._samples.get(model_name, ()))
+
+    def percentile(self, model_name: str, percentile: float) -> Optional[float]:
+        """
+        Get a latency percentile for a model.
+
+        Args:
+            model_name: Model identifier
+            percentile: Percentile between 0 and 100
+
+        Returns:
+            Latency in seconds, or None if the model has no samples yet
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(model_name, ()))
+        if not samples:
+            return None
+        rank = min(len(samples) - 1, max(0, int(round(percentile / 100 * (len(samples) - 1)))))
+        return samples[rank]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return sample counts and p50/p95 latency per model."""
+        with self._lock:
+            model_names = list(self._samples)
+        return {
+            model_name: {
+                "samples": self.count(model_name),
+                "p50": self.percentile(model_name, 50),
+                "p95": self.percentile(model_name, 95)
+            }
+            for model_name in model_names
+        }
+
+
+class HedgingPolicy:
+    """
+    Sends a prompt to a secondary model when the primary is slower than usual.
+
+    If the primary has not answered within LLM_HEDGE_PERCENTILE of its observed
+    latency (LLM_HEDGE_INITIAL_DELAY until LLM_HEDGE_MIN_SAMPLES calls have been
+    seen), the same request is sent to the secondary model and the first
+    non-empty answer wins. A primary that fails outright falls back to the
+    secondary immediately.
+
+    The latency history is fed by timed()/atimed(), which callers wrap around
+    the upstream request only, so throttling does not trigger hedges.
+
+    Secondaries come from LLM_HEDGE_MODELS ("primary=secondary,...") or
+    LLM_HEDGE_FALLBACK_MODEL; models without one are never hedged.
+    """
+
+    def __init__(self):
+        self.percentile = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+        self.min_samples = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+        self.initial_delay = float(os.getenv("LLM_HEDGE_INITIAL_DELAY", "15"))
+        self.fallback_model = os.getenv("LLM_HEDGE_FALLBACK_MODEL", "")
+        self.secondaries: Dict[str, str] = {}
+        for entry in os.getenv("LLM_HEDGE_MODELS", "").split(","):
+            if "=" in entry:
+                primary, secondary = entry.split("=", 1)
+                self.secondaries[primary.strip()] = secondary.strip()
+
+        self.latency = LatencyTracker(int(os.getenv("LLM_LATENCY_WINDOW", "200")))
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("LLM_HEDGE_WORKERS", "16")),
+            thread_name_prefix="llm-hedge"
+        )
+        self._lock = threading.Lock()
+        self.hedges_sent = 0
+        self.wins = {"primary": 0, "secondary": 0}
+
+    def set_secondary(self, model_name: str, secondary: Optional[str]):
+        """Configure (or with None, remove) the secondary model for a primary."""
+        with self._lock:
+            if secondary:
+                self.secondaries[model_name] = secondary
+            else:
+                self.secondaries.pop(model_name, None)
+
+    def secondary_for(self, model_name: str) -> Optional[str]:
+        secondary = self.secondaries.get(model_name, self.fallback_model)
+        return secondary if secondary and secondary != model_name else None
+
+    def delay_for(self, model_name: str) -> float:
+        """Seconds to wait for the primary before hedging."""
+        if self.latency.count(model_name) < self.min_samples:
+            return self.initial_delay
+        return self.latency.percentile(model_name, self.percentile)
+
+    def timed(self, model_name: str, fn: Callable[[], Any]) -> Any:
+        """
+        Run one upstream request and record its latency if it succeeds.
+
+        Callers wrap the request itself (inside the scheduler), so rate-limit
+        queueing and retry backoff are not counted as model latency.
+        """
+        started = time.perf_counter()
+        result = fn()
+        self.latency.record(model_name, time.perf_counter() - started)
+        return result
+
+    async def atimed(self, model_name: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async version of timed."""
+        started = time.perf_counter()
+        result = await fn()
+        self.latency.record(model_name, time.perf_counter() - started)
+        return result
+
+    def _record_win(self, role: str):
+        with self._lock:
+            self.wins[role] += 1
+
+    def _record_hedge(self):
+        with self._lock:
+            self.hedges_sent += 1
+
+    def call(self, model_name: str, fn: Callable[[str], str]) -> str:
+        """
+        Run fn(model) with hedging on worker threads.
+
+        Threads cannot be interrupted, so a losing request runs to completion
+        in the background and its answer is discarded.
+
+        Args:
+            model_name: Primary model
+            fn: Callable sending the request to the given model and returning the answer
+
+        Returns:
+            The first good answer
+        """
+        secondary = self.secondary_for(model_name)
+        if secondary is None:
+            return fn(model_name)
+
+        primary_future = self._executor.submit(contextvars.copy_context().run, fn, model_name)
+        done, _ = wait([primary_future], timeout=self.delay_for(model_name))
+        errors = []
+        if done:
+            if primary_future.exception() is None and _is_good(primary_future.result()):
+                self._record_win("primary")
+                return primary_future.result()
+            errors.append(primary_future.exception() or ValueError(f"Empty response from {model_name}"))
+
+        self._record_hedge()
+        secondary_future = self._executor.submit(contextvars.copy_context().run, fn, secondary)
+        roles = {primary_future: "primary", secondary_future: "secondary"}
+        pending = {secondary_future} if done else {primary_future, secondary_future}
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and _is_good(future.result()):
+                    for loser in pending:
+                        loser.cancel()
+                    self._record_win(roles[future])
+                    return future.result()
+                errors.append(future.exception() or ValueError("Empty response from hedged model"))
+
+        raise errors[0]
+
+    async def acall(self, model_name: str, fn: Callable[[str], Awaitable[str]]) -> str:
+        """
+        Async version of call. The losing request is cancelled.
+
+        Args:
+            model_name: Primary model
+            fn: Callable returning an awaitable that sends the request to the given model
+
+        Returns:
+            The first good answer
+        """
+        secondary = self.secondary_for(model_name)
+        if secondary is None:
+            return await fn(model_name)
+
+        primary_task = asyncio.ensure_future(fn(model_name))
+        tasks = [primary_task]
+        try:
+            done, _ = await asyncio.wait([primary_task], timeout=self.delay_for(model_name))
+            errors = []
+            if done:
+                if primary_task.exception() is None and _is_good(primary_task.result()):
+                    self._record_win("primary")
+                    return primary_task.result()
+                errors.append(primary_task.exception() or ValueError(f"Empty response from {model_name}"))
+
+            self._record_hedge()
+            secondary_task = asyncio.ensure_future(fn(secondary))
+            tasks.append(secondary_task)
+            roles = {primary_task: "primary", secondary_task: "secondary"}
+            pending = {secondary_task} if done else {primary_task, secondary_task}
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and _is_good(task.result()):
+                        self._record_win(roles[task])
+                        return task.result()
+                    errors.append(task.exception() or ValueError("Empty response from hedged model"))
+        finally:
+            # Cancel the loser (or everything, if we were cancelled ourselves)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        raise errors[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hedge counts and per-model latency percentiles."""
+        with self._lock:
+            return {
+                "hedges_sent": self.hedges_sent,
+                "primary_wins": self.wins["primary"],
+                "secondary_wins": self.wins["secondary"],
+                "latency": self.latency.stats()
+            }
+
+
+def _is_good(result: Any) -> bool:
+    return isinstance(result, str) and bool(result.strip())
@@ -0,0 +1,388 @@
+import os
+import asyncio
+import threading
+from collections import deque
+from typing import Deque, Dict, Any, Callable, Optional, Tuple
+
+import httpx
+
+
+class PooledHTTPTransport(httpx.HTTPTransport):
+    """HTTP transport that counts how often pooled connections are reused."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._seen_connections = set()
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        response = super().handle_request(request)
+
+        # httpcore exposes the live connections on the pool; a connection we
+        # have not seen before means this request had to open a new socket.
+        with self._lock:
+            self.requests += 1
+            current = {id(conn) for conn in self._pool.connections}
+            new_connections = current - self._seen_connections
+            if new_connections:
+                self.connections_opened += len(new_connections)
+            else:
+                self.connections_reused += 1
+            self._seen_connections = current
+
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        """Return connection counters for this transport."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.connections_reused,
+                "open_connections": len(self._pool.connections)
+            }
+
+
+class PooledAsyncHTTPTransport(httpx.AsyncHTTPTransport):
+    """Async HTTP transport that counts how often pooled connections are reused."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._seen_connections = set()
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await super().handle_async_request(request)
+
+        # Only touched from the owning event loop, so no lock is needed
+        self.requests += 1
+        current = {id(conn) for conn in self._pool.connections}
+        new_connections = current - self._seen_connections
+        if new_connections:
+            self.connections_opened += len(new_connections)
+        else:
+            self.connections_reused += 1
+        self._seen_connections = current
+
+        return response
+
+    def stats(self) -> Dict[str, int]:
+        """Return connection counters for this transport."""
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+            "open_connections": len(self._pool.connections)
+        }
+
+
+class ResizableSemaphore:
+    """
+    asyncio semaphore whose limit can change while slots are held.
+
+    Raising the limit admits waiters straight away; lowering it lets the
+    requests already in flight finish and admits no one until the in-use
+    count is below the new limit. Waiters are admitted in FIFO order. Bound
+    to one event loop, like asyncio.Semaphore.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    def locked(self) -> bool:
+        return self.in_use >= self.limit
+
+    async def acquire(self):
+        if self.in_use < self.limit and not self._waiters:
+            self.in_use += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # _wake() counts the slot as in use before resolving the future
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self):
+        self.in_use -= 1
+        self._wake()
+
+    def resize(self, limit: int):
+        self.limit = limit
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_use < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_use += 1
+                waiter.set_result(None)
+
+
+class ModelConcurrencyLimiter:
+    """Per-model asyncio semaphores bounding how many requests each model has in flight."""
+
+    def __init__(self):
+        self.default_limit = int(os.getenv("LLM_CONCURRENCY_LIMIT", "32"))
+        self._limits: Dict[str, int] = {}
+        self._semaphores: Dict[str, Tuple[Any, ResizableSemaphore]] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        # LLM_MODEL_CONCURRENCY_LIMITS="anthropic/claude-3-opus=4,google/gemini-1.5-pro=16"
+        for entry in os.getenv("LLM_MODEL_CONCURRENCY_LIMITS", "").split(","):
+            if "=" in entry:
+                model_name, limit = entry.rsplit("=", 1)
+                self._limits[model_name.strip()] = int(limit)
+
+    def set_limit(self, model_name: str, limit: int):
+        """
+        Change the concurrency limit for a model.
+
+        The model's existing semaphore is resized rather than replaced, so
+        slots already held still count against the new limit.
+
+        Args:
+            model_name: Model identifier
+            limit: Maximum number of in-flight requests
+        """
+        with self._lock:
+            self._limits[model_name] = limit
+            entry = self._semaphores.get(model_name)
+        if entry is None:
+            return
+        loop, semaphore = entry
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            semaphore.resize(limit)
+        elif not loop.is_closed():
+            # The semaphore belongs to another thread's loop; resize it there
+            loop.call_soon_threadsafe(semaphore.resize, limit)
+
+    def get_limit(self, model_name: str) -> int:
+        """Return the concurrency limit configured for a model."""
+        return self._limits.get(model_name, self.default_limit)
+
+    def semaphore(self, model_name: str) -> ResizableSemaphore:
+        """
+        Get the semaphore for a model on the running event loop.
+
+        Args:
+            model_name: Model identifier
+
+        Returns:
+            ResizableSemaphore sized to the model's limit
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._semaphores.get(model_name)
+            if entry is None or entry[0] is not loop:
+                entry = (loop, ResizableSemaphore(self.get_limit(model_name)))
+                self._semaphores[model_name] = entry
+            return entry[1]
+
+    def slot(self, model_name: str) -> "_ConcurrencySlot":
+        """Return an async context manager that holds one of the model's slots."""
+        return _ConcurrencySlot(self, model_name)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Return the limit and current in-flight count per model."""
+        with self._lock:
+            return {
+                model_name: {"limit": self.get_limit(model_name), "in_flight": in_flight}
+                for model_name, in_flight in self._in_flight.items()
+            }
+
+
+class _ConcurrencySlot:
+    def __init__(self, limiter: ModelConcurrencyLimiter, model_name: str):
+        self.limiter = limiter
+        self.model_name = model_name
+        self._semaphore = None
+
+    async def __aenter__(self):
+        self._semaphore = self.limiter.semaphore(self.model_name)
+        await self._semaphore.acquire()
+        with self.limiter._lock:
+            self.limiter._in_flight[self.model_name] = self.limiter._in_flight.get(self.model_name, 0) + 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        with self.limiter._lock:
+            self.limiter._in_flight[self.model_name] -= 1
+        self._semaphore.release()
+
+
+class ModelClientRegistry:
+    """Keeps one long-lived chat model per (model, temperature) and one bounded HTTP pool per model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: Dict[Tuple[str, float], Any] = {}
+        self._http_clients: Dict[str, httpx.Client] = {}
+        self._transports: Dict[str, PooledHTTPTransport] = {}
+        # model -> (event loop, API client, the httpx.AsyncClient under it)
+        self._async_clients: Dict[str, Tuple[Any, Any, httpx.AsyncClient]] = {}
+        self._async_transports: Dict[str, PooledAsyncHTTPTransport] = {}
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+
+        self.max_connections = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "10"))
+        self.max_keepalive = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", str(self.max_connections)))
+        self.keepalive_expiry = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "60"))
+        self.timeout = float(os.getenv("LLM_REQUEST_TIMEOUT", "120"))
+
+    def get_http_client(self, model_name: str) -> httpx.Client:
+        """
+        Get the shared keep-alive HTTP client for a model, creating it on first use.
+
+        Args:
+            model_name: Model the client is dedicated to
+
+        Returns:
+            httpx.Client with a bounded connection pool
+        """
+        with self._lock:
+            return self._get_http_client_locked(model_name)
+
+    def _get_http_client_locked(self, model_name: str) -> httpx.Client:
+        http_client = self._http_clients.get(model_name)
+        if http_client is None:
+            transport = PooledHTTPTransport(limits=self._limits())
+            http_client = httpx.Client(transport=transport, timeout=self.timeout)
+            self._transports[model_name] = transport
+            self._http_clients[model_name] = http_client
+        return http_client
+
+    def _limits(self, max_connections: Optional[int] = None) -> httpx.Limits:
+        max_connections = max_connections or self.max_connections
+        return httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(self.max_keepalive, max_connections),
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def get_async(self, model_name: str, factory: Callable[[httpx.AsyncClient], Any],
+                  max_connections: Optional[int] = None) -> Any:
+        """
+        Get the async API client for a model on the running event loop.
+
+        Async connection pools cannot be shared between event loops, so a new
+        client is built if the running loop differs from the one it was made on;
+        the replaced client is closed on its own loop.
+
+        Args:
+            model_name: Model identifier
+            factory: Callable that builds the API client from an httpx.AsyncClient
+            max_connections: Pool size; should match the model's concurrency limit
+
+        Returns:
+            The pooled async API client
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._async_clients.get(model_name)
+            if entry is not None and entry[0] is loop:
+                self._hits[model_name] = self._hits.get(model_name, 0) + 1
+                return entry[1]
+
+            self._misses[model_name] = self._misses.get(model_name, 0) + 1
+            if entry is not None:
+                _close_async_client(entry)
+            transport = PooledAsyncHTTPTransport(limits=self._limits(max_connections))
+            http_client = httpx.AsyncClient(transport=transport, timeout=self.timeout)
+            client = factory(http_client)
+            self._async_clients[model_name] = (loop, client, http_client)
+            self._async_transports[model_name] = transport
+            return client
+
+    def get(self, model_name: str, temperature: float, factory: Callable[[httpx.Client], Any]) -> Any:
+        """
+        Get the cached chat model for (model, temperature), building it on a miss.
+
+        Args:
+            model_name: Model identifier
+            temperature: Sampling temperature
+            factory: Callable that builds the chat model from the model's HTTP client
+
+        Returns:
+            The pooled chat model instance
+        """
+        key = (model_name, float(temperature))
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._hits[model_name] = self._hits.get(model_name, 0) + 1
+                return model
+
+            self._misses[model_name] = self._misses.get(model_name, 0) + 1
+            model = factory(self._get_http_client_locked(model_name))
+            self._models[key] = model
+            return model
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return pool hit and connection reuse counters per model."""
+        with self._lock:
+            model_names = set(self._hits) | set(self._misses) | set(self._transports)
+            result = {}
+            for model_name in sorted(model_names):
+                transport = self._transports.get(model_name)
+                async_transport = self._async_transports.get(model_name)
+                result[model_name] = {
+                    "pool_hits": self._hits.get(model_name, 0),
+                    "pool_misses": self._misses.get(model_name, 0),
+                    "temperatures": sorted(t for (m, t) in self._models if m == model_name),
+                    **(transport.stats() if transport else {})
+                }
+                if async_transport:
+                    result[model_name]["async"] = async_transport.stats()
+            return result
+
+    def close(self):
+        """Close every pooled HTTP client and forget the cached models."""
+        with self._lock:
+            for http_client in self._http_clients.values():
+                http_client.close()
+            self._http_clients.clear()
+            self._transports.clear()
+            self._models.clear()
+            for entry in self._async_clients.values():
+                _close_async_client(entry)
+            self._async_clients.clear()
+            self._async_transports.clear()
+
+
+def _close_async_client(entry: Tuple[Any, Any, httpx.AsyncClient]):
+    """
+    Close a pooled async client on the loop that owns its connections.
+
+    A client on the running loop is closed in a task; one on another live loop
+    is closed there. Connections of a closed loop can no longer be closed
+    cleanly, so that client is only dropped.
+    """
+    loop, _, http_client = entry
+    if loop.is_closed():
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        loop.create_task(http_client.aclose())
+    else:
+        asyncio.run_coroutine_threadsafe(http_client.aclose(), loop)
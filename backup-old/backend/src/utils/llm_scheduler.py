@@ -0,0 +1,384 @@
+import os
+import time
+import heapq
+import random
+import asyncio
+import logging
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Priority classes; lower values are admitted first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 1
+PRIORITY_BULK = 2
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_DEFAULT: "default",
+    PRIORITY_BULK: "bulk"
+}
+
+_current_priority = contextvars.ContextVar("llm_priority", default=PRIORITY_DEFAULT)
+
+
+@contextmanager
+def llm_priority(priority: int):
+    """
+    Run the LLM calls made inside the block at the given priority class.
+
+    Works per thread and per asyncio task, so a request handler can mark its
+    calls interactive without threading a parameter through every agent.
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> int:
+    """Return the priority class of the calling context."""
+    return _current_priority.get()
+
+
+_current_deadline = contextvars.ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def llm_deadline(seconds: float):
+    """
+    Bound the LLM calls made inside the block to finish within `seconds`.
+
+    Queueing, retries and the upstream request all stop at the deadline with
+    a TimeoutError. Nested blocks keep the earlier deadline.
+    """
+    deadline = time.monotonic() + seconds
+    current = _current_deadline.get()
+    token = _current_deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the calling context's deadline, or None if it has none."""
+    deadline = _current_deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _wait_within_deadline(wait: Optional[float], model_name: str) -> Optional[float]:
+    """Cap an admission wait at the context's deadline, raising once it has passed."""
+    remaining = remaining_time()
+    if remaining is None:
+        return wait
+    if remaining <= 0:
+        raise TimeoutError(f"LLM call to {model_name} ran out of time waiting for admission")
+    return remaining if wait is None else min(wait, remaining)
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at a per-minute rate.
+
+    A rate of 0 or less means unlimited: nothing waits except after drain().
+    """
+
+    def __init__(self, per_minute: float):
+        self.unlimited = per_minute <= 0
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are now)."""
+        if self.unlimited:
+            return max(0.0, self.blocked_until - now)
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        if not self.unlimited:
+            self.tokens -= min(amount, self.capacity)
+
+    def drain(self, seconds: float):
+        """Empty the bucket so nothing is admitted for roughly `seconds`."""
+        if self.unlimited:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        else:
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class _ModelQueue:
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.heap: List[Tuple[int, int]] = []
+        self.cancelled = set()
+        self.admitted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.retries = 0
+        self.throttled = 0
+
+
+class LLMScheduler:
+    """
+    Admission control in front of the LLM providers.
+
+    Each model has a requests/minute and a tokens/minute bucket (LLM_RPM /
+    LLM_TPM, overridden per model with LLM_MODEL_RATE_LIMITS="model=rpm:tpm,...");
+    unset or 0 means unlimited. Waiting calls are admitted in priority order,
+    then FIFO, and sleep until the head of their queue moves. Calls that fail with
+    429 or 5xx are retried with exponential backoff and full jitter, honouring
+    Retry-After; a 429 also drains the model's request bucket so other callers
+    back off too.
+    """
+
+    def __init__(self):
+        self.default_rpm = float(os.getenv("LLM_RPM", "0"))
+        self.default_tpm = float(os.getenv("LLM_TPM", "0"))
+        self.max_retries = int(os.getenv("LLM_MAX_RETRIES", "4"))
+        self.backoff_base = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+        self.backoff_cap = float(os.getenv("LLM_BACKOFF_CAP", "30"))
+        self._limits: Dict[str, Tuple[float, float]] = {}
+        for entry in os.getenv("LLM_MODEL_RATE_LIMITS", "").split(","):
+            if "=" in entry and ":" in entry:
+                model_name, limits = entry.rsplit("=", 1)
+                rpm, tpm = limits.split(":", 1)
+                self._limits[model_name.strip()] = (float(rpm), float(tpm))
+
+        self._queues: Dict[str, _ModelQueue] = {}
+        self._condition = threading.Condition()
+        # Events of async waiters, set (on their own loop) whenever a queue moves
+        self._async_waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self._sequence = itertools.count()
+
+    def _queue(self, model_name: str) -> _ModelQueue:
+        queue = self._queues.get(model_name)
+        if queue is None:
+            rpm, tpm = self._limits.get(model_name, (self.default_rpm, self.default_tpm))
+            queue = _ModelQueue(rpm, tpm)
+            self._queues[model_name] = queue
+        return queue
+
+    def _enqueue(self, model_name: str, priority: int) -> Tuple[int, int]:
+        with self._condition:
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._queue(model_name).heap, ticket)
+            return ticket
+
+    def _notify(self):
+        """Wake every waiter to re-check its queue. Caller holds the condition."""
+        self._condition.notify_all()
+        for loop, event in self._async_waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def _try_admit(self, model_name: str, ticket: Tuple[int, int], tokens: int, enqueued_at: float) -> Optional[float]:
+        """
+        Admit the ticket if it is at the head and the buckets allow.
+
+        Returns:
+            0 once admitted, the seconds until the buckets allow it at the head,
+            or None when behind another ticket (wait to be notified)
+        """
+        with self._condition:
+            queue = self._queue(model_name)
+            while queue.heap and queue.heap[0] in queue.cancelled:
+                queue.cancelled.discard(heapq.heappop(queue.heap))
+            if queue.heap[0] != ticket:
+                return None
+
+            now = time.monotonic()
+            wait = max(queue.requests.wait_time(1, now), queue.tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+
+            heapq.heappop(queue.heap)
+            queue.requests.consume(1)
+            queue.tokens.consume(tokens)
+            waited = now - enqueued_at
+            queue.admitted += 1
+            queue.total_wait += waited
+            queue.max_wait = max(queue.max_wait, waited)
+            self._notify()
+            return 0.0
+
+    def _cancel(self, model_name: str, ticket: Tuple[int, int]):
+        with self._condition:
+            self._queue(model_name).cancelled.add(ticket)
+            self._notify()
+
+    def acquire(self, model_name: str, tokens: int, priority: Optional[int] = None):
+        """
+        Block until the model's buckets admit a request of `tokens` tokens.
+
+        Args:
+            model_name: Model the request is for
+            tokens: Estimated prompt + completion tokens
+            priority: Priority class; defaults to the calling context's
+        """
+        priority = current_priority() if priority is None else priority
+        ticket = self._enqueue(model_name, priority)
+        enqueued_at = time.monotonic()
+        try:
+            # Checking and waiting under one hold of the condition means no notify is missed
+            with self._condition:
+                while True:
+                    wait = self._try_admit(model_name, ticket, tokens, enqueued_at)
+                    if wait == 0:
+                        return
+                    self._condition.wait(timeout=_wait_within_deadline(wait, model_name))
+        except BaseException:
+            self._cancel(model_name, ticket)
+            raise
+
+    async def aacquire(self, model_name: str, tokens: int, priority: Optional[int] = None):
+        """Async version of acquire."""
+        priority = current_priority() if priority is None else priority
+        ticket = self._enqueue(model_name, priority)
+        enqueued_at = time.monotonic()
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_admit(model_name, ticket, tokens, enqueued_at)
+                    if wait == 0:
+                        return
+                    wait = _wait_within_deadline(wait, model_name)
+                    # Registered under the lock, so a notify after this check sets the event
+                    waiter[1].clear()
+                    self._async_waiters.add(waiter)
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    with self._condition:
+                        self._async_waiters.discard(waiter)
+        except BaseException:
+            self._cancel(model_name, ticket)
+            raise
+
+    def _retry_delay(self, model_name: str, error: Exception, attempt: int) -> Optional[float]:
+        """Return how long to back off before retrying, or None if the error is not retryable."""
+        status = _status_code(error)
+        retryable = status == 429 or (status is not None and status >= 500) or _is_connection_error(error)
+        if not retryable or attempt >= self.max_retries:
+            return None
+
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            return None
+
+        with self._condition:
+            queue = self._queue(model_name)
+            queue.retries += 1
+            if status == 429:
+                queue.throttled += 1
+                queue.requests.drain(delay)
+        return delay
+
+    def call(self, model_name: str, fn: Callable[[], Any], tokens: int, priority: Optional[int] = None) -> Any:
+        """
+        Run fn once admitted, retrying 429/5xx failures with jittered backoff.
+
+        Inside an llm_deadline block, a retry that could not start before the
+        deadline is not attempted and the last error is raised.
+
+        Args:
+            model_name: Model the request is for
+            fn: Zero-argument callable sending the request
+            tokens: Estimated prompt + completion tokens
+            priority: Priority class; defaults to the calling context's
+
+        Returns:
+            Whatever fn returns
+        """
+        attempt = 0
+        while True:
+            self.acquire(model_name, tokens, priority)
+            try:
+                return fn()
+            except Exception as e:
+                delay = self._retry_delay(model_name, e, attempt)
+                if delay is None:
+                    raise
+                logger.warning("LLM call to %s failed (%s); retrying in %.1fs", model_name, e, delay)
+                time.sleep(delay)
+                attempt += 1
+
+    async def acall(self, model_name: str, fn: Callable[[], Awaitable[Any]], tokens: int,
+                    priority: Optional[int] = None) -> Any:
+        """Async version of call."""
+        attempt = 0
+        while True:
+            await self.aacquire(model_name, tokens, priority)
+            try:
+                return await fn()
+            except Exception as e:
+                delay = self._retry_delay(model_name, e, attempt)
+                if delay is None:
+                    raise
+                logger.warning("LLM call to %s failed (%s); retrying in %.1fs", model_name, e, delay)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return queue depth per priority class and wait time per model."""
+        with self._condition:
+            result = {}
+            for model_name, queue in self._queues.items():
+                depth = {name: 0 for name in PRIORITY_NAMES.values()}
+                for ticket in queue.heap:
+                    if ticket not in queue.cancelled:
+                        depth[PRIORITY_NAMES.get(ticket[0], str(ticket[0]))] += 1
+                result[model_name] = {
+                    "queue_depth": depth,
+                    "admitted": queue.admitted,
+                    "avg_wait": round(queue.total_wait / queue.admitted, 3) if queue.admitted else 0.0,
+                    "max_wait": round(queue.max_wait, 3),
+                    "retries": queue.retries,
+                    "throttled": queue.throttled
+                }
+            return result
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def _is_connection_error(error: Exception) -> bool:
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError", "ConnectError",
+                                    "ReadTimeout", "ConnectTimeout", "RemoteProtocolError")
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,142 @@
+import os
+import re
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+
+# Estimated Jaccard similarity of shingled descriptions above which two jobs count as the same role
+JOB_SIMILARITY_THRESHOLD = float(os.getenv("JOB_SIMILARITY_THRESHOLD", "0.8"))
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# 128 hash functions split into 16 bands of 8 rows: pairs at Jaccard ~0.7 and
+# above almost always share a band, pairs below ~0.5 rarely do
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+
+# Prime just above 2**32; a < 2**31 keeps a * x + b inside uint64 for 32-bit x
+_PRIME = np.uint64(4294967311)
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, 2 ** 31, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 2 ** 31, size=NUM_PERM).astype(np.uint64)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """Hashes of the overlapping word n-grams of a text, after lower-casing."""
+    tokens = _TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < size:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = [" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+    return {int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little") for gram in grams}
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash signature of a text: the minimum of each permutation over its shingles."""
+    hashes = np.fromiter(shingles(text), dtype=np.uint64)
+    if hashes.size == 0:
+        return np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    # One row per permutation, one column per shingle
+    return ((np.outer(_A, hashes) + _B[:, None]) % _PRIME).min(axis=1)
+
+
+class MinHashLSH:
+    """
+    Near-duplicate lookup for texts via MinHash signatures and banded LSH.
+
+    Each text's signature is cut into BANDS bands; texts sharing any band
+    land in the same bucket. A query only compares against the texts in its
+    buckets, so lookup cost doesn't grow with the number of indexed texts,
+    and candidates are confirmed with the signature's Jaccard estimate.
+    """
+
+    def __init__(self, threshold: float = JOB_SIMILARITY_THRESHOLD):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _bands(self, sig: np.ndarray) -> Iterable[Tuple[int, bytes]]:
+        for band in range(BANDS):
+            yield band, sig[band * ROWS:(band + 1) * ROWS].tobytes()
+
+    def add(self, key: str, text: str):
+        """Index a text, replacing any previous text under the same key."""
+        sig = signature(text)
+        with self._lock:
+            self._remove_locked(key)
+            self._signatures[key] = sig
+            for band, bucket in self._bands(sig):
+                self._buckets[band].setdefault(bucket, set()).add(key)
+
+    def remove(self, key: str):
+        with self._lock:
+            self._remove_locked(key)
+
+    def _remove_locked(self, key: str):
+        sig = self._signatures.pop(key, None)
+        if sig is None:
+            return
+        for band, bucket in self._bands(sig):
+            keys = self._buckets[band][bucket]
+            keys.discard(key)
+            if not keys:
+                del self._buckets[band][bucket]
+
+    def query(self, text: str, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        Find indexed texts similar to a text.
+
+        Args:
+            text: Text to look up
+            exclude: Key to leave out of the results (e.g. the text's own)
+
+        Returns:
+            (key, estimated Jaccard similarity) pairs at or above the threshold, most similar first
+        """
+        sig = signature(text)
+        with self._lock:
+            candidates = set()
+            for band, bucket in self._bands(sig):
+                candidates.update(self._buckets[band].get(bucket, ()))
+            candidates.discard(exclude)
+            matches = [(key, float(np.mean(self._signatures[key] == sig))) for key in candidates]
+        matches = [(key, similarity) for key, similarity in matches if similarity >= self.threshold]
+        return sorted(matches, key=lambda match: -match[1])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"documents": len(self._signatures), "threshold": self.threshold}
+
+
+_job_index = None
+_job_index_lock = threading.Lock()
+
+
+def get_job_index(loader: Optional[Callable[[], Iterable[Tuple[str, str]]]] = None) -> MinHashLSH:
+    """
+    Get the process-wide job description index.
+
+    Args:
+        loader: Called once, when the index is created, for the (job_id, text) pairs to start with
+    """
+    global _job_index
+    with _job_index_lock:
+        if _job_index is None:
+            index = MinHashLSH()
+            if loader is not None:
+                try:
+                    for key, text in loader():
+                        index.add(key, text)
+                except Exception as e:
+                    print(f"Error loading job index: {e}")
+            _job_index = index
+        return _job_index
@@ -45,6 +45,22 @@ class MockTableClient:
             self.data_store[self.table_name].append(item_with_id)
             return MockExecuteResult(data=[item_with_id])
     
+    def upsert(self, data, on_conflict=None):
+        rows = data if isinstance(data, list) else [data]
+        keys = on_conflict.split(",") if on_conflict else ["id"]
+        table = self.data_store.setdefault(self.table_name, [])
+        result = []
+        for row in rows:
+            existing = next((item for item in table if all(item.get(key) == row.get(key) for key in keys)), None)
+            if existing is not None:
+                existing.update(row)
+                result.append(existing)
+            else:
+                item = {"id": str(uuid.uuid4()), **row}
+                table.append(item)
+                result.append(item)
+        return MockExecuteResult(data=result)
+    
     def eq(self, field, value):
         self.query_conditions.append((field, value))
         return self
@@ -57,7 +73,16 @@ class MockTableClient:
         self._update_data = data
         return self
     
+    def delete(self):
+        self._delete = True
+        return self
+    
     def execute(self):
+        if getattr(self, '_delete', False):
+            rows = self.data_store.get(self.table_name, [])
+            deleted = [item for item in rows if all(item.get(field) == value for field, value in self.query_conditions)]
+            self.data_store[self.table_name] = [item for item in rows if item not in deleted]
+            return MockExecuteResult(data=deleted)
         if hasattr(self, '_update_data'):
             # This is an update operation
             results = []
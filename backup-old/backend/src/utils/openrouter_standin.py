@@ -0,0 +1,349 @@
+"""
+Local stand-in for the OpenRouter / OpenAI chat-completions API.
+
+Serves POST .../chat/completions (streaming and non-streaming) with scripted or
+template-driven answers, configurable latency distributions, token rates and
+429/500 injection, so load tests exercise the real LLMClient code path.
+
+Run it with:
+
+    python -m src.utils.openrouter_standin --port 8010 --latency lognormal:0.8:0.5 --error-429 0.05
+
+and point the backend at it:
+
+    OPENROUTER_BASE_URL=http://localhost:8010/api/v1 OPENROUTER_API_KEY=standin USE_MOCK_LLM=false
+"""
+import re
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+_TOKEN_PATTERN = re.compile(r"\S+\s*|\s+")
+
+
+class LatencyDistribution:
+    """Samples a delay in seconds from a named distribution."""
+
+    def __init__(self, kind: str = "fixed", *params: float):
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        """Parse "fixed:0.5", "uniform:0.2:1.5", "normal:1.0:0.3" or "lognormal:0.0:0.5"."""
+        parts = spec.split(":")
+        return cls(parts[0], *[float(p) for p in parts[1:]])
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.params[0] if self.params else 0.0
+        if self.kind == "uniform":
+            return random.uniform(self.params[0], self.params[1])
+        if self.kind == "normal":
+            return max(0.0, random.gauss(self.params[0], self.params[1]))
+        if self.kind == "lognormal":
+            return random.lognormvariate(self.params[0], self.params[1])
+        raise ValueError(f"Unknown latency distribution: {self.kind}")
+
+
+class StandinConfig:
+    """
+    Behaviour of the stand-in server.
+
+    Per-model overrides in `models` may set latency, tokens_per_second,
+    error_429 and error_500. Script rules are tried in order; the first whose
+    `match` regex is found in the prompt (and whose optional `model` equals the
+    requested model) supplies the response, which may use {model} and {prompt}.
+    """
+
+    def __init__(self,
+                 latency: Optional[LatencyDistribution] = None,
+                 tokens_per_second: float = 0.0,
+                 error_429: float = 0.0,
+                 error_500: float = 0.0,
+                 retry_after: float = 1.0,
+                 script: Optional[List[Dict[str, Any]]] = None,
+                 models: Optional[Dict[str, Dict[str, Any]]] = None,
+                 seed: Optional[int] = None):
+        self.latency = latency or LatencyDistribution("fixed", 0.0)
+        self.tokens_per_second = tokens_per_second
+        self.error_429 = error_429
+        self.error_500 = error_500
+        self.retry_after = retry_after
+        self.script = script or []
+        self.models = models or {}
+        if seed is not None:
+            random.seed(seed)
+
+    @classmethod
+    def from_file(cls, path: str) -> "StandinConfig":
+        """Load a config from a JSON file with the constructor's keys."""
+        with open(path) as f:
+            data = json.load(f)
+        if "latency" in data:
+            data["latency"] = LatencyDistribution.parse(data["latency"])
+        for overrides in data.get("models", {}).values():
+            if "latency" in overrides:
+                overrides["latency"] = LatencyDistribution.parse(overrides["latency"])
+        return cls(**data)
+
+    def for_model(self, model_name: str, key: str) -> Any:
+        return self.models.get(model_name, {}).get(key, getattr(self, key))
+
+
+def default_response(prompt: str) -> str:
+    """Template-driven answers shaped like what the Giselle agents ask for."""
+    lowered = prompt.lower()
+
+    if "each numbered text below" in lowered:
+        scores = {}
+        for index, criteria in re.findall(r"Text (\d+)\nCriteria: (\[.*?\])", prompt):
+            scores[index] = {criterion: random.randint(8, 18) for criterion in json.loads(criteria)}
+        return json.dumps(scores)
+
+    if "job fields required" in lowered:
+        fields_section = prompt.split("Job Fields Required:", 1)[-1]
+        fields = re.findall(r'"field":\s*"([^"]+)"', fields_section)
+        return json.dumps([
+            {"field": field, "score": random.randint(30, 95), "evidence": f"Resume mentions work related to {field}."}
+            for field in fields
+        ])
+
+    if "professional fields" in lowered:
+        return json.dumps([
+            {"field": "Software Engineering", "score": 90},
+            {"field": "System Design", "score": 75},
+            {"field": "Data Analysis", "score": 60},
+            {"field": "Project Management", "score": 45},
+            {"field": "Technical Communication", "score": 55}
+        ])
+
+    if "resume" in lowered and "extract" in lowered:
+        return json.dumps({
+            "skills": ["Python", "SQL", "React", "Docker"],
+            "experience": [
+                {"title": "Software Engineer", "company": "Example Corp", "duration": "3 years", "description": "Built web services."}
+            ],
+            "education": [
+                {"degree": "BSc Computer Science", "institution": "Example University", "year": "2019"}
+            ]
+        })
+
+    if "questions" in lowered:
+        return json.dumps([
+            {"question": "Describe a system you designed end to end.", "type": "technical", "skill_assessed": "system design"},
+            {"question": "Tell me about a disagreement within your team and how it was resolved.", "type": "behavioral", "skill_assessed": "collaboration"},
+            {"question": "How do you debug a production incident?", "type": "technical", "skill_assessed": "problem-solving"},
+            {"question": "How do you approach learning an unfamiliar codebase?", "type": "behavioral", "skill_assessed": "adaptability"},
+            {"question": "Explain a trade-off you made between speed and quality.", "type": "behavioral", "skill_assessed": "judgement"}
+        ])
+
+    if "score on a scale" in lowered:
+        return str(random.randint(8, 18))
+
+    match = re.search(r"categories: (.+?)\.\n", prompt)
+    if match:
+        return match.group(1).split(",")[0].strip()
+
+    return "This is a response from the local OpenRouter stand-in."
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: StandinConfig):
+        super().__init__(address, StandinHandler)
+        self.config = config
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "streamed": 0, "injected_429": 0, "injected_500": 0}
+
+    def count(self, key: str):
+        with self._lock:
+            self.counters[key] += 1
+
+    def respond(self, model_name: str, messages: List[Dict[str, str]]) -> str:
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        for rule in self.config.script:
+            if rule.get("model") not in (None, model_name):
+                continue
+            if re.search(rule.get("match", ""), prompt, re.DOTALL):
+                return rule["response"].replace("{model}", model_name).replace("{prompt}", prompt)
+        return default_response(prompt)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: StandinServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path.endswith("/models"):
+            models = [{"id": name, "object": "model"} for name in self.server.config.models]
+            self._send_json(200, {"object": "list", "data": models})
+        elif self.path.endswith("/stats"):
+            self._send_json(200, dict(self.server.counters))
+        elif self.path.endswith("/health"):
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        model_name = request.get("model", "standin")
+        config = self.server.config
+        self.server.count("requests")
+
+        # Time to first token
+        time.sleep(config.for_model(model_name, "latency").sample())
+
+        roll = random.random()
+        if roll < config.for_model(model_name, "error_429"):
+            self.server.count("injected_429")
+            self._send_json(429, {"error": {"message": "Rate limit exceeded (injected)", "code": 429}},
+                            {"Retry-After": str(config.retry_after)})
+            return
+        if roll < config.for_model(model_name, "error_429") + config.for_model(model_name, "error_500"):
+            self.server.count("injected_500")
+            self._send_json(500, {"error": {"message": "Internal error (injected)", "code": 500}})
+            return
+
+        content = self.server.respond(model_name, request.get("messages", []))
+        tokens = _TOKEN_PATTERN.findall(content)
+        max_tokens = request.get("max_tokens")
+        if max_tokens:
+            tokens = tokens[:max_tokens]
+        rate = config.for_model(model_name, "tokens_per_second")
+
+        if request.get("stream"):
+            self.server.count("streamed")
+            self._stream(model_name, tokens, rate)
+            return
+
+        if rate > 0:
+            time.sleep(len(tokens) / rate)
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in request.get("messages", [])) // 4
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model_name,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens)},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(tokens),
+                "total_tokens": prompt_tokens + len(tokens)
+            }
+        })
+
+    def _stream(self, model_name: str, tokens: List[str], rate: float):
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta: Dict[str, Any], finish_reason: Optional[str] = None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model_name,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+
+        event({"role": "assistant", "content": ""})
+        for token in tokens:
+            if rate > 0:
+                time.sleep(1 / rate)
+            event({"content": token})
+        event({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def start_server(config: StandinConfig, host: str = "127.0.0.1", port: int = 0) -> StandinServer:
+    """
+    Start the stand-in on a background thread.
+
+    Args:
+        config: Server behaviour
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+
+    Returns:
+        The running server; its base URL is http://host:server.server_port/api/v1
+    """
+    server = StandinServer((host, port), config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Local OpenRouter-compatible stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--config", help="JSON config file (see StandinConfig)")
+    parser.add_argument("--latency", default=None, help='e.g. "fixed:0.5", "uniform:0.2:2", "lognormal:0:0.6"')
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--error-429", type=float, default=None, help="Probability of an injected 429")
+    parser.add_argument("--error-500", type=float, default=None, help="Probability of an injected 500")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = StandinConfig.from_file(args.config) if args.config else StandinConfig()
+    if args.latency:
+        config.latency = LatencyDistribution.parse(args.latency)
+    if args.tokens_per_second is not None:
+        config.tokens_per_second = args.tokens_per_second
+    if args.error_429 is not None:
+        config.error_429 = args.error_429
+    if args.error_500 is not None:
+        config.error_500 = args.error_500
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    server = StandinServer((args.host, args.port), config)
+    print(f"OpenRouter stand-in listening on http://{args.host}:{args.port}/api/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import os
+import time
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
+
+from pypdf import PdfReader
+
+# Parse budget per resume; pages past either limit are never read
+PDF_MAX_PAGES = int(os.getenv("RESUME_PDF_MAX_PAGES", "10"))
+PDF_MAX_CHARS = int(os.getenv("RESUME_PDF_MAX_CHARS", "30000"))
+
+# Pages yielding fewer non-whitespace characters than this count as having no text
+MIN_PAGE_CHARS = 16
+
+
+class PageText:
+    """Text extracted from one PDF page and what it cost."""
+
+    def __init__(self, number: int, text: str, seconds: float, skipped: Optional[str] = None):
+        self.number = number
+        self.text = text
+        self.seconds = seconds
+        self.skipped = skipped
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "page": self.number,
+            "chars": len(self.text),
+            "seconds": round(self.seconds, 4),
+            "skipped": self.skipped
+        }
+
+
+def _may_have_text(page) -> bool:
+    """
+    Check a page's resources for anything that can draw text.
+
+    A page with neither fonts nor form XObjects (which carry their own
+    fonts) can only hold images or vector art, e.g. a scanned page.
+    """
+    resources = page.get("/Resources")
+    if resources is None:
+        return False
+    resources = resources.get_object()
+    fonts = resources.get("/Font")
+    if fonts is not None and len(fonts.get_object()) > 0:
+        return True
+    xobjects = resources.get("/XObject")
+    if xobjects is None:
+        return False
+    return any(xobject.get_object().get("/Subtype") == "/Form" for xobject in xobjects.get_object().values())
+
+
+def iter_pdf_pages(source: Union[str, BinaryIO],
+                   max_pages: Optional[int] = None,
+                   max_chars: Optional[int] = None) -> Iterator[PageText]:
+    """
+    Lazily extract text page by page, stopping at the page or character budget.
+
+    Pages are parsed only when reached. Pages with nothing that can draw text (scans)
+    are skipped without running text extraction; pages whose text is
+    effectively empty are reported as skipped too. The page that crosses the
+    character budget is truncated to fit.
+
+    Args:
+        source: Path or binary file object of the PDF
+        max_pages: Maximum number of pages to read (default RESUME_PDF_MAX_PAGES)
+        max_chars: Maximum characters of text to return (default RESUME_PDF_MAX_CHARS)
+
+    Yields:
+        PageText for each page read, including skipped ones
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    return _iter_pages(PdfReader(source), max_pages, max_chars)
+
+
+def _iter_pages(reader: PdfReader, max_pages: int, max_chars: int) -> Iterator[PageText]:
+    remaining = max_chars
+
+    for index in range(min(len(reader.pages), max_pages)):
+        if remaining <= 0:
+            return
+        started = time.perf_counter()
+        page = reader.pages[index]
+
+        if not _may_have_text(page):
+            yield PageText(index + 1, "", time.perf_counter() - started, skipped="no_text_layer")
+            continue
+
+        text = page.extract_text() or ""
+        if len("".join(text.split())) < MIN_PAGE_CHARS:
+            yield PageText(index + 1, "", time.perf_counter() - started, skipped="empty")
+            continue
+
+        text = text[:remaining]
+        remaining -= len(text)
+        yield PageText(index + 1, text, time.perf_counter() - started)
+
+
+def extract_pdf_text(source: Union[str, BinaryIO],
+                     max_pages: Optional[int] = None,
+                     max_chars: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Extract a PDF's text within the parse budget.
+
+    Args:
+        source: Path or binary file object of the PDF
+        max_pages: Maximum number of pages to read (default RESUME_PDF_MAX_PAGES)
+        max_chars: Maximum characters of text to return (default RESUME_PDF_MAX_CHARS)
+
+    Returns:
+        Dictionary with the joined text, per-page stats, total page count,
+        whether the budget cut the document short, and total seconds
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    started = time.perf_counter()
+    texts: List[str] = []
+    pages: List[Dict[str, Any]] = []
+    total_chars = 0
+
+    reader = PdfReader(source)
+    page_count = len(reader.pages)
+
+    for page in _iter_pages(reader, max_pages, max_chars):
+        pages.append(page.stats())
+        if page.text:
+            texts.append(page.text)
+            total_chars += len(page.text)
+
+    truncated = total_chars >= max_chars or len(pages) < page_count
+
+    return {
+        "text": "\n".join(texts),
+        "pages": pages,
+        "page_count": page_count,
+        "truncated": truncated,
+        "seconds": round(time.perf_counter() - started, 4)
+    }
@@ -0,0 +1,112 @@
+import json
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+# Candidate columns holding the hashes of the uploaded file and of its extracted text
+FILE_HASH_COLUMN = "resume_sha256"
+TEXT_HASH_COLUMN = "resume_text_sha256"
+
+
+def file_hash(data: bytes) -> str:
+    """SHA-256 of the uploaded file's bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 of the extracted text with case and whitespace normalised."""
+    normalized = " ".join(text.split()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def has_resume_content(resume_data: Any) -> bool:
+    """
+    Whether parsed resume data holds anything worth reusing.
+
+    Failed extractions produce a skeleton of empty lists; those must never
+    be served to other uploads of the same resume, or one transient LLM
+    error would stick to the file for good.
+    """
+    return isinstance(resume_data, dict) and any(resume_data.values())
+
+
+class DedupStats:
+    """Process-wide counts of how resume uploads were served."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.file_hits = 0
+        self.text_hits = 0
+        self.misses = 0
+
+    def record(self, outcome: str):
+        with self._lock:
+            if outcome == "file":
+                self.file_hits += 1
+            elif outcome == "text":
+                self.text_hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.file_hits + self.text_hits + self.misses
+            return {
+                "file_hits": self.file_hits,
+                "text_hits": self.text_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.file_hits + self.text_hits) / total, 3) if total else 0.0
+            }
+
+
+_stats = DedupStats()
+
+
+def dedup_stats() -> Dict[str, Any]:
+    """Hit rate of resume deduplication since the process started."""
+    return _stats.stats()
+
+
+class ResumeDedupIndex:
+    """
+    Finds previously processed resumes by content hash.
+
+    The candidates table is the index: each candidate stores the hashes of
+    its resume file and extracted text next to resume_url and resume_parsed.
+    An identical file skips PDF parsing and LLM extraction; a different file
+    with the same text (e.g. re-exported) skips extraction. Candidates whose
+    parsed data is empty are never returned.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    def _find(self, column: str, value: str) -> Optional[Dict[str, Any]]:
+        try:
+            candidate = self.db.find_candidate_by(column, value)
+        except Exception as e:
+            print(f"Error looking up resume hash: {e}")
+            return None
+        if not candidate or not candidate.get("resume_parsed"):
+            return None
+        resume_parsed = candidate["resume_parsed"]
+        if isinstance(resume_parsed, str):
+            try:
+                resume_parsed = json.loads(resume_parsed)
+            except ValueError:
+                return None
+        if not has_resume_content(resume_parsed):
+            return None
+        return {**candidate, "resume_parsed": resume_parsed}
+
+    def find_by_file(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Candidate record whose resume file had this hash, with resume_parsed decoded."""
+        return self._find(FILE_HASH_COLUMN, digest)
+
+    def find_by_text(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Candidate record whose resume text had this hash, with resume_parsed decoded."""
+        return self._find(TEXT_HASH_COLUMN, digest)
+
+    def record(self, outcome: str):
+        """Count an upload as served by a "file" hit, a "text" hit or a "miss"."""
+        _stats.record(outcome)
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _AsyncCall:
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical requests into one upstream call.
+
+    The first caller for a key runs the work; callers arriving while it is in
+    flight wait for and share its result (or exception). Nothing is kept once
+    the call finishes - caching is the response cache's job.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Any, _AsyncCall] = {}
+        self.executed = 0
+        self.deduplicated = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run fn once for all threads concurrently asking for the same key.
+
+        Args:
+            key: Identity of the request
+            fn: Zero-argument callable performing the request
+
+        Returns:
+            The result of fn, shared by every waiting caller
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.deduplicated += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await fn once for all coroutines on this event loop asking for the same key.
+
+        The work runs as its own task that every caller awaits, so a caller
+        being cancelled only withdraws that caller; the task is cancelled once
+        no callers are left waiting for it.
+
+        Args:
+            key: Identity of the request
+            fn: Zero-argument callable returning the awaitable to run
+
+        Returns:
+            The awaited result, shared by every waiting caller
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+
+        with self._lock:
+            call = self._async_calls.get(loop_key)
+            if call is not None:
+                self.deduplicated += 1
+            else:
+                call = _AsyncCall(loop.create_task(fn()))
+                self._async_calls[loop_key] = call
+                self.executed += 1
+                call.task.add_done_callback(lambda task: self._finish_async(loop_key, call))
+            call.waiters += 1
+
+        try:
+            # shield() keeps one waiter's cancellation from reaching the shared task
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            with self._lock:
+                call.waiters -= 1
+                abandoned = call.waiters == 0 and not call.task.done()
+                if abandoned and self._async_calls.get(loop_key) is call:
+                    del self._async_calls[loop_key]
+            if abandoned:
+                call.task.cancel()
+            raise
+        except BaseException:
+            with self._lock:
+                call.waiters -= 1
+            raise
+        else:
+            with self._lock:
+                call.waiters -= 1
+
+    def _finish_async(self, loop_key: Any, call: "_AsyncCall"):
+        with self._lock:
+            if self._async_calls.get(loop_key) is call:
+                del self._async_calls[loop_key]
+        if not call.task.cancelled():
+            # Mark retrieved so an unobserved failure does not log a warning
+            call.task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many calls ran upstream and how many were deduplicated."""
+        with self._lock:
+            return {
+                "executed": self.executed,
+                "deduplicated": self.deduplicated,
+                "in_flight": len(self._calls) + len(self._async_calls)
+            }
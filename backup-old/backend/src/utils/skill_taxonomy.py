@@ -0,0 +1,291 @@
+import os
+import re
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Score given to a job field that the candidate lists verbatim (or by alias) as a skill
+SKILL_MATCH_SCORE = int(os.getenv("SKILL_MATCH_SCORE", "80"))
+
+# Optional JSON file of extra skills: {"Canonical Name": ["alias", ...]}
+SKILL_TAXONOMY_PATH = os.getenv("SKILL_TAXONOMY_PATH", "")
+
+# Canonical skill -> aliases. Names are compared after normalize_skill.
+DEFAULT_SKILLS: Dict[str, List[str]] = {
+    "Python": ["python3", "py"],
+    "Java": ["java se", "java ee"],
+    "JavaScript": ["js", "ecmascript", "es6"],
+    "TypeScript": ["ts"],
+    "C": [],
+    "C++": ["cpp"],
+    "C#": ["csharp", "c sharp"],
+    ".NET": ["dotnet", "asp.net", ".net core"],
+    "Go": ["golang"],
+    "Rust": [],
+    "Ruby": [],
+    "PHP": [],
+    "Swift": [],
+    "Kotlin": [],
+    "Scala": [],
+    "R": [],
+    "SQL": ["structured query language"],
+    "PostgreSQL": ["postgres", "psql"],
+    "MySQL": [],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    "React": ["react.js", "reactjs"],
+    "Angular": ["angular.js", "angularjs"],
+    "Vue": ["vue.js", "vuejs"],
+    "Node.js": ["node", "nodejs"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": ["fast api"],
+    "Spring": ["spring boot", "springboot"],
+    "GraphQL": [],
+    "REST APIs": ["rest", "rest api", "restful", "restful apis"],
+    "AWS": ["amazon web services"],
+    "Azure": ["microsoft azure"],
+    "Google Cloud": ["gcp", "google cloud platform"],
+    "Docker": [],
+    "Kubernetes": ["k8s"],
+    "Terraform": [],
+    "CI/CD": ["continuous integration", "continuous delivery", "continuous deployment"],
+    "Git": ["github", "gitlab"],
+    "Linux": ["unix"],
+    "Machine Learning": ["ml"],
+    "Deep Learning": ["dl"],
+    "Natural Language Processing": ["nlp"],
+    "Computer Vision": ["cv"],
+    "Data Analysis": ["data analytics"],
+    "Data Engineering": [],
+    "Data Visualization": ["data viz"],
+    "Statistics": ["statistical analysis"],
+    "Pandas": [],
+    "NumPy": [],
+    "TensorFlow": [],
+    "PyTorch": ["torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "Apache Spark": ["spark", "pyspark"],
+    "Tableau": [],
+    "Power BI": ["powerbi"],
+    "Excel": ["microsoft excel", "ms excel"],
+    "Front-end Development": ["frontend", "front end", "frontend development", "front end development"],
+    "Back-end Development": ["backend", "back end", "backend development", "back end development"],
+    "Full-stack Development": ["full stack", "fullstack", "full stack development", "fullstack development"],
+    "Mobile Development": ["ios development", "android development"],
+    "UI/UX Design": ["ui design", "ux design", "user experience design"],
+    "Project Management": ["pmp"],
+    "Product Management": [],
+    "Agile": ["scrum", "kanban"],
+    "Financial Modeling": ["financial modelling"],
+    "Accounting": [],
+    "Digital Marketing": ["online marketing"],
+    "SEO": ["search engine optimization", "search engine optimisation"],
+    "Sales": [],
+    "Customer Service": ["customer support"],
+    "Technical Writing": [],
+    "Cybersecurity": ["information security", "infosec", "cyber security"],
+}
+
+# Names that are ordinary words or letters in running text ("go", "r", "rest").
+# They resolve when they are a whole skill entry, but are never matched inside text.
+AMBIGUOUS_NAMES = {
+    "c", "r", "go", "rust", "ruby", "swift", "spark", "rest", "node", "sales",
+    "accounting", "ts", "py", "ml", "dl", "cv", "js", "excel", "spring", "agile",
+}
+
+# Trailing words that don't change which skill a job field names ("Python Programming")
+GENERIC_SUFFIXES = ("programming", "development", "language", "skills", "experience", "framework")
+
+_TOKEN_PATTERN = re.compile(r"\.?[a-z0-9+#]+(?:\.[a-z0-9+#]+)*")
+
+
+def _tokens(text: str) -> Tuple[str, ...]:
+    return tuple(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def normalize_skill(name: str) -> str:
+    """Lower-case a skill name and reduce punctuation and spacing to single spaces."""
+    return " ".join(_tokens(name))
+
+
+class SkillTaxonomy:
+    """
+    Canonical skill names with aliases, and a matcher for free text.
+
+    Every canonical name and alias is normalised into a token sequence and
+    stored in a dict (exact lookups) and a token trie (scanning). scan()
+    walks the trie from each token and keeps the longest match, so a resume
+    is matched in one pass over its tokens however many skills are known.
+    """
+
+    def __init__(self, skills: Optional[Dict[str, Iterable[str]]] = None):
+        self._names: Dict[Tuple[str, ...], str] = {}
+        self._trie: Dict[str, Any] = {}
+        for canonical, aliases in (DEFAULT_SKILLS if skills is None else skills).items():
+            self.add(canonical, aliases)
+
+    def __len__(self) -> int:
+        return len(set(self._names.values()))
+
+    def add(self, canonical: str, aliases: Iterable[str] = ()):
+        """Register a skill under its canonical name and any aliases."""
+        for name in (canonical, *aliases):
+            tokens = _tokens(name)
+            if not tokens:
+                continue
+            self._names[tokens] = canonical
+            if " ".join(tokens) in AMBIGUOUS_NAMES:
+                continue
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            # Tokens are never empty, so "" marks the end of a name
+            node[""] = canonical
+
+    def canonical(self, name: str) -> Optional[str]:
+        """
+        Resolve a whole skill or job field name to its canonical skill.
+
+        Args:
+            name: Skill list entry or job field name
+
+        Returns:
+            Canonical skill name, or None if the name isn't a known skill or alias
+        """
+        tokens = _tokens(name)
+        canonical = self._names.get(tokens)
+        while canonical is None and len(tokens) > 1 and tokens[-1] in GENERIC_SUFFIXES:
+            tokens = tokens[:-1]
+            canonical = self._names.get(tokens)
+        return canonical
+
+    def scan(self, text: str) -> List[str]:
+        """
+        Find every known skill mentioned in a piece of text.
+
+        Args:
+            text: Free text, e.g. a skill entry or a job description
+
+        Returns:
+            Canonical skill names in order of first mention
+        """
+        tokens = _tokens(text)
+        found: Dict[str, None] = {}
+        position = 0
+        while position < len(tokens):
+            node = self._trie
+            match = None
+            end = position
+            for index in range(position, len(tokens)):
+                node = node.get(tokens[index])
+                if node is None:
+                    break
+                if "" in node:
+                    match, end = node[""], index + 1
+            if match is None:
+                position += 1
+            else:
+                found[match] = None
+                position = end
+        return list(found)
+
+    def listed_skills(self, resume_data: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Map each canonical skill in a resume's skills list to the entry that names it.
+
+        Whole entries resolve through canonical(), so ambiguous names like "Go"
+        count; entries such as "Python (Django, Flask)" are also scanned.
+        """
+        listed: Dict[str, str] = {}
+        for entry in resume_data.get("skills") or []:
+            if not isinstance(entry, str):
+                continue
+            canonical = self.canonical(entry)
+            for skill in ([canonical] if canonical else []) + self.scan(entry):
+                listed.setdefault(skill, entry)
+        return listed
+
+    def match_fields(self,
+                     resume_data: Dict[str, Any],
+                     job_fields: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Score the job fields a resume settles on its own.
+
+        A field that names a known skill the candidate lists is scored
+        SKILL_MATCH_SCORE without the LLM. Everything else (fields that aren't
+        skills, or skills only implied by experience) is left for the LLM.
+
+        Args:
+            resume_data: Structured resume data
+            job_fields: List of job fields with importance scores
+
+        Returns:
+            (scores keyed by field name, job fields still needing the LLM)
+        """
+        listed = self.listed_skills(resume_data)
+        resolved: Dict[str, Dict[str, Any]] = {}
+        pending: List[Dict[str, Any]] = []
+        for job_field in job_fields:
+            canonical = self.canonical(job_field["field"])
+            if canonical is not None and canonical in listed:
+                resolved[job_field["field"]] = {
+                    "field": job_field["field"],
+                    "score": SKILL_MATCH_SCORE,
+                    "evidence": f"Lists \"{listed[canonical]}\" as a skill"
+                }
+            else:
+                pending.append(job_field)
+        return resolved, pending
+
+    def match_required(self, resume_data: Dict[str, Any], required_skills: Optional[List[str]]) -> Dict[str, List[str]]:
+        """
+        Check a job's required skills against a resume.
+
+        Args:
+            resume_data: Structured resume data
+            required_skills: Free-text required skills of the job
+
+        Returns:
+            Dictionary of required skills found in the resume ("matched"), known
+            but not found ("missing"), and not in the taxonomy ("unrecognized")
+        """
+        mentioned = set(self.listed_skills(resume_data))
+        for section in ("experience", "education"):
+            for item in resume_data.get(section) or []:
+                if isinstance(item, dict):
+                    mentioned.update(self.scan(" ".join(str(value) for value in item.values())))
+
+        result = {"matched": [], "missing": [], "unrecognized": []}
+        for skill in required_skills or []:
+            canonical = self.canonical(skill)
+            if canonical is None:
+                result["unrecognized"].append(skill)
+            elif canonical in mentioned:
+                result["matched"].append(skill)
+            else:
+                result["missing"].append(skill)
+        return result
+
+
+_taxonomy = None
+_taxonomy_lock = threading.Lock()
+
+
+def get_skill_taxonomy() -> SkillTaxonomy:
+    """Get the process-wide taxonomy: DEFAULT_SKILLS plus SKILL_TAXONOMY_PATH if set."""
+    global _taxonomy
+    with _taxonomy_lock:
+        if _taxonomy is None:
+            taxonomy = SkillTaxonomy()
+            if SKILL_TAXONOMY_PATH:
+                try:
+                    with open(SKILL_TAXONOMY_PATH) as f:
+                        for canonical, aliases in json.load(f).items():
+                            taxonomy.add(canonical, aliases)
+                except Exception as e:
+                    print(f"Error loading skill taxonomy from {SKILL_TAXONOMY_PATH}: {e}")
+            _taxonomy = taxonomy
+        return _taxonomy
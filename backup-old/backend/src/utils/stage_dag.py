@@ -0,0 +1,98 @@
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Tuple
+
+
+class _Stage:
+    def __init__(self, name: str, fn: Callable[..., Any], depends_on: List[str]):
+        self.name = name
+        self.fn = fn
+        self.depends_on = depends_on
+
+
+class StageDAG:
+    """
+    Runs a small graph of dependent stages, executing independent ones concurrently.
+
+    Each stage is called with the results of its dependencies as positional
+    arguments, in the order they were declared. Stages run on worker threads
+    with the caller's context (so llm_priority carries over), which suits the
+    blocking LLMClient calls most stages make.
+    """
+
+    def __init__(self):
+        self._stages: Dict[str, _Stage] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], depends_on: List[str] = None) -> "StageDAG":
+        """
+        Add a stage.
+
+        Args:
+            name: Unique stage name; its result is stored under this key
+            fn: Callable receiving the dependency results
+            depends_on: Names of stages that must finish first (already added)
+
+        Returns:
+            The graph, for chaining
+        """
+        depends_on = list(depends_on or [])
+        if name in self._stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        missing = [dependency for dependency in depends_on if dependency not in self._stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages: {missing}")
+        self._stages[name] = _Stage(name, fn, depends_on)
+        return self
+
+    def _run_stage(self, stage: _Stage, args: List[Any], origin: float) -> Tuple[Any, Dict[str, float]]:
+        started = time.perf_counter()
+        result = stage.fn(*args)
+        finished = time.perf_counter()
+        return result, {
+            "start": round(started - origin, 4),
+            "duration": round(finished - started, 4)
+        }
+
+    def run(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Execute every stage as soon as its dependencies are done.
+
+        The first stage to raise cancels stages that have not started and the
+        exception propagates to the caller.
+
+        Returns:
+            Tuple of (results by stage name, timings) where timings holds the
+            start offset and duration of each stage plus the total wall time
+        """
+        results: Dict[str, Any] = {}
+        stage_timings: Dict[str, Dict[str, float]] = {}
+        remaining = dict(self._stages)
+        running = {}
+        origin = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max(1, len(self._stages)), thread_name_prefix="stage") as executor:
+            try:
+                while remaining or running:
+                    ready = [stage for stage in remaining.values()
+                             if all(dependency in results for dependency in stage.depends_on)]
+                    for stage in ready:
+                        del remaining[stage.name]
+                        args = [results[dependency] for dependency in stage.depends_on]
+                        context = contextvars.copy_context()
+                        future = executor.submit(context.run, self._run_stage, stage, args, origin)
+                        running[future] = stage.name
+
+                    done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        results[name], stage_timings[name] = future.result()
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+
+        return results, {
+            "stages": stage_timings,
+            "total": round(time.perf_counter() - origin, 4)
+        }
@@ -0,0 +1,155 @@
+"""Tests for batched, streaming candidate scoring against a job."""
+
+import asyncio
+import re
+
+import pytest
+
+from src.agents import resume_analyzer as resume_analyzer_module
+from src.agents.resume_analyzer import ResumeAnalyzer
+from src.services.interview_manager import InterviewManager
+from src.services.ranking_service import METRIC_CORRELATION, RankingService
+from src.utils.database import SupabaseClient
+from src.utils.lexical_index import LexicalIndex
+
+JOB_FIELDS = [
+    {"field": "Python", "score": 90},
+    {"field": "Stakeholder Communication", "score": 50},
+]
+
+
+def resume(*skills):
+    return {"skills": list(skills), "experience": [{"title": "Engineer", "description": "Python services"}], "education": []}
+
+
+class FakeLLMClient:
+    """Answers batch prompts with scores for the listed candidates and single prompts with one list."""
+
+    def __init__(self, skip=(), fail=False):
+        self.skip = set(skip)
+        self.fail = fail
+        self.batch_calls = 0
+        self.single_calls = 0
+
+    async def astructured_prompt(self, system_prompt, user_prompt, model_name=None):
+        fields = re.findall(r'"field": "([^"]+)"', user_prompt)
+        indices = re.findall(r"Candidate (\d+):", user_prompt)
+        if indices:
+            self.batch_calls += 1
+            if self.fail:
+                raise RuntimeError("model unavailable")
+            return {
+                index: [{"field": field, "score": 60, "evidence": "batch"} for field in dict.fromkeys(fields)]
+                for index in indices if int(index) not in self.skip
+            }
+        self.single_calls += 1
+        return [{"field": field, "score": 40, "evidence": "single"} for field in dict.fromkeys(fields)]
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    analyzer = ResumeAnalyzer()
+    analyzer.llm_client = FakeLLMClient()
+    analyzer.resume_index = LexicalIndex()
+    return analyzer
+
+
+def collect(analyzer, candidates, job_fields=JOB_FIELDS):
+    async def run():
+        return [result async for result in analyzer.ascore_candidates(candidates, job_fields)]
+    return asyncio.run(run())
+
+
+def test_pack_respects_candidate_limit(analyzer, monkeypatch):
+    monkeypatch.setattr(resume_analyzer_module, "BATCH_SCORE_MAX_CANDIDATES", 2)
+    candidates = [(f"c{index}", resume("Python")) for index in range(5)]
+    assert [len(pack) for pack in analyzer._pack_candidates(candidates, JOB_FIELDS)] == [2, 2, 1]
+
+
+def test_pack_respects_token_budget(analyzer, monkeypatch):
+    monkeypatch.setattr(resume_analyzer_module, "BATCH_SCORE_TOKEN_BUDGET", 1000)
+    candidates = [(f"c{index}", {"summary": "x" * 2000}) for index in range(3)]
+    assert [len(pack) for pack in analyzer._pack_candidates(candidates, JOB_FIELDS)] == [1, 1, 1]
+
+
+def test_candidates_share_one_request(analyzer):
+    results = dict(collect(analyzer, [("a", resume()), ("b", resume())]))
+
+    assert analyzer.llm_client.batch_calls == 1
+    assert analyzer.llm_client.single_calls == 0
+    assert [score["score"] for score in results["a"]] == [60, 60]
+
+
+def test_taxonomy_settled_candidates_skip_the_llm(analyzer):
+    results = collect(analyzer, [("python", resume("Python"))], [{"field": "Python", "score": 90}])
+
+    assert results == [("python", [{"field": "Python", "score": 80, "evidence": 'Lists "Python" as a skill'}])]
+    assert analyzer.llm_client.batch_calls == 0
+
+
+def test_local_matches_merge_with_llm_scores(analyzer):
+    results = dict(collect(analyzer, [("a", resume("Python")), ("b", resume())]))
+
+    assert [(score["field"], score["score"]) for score in results["a"]] == [("Python", 80), ("Stakeholder Communication", 60)]
+    assert [score["score"] for score in results["b"]] == [60, 60]
+
+
+def test_candidate_missing_from_batch_is_scored_alone(analyzer):
+    analyzer.llm_client = FakeLLMClient(skip={1})
+    results = dict(collect(analyzer, [("a", resume()), ("b", resume())]))
+
+    assert analyzer.llm_client.single_calls == 1
+    assert results["b"][0]["evidence"] == "single"
+    assert results["a"][0]["evidence"] == "batch"
+
+
+def test_failed_batch_falls_back_per_candidate(analyzer):
+    analyzer.llm_client = FakeLLMClient(fail=True)
+    results = dict(collect(analyzer, [("a", resume()), ("b", resume())]))
+
+    assert analyzer.llm_client.single_calls == 2
+    assert set(results) == {"a", "b"}
+
+
+def test_validate_rejects_incomplete_entries(analyzer):
+    assert analyzer._validate_candidate_scores([{"field": "python", "score": "120"}], [{"field": "Python"}]) == [
+        {"field": "Python", "score": 100, "evidence": ""}
+    ]
+    assert analyzer._validate_candidate_scores([{"field": "Python"}], [{"field": "Python"}]) is None
+    assert analyzer._validate_candidate_scores({"Python": 1}, [{"field": "Python"}]) is None
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    return SupabaseClient()
+
+
+def test_job_scoring_streams_filtered_errors_and_ranks(analyzer, db, monkeypatch):
+    job = db.create_job_description("default", "Backend Engineer", "Python engineer for backend services")
+    stored = db.create_candidate("Jane", "jane@example.com")
+    db.update_candidate_resume(stored["id"], "https://example.com/r.pdf", resume("Python", "Django"), None, None)
+    unparsed = db.create_candidate("Bob", "bob@example.com")
+
+    manager = object.__new__(InterviewManager)
+    manager.db = db
+    manager.resume_analyzer = analyzer
+    manager.ranking = RankingService(db)
+    monkeypatch.setattr(manager, "get_job_fields", lambda job: JOB_FIELDS)
+
+    async def run():
+        return [
+            event async for event in manager.score_candidates_for_job(
+                job["id"], [stored["id"], unparsed["id"]], {"chef": {"skills": ["Pastry"]}}, min_match=0.05
+            )
+        ]
+
+    events = {event["candidate_id"]: event for event in asyncio.run(run())}
+
+    assert "error" in events[unparsed["id"]]
+    assert events["chef"]["filtered"]
+    scored = events[stored["id"]]
+    assert scored["prefilter"]["passed"]
+    assert scored["required_skills"] == {"matched": [], "missing": [], "unrecognized": []}
+    assert manager.ranking.get_rank(job["id"], stored["id"], METRIC_CORRELATION) == 1
@@ -0,0 +1,160 @@
+"""Tests for bulk resume ingestion from a ZIP archive or directory."""
+
+import json
+import zipfile
+
+import pytest
+
+from src.services.bulk_ingest import BulkIngestor, ResumeSource
+from src.utils.database import SupabaseClient
+from src.utils.lexical_index import LexicalIndex
+
+PARSED = {"skills": ["Python"], "experience": [{"title": "Engineer"}], "education": []}
+EMPTY = {"skills": [], "experience": [], "education": []}
+
+
+def make_pdf(*lines):
+    """A one-page PDF that draws each line of text in Helvetica."""
+    text = "".join(f"({line}) Tj 0 -16 Td " for line in lines)
+    stream = f"BT /F1 12 Tf 72 720 Td {text}ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+class FakeResumeAnalyzer:
+    def __init__(self, extraction=PARSED):
+        self.extraction = extraction
+        self.extracted = []
+        self.resume_index = LexicalIndex()
+
+    def extract_resume_data(self, text):
+        self.extracted.append(text)
+        return self.extraction
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    return SupabaseClient()
+
+
+def write_zip(path, files):
+    with zipfile.ZipFile(path, "w") as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return str(path)
+
+
+def make_ingestor(path, db, analyzer=None, **kwargs):
+    return BulkIngestor(path, workers=1, db=db, resume_analyzer=analyzer or FakeResumeAnalyzer(), **kwargs)
+
+
+def test_source_lists_pdfs_and_manifest(tmp_path):
+    path = write_zip(tmp_path / "resumes.zip", {
+        "b.pdf": b"", "a/c.PDF": b"", "notes.txt": b"",
+        "manifest.csv": "file,name,email\nb.pdf,Bea Smith,bea@example.com\n",
+    })
+    source = ResumeSource(path)
+
+    assert source.files == ["a/c.PDF", "b.pdf"]
+    assert source.manifest["b.pdf"]["email"] == "bea@example.com"
+    with pytest.raises(ValueError):
+        ResumeSource(str(tmp_path / "missing"))
+
+
+def test_zip_is_ingested_with_identity_and_index(tmp_path, db):
+    path = write_zip(tmp_path / "resumes.zip", {
+        "jane_doe.pdf": make_pdf("Jane Doe", "jane@example.com", "Python engineer"),
+        "bob.pdf": make_pdf("Bob", "Go developer with ten years of experience"),
+        "manifest.csv": "file,name,email\nbob.pdf,Bob Stone,bob@example.com\n",
+    })
+    analyzer = FakeResumeAnalyzer()
+    report = make_ingestor(path, db, analyzer).run()
+
+    assert report["status"] == "completed"
+    assert (report["ingested"], report["failed"]) == (2, 0)
+    jane = db.find_candidate_by("email", "jane@example.com")
+    assert jane["name"] == "Jane Doe"
+    assert jane["resume_url"].endswith(f"/{jane['id']}/jane_doe.pdf")
+    assert db.find_candidate_by("email", "bob@example.com")["name"] == "Bob Stone"
+    assert len(analyzer.resume_index) == 2
+
+
+def test_bad_files_are_reported_not_fatal(tmp_path, db):
+    path = write_zip(tmp_path / "resumes.zip", {
+        "broken.pdf": b"not a pdf",
+        "anonymous.pdf": make_pdf("No contact details here at all"),
+        "ok.pdf": make_pdf("ok@example.com Python"),
+    })
+    report = make_ingestor(path, db).run()
+
+    assert report["ingested"] == 1
+    errors = {error["file"]: error["error"] for error in report["errors"]}
+    assert set(errors) == {"broken.pdf", "anonymous.pdf"}
+    assert "manifest.csv" in errors["anonymous.pdf"]
+
+
+def test_repeated_text_is_extracted_once(tmp_path, db):
+    path = write_zip(tmp_path / "resumes.zip", {
+        "one.pdf": make_pdf("Shared resume text", "Python engineer", "one@example.com"),
+        "two.pdf": make_pdf("Shared resume text", "Python engineer", "one@example.com"),
+    })
+    analyzer = FakeResumeAnalyzer()
+    report = make_ingestor(path, db, analyzer).run()
+
+    # Same email twice in a batch: the second file is rejected before extraction
+    assert report["ingested"] == 1
+    assert len(analyzer.extracted) == 1
+
+    other = write_zip(tmp_path / "more.zip", {"three.pdf": make_pdf("Shared resume text", "Python engineer", "one@example.com")})
+    report = make_ingestor(other, db, analyzer).run()
+    assert report["deduplicated"] == 1
+    assert len(analyzer.extracted) == 1
+
+
+def test_failed_extraction_is_stored_without_hashes(tmp_path, db):
+    path = write_zip(tmp_path / "resumes.zip", {"jane.pdf": make_pdf("jane@example.com Python")})
+    make_ingestor(path, db, FakeResumeAnalyzer(EMPTY)).run()
+
+    jane = db.find_candidate_by("email", "jane@example.com")
+    assert jane["resume_sha256"] is None
+    assert jane["resume_text_sha256"] is None
+
+
+def test_checkpoint_resumes_an_interrupted_run(tmp_path, db):
+    files = {f"c{index}.pdf": make_pdf(f"c{index}@example.com Python resume {index}") for index in range(5)}
+    path = write_zip(tmp_path / "resumes.zip", files)
+    checkpoint = tmp_path / "run.json"
+
+    report = make_ingestor(path, db, checkpoint_path=str(checkpoint), batch_size=2).run()
+    assert report["ingested"] == 5
+    assert len(json.loads(checkpoint.read_text())["done"]) == 5
+
+    analyzer = FakeResumeAnalyzer()
+    report = make_ingestor(path, db, analyzer, checkpoint_path=str(checkpoint)).run()
+    assert (report["resumed"], report["ingested"]) == (5, 0)
+    assert analyzer.extracted == []
+
+
+def test_progress_is_reported_per_batch(tmp_path, db):
+    path = write_zip(tmp_path / "resumes.zip", {f"c{i}.pdf": make_pdf(f"c{i}@example.com Python resume") for i in range(3)})
+    snapshots = []
+    make_ingestor(path, db, batch_size=1).run(on_progress=snapshots.append)
+
+    assert [snapshot["ingested"] for snapshot in snapshots] == [1, 2, 3]
+    assert all(snapshot["status"] == "running" for snapshot in snapshots)
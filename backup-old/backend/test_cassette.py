@@ -0,0 +1,95 @@
+"""Tests for recording and replaying external calls."""
+
+import asyncio
+import gzip
+
+import pytest
+
+from src.utils.cassette import MODE_OFF, MODE_RECORD, MODE_REPLAY, Cassette, CassetteMiss
+
+
+@pytest.fixture(params=["session.jsonl", "session.jsonl.gz"])
+def path(request, tmp_path):
+    return str(tmp_path / "nested" / request.param)
+
+
+def test_record_then_replay_round_trips(path):
+    recorder = Cassette(path, MODE_RECORD)
+    assert recorder.call("llm", {"prompt": "hi"}, lambda: {"text": "hello"}, label="model") == {"text": "hello"}
+    assert recorder.stats()["recorded"] == 1
+
+    player = Cassette(path, MODE_REPLAY)
+    assert player.call("llm", {"prompt": "hi"}, lambda: pytest.fail("live call in replay")) == {"text": "hello"}
+    assert player.stats()["replayed"] == 1
+
+
+def test_gz_path_is_compressed(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    Cassette(path, MODE_RECORD).record("llm", "request", "response", 0.1)
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert '"response":"response"' in f.read()
+
+
+def test_repeated_requests_replay_in_order(path):
+    recorder = Cassette(path, MODE_RECORD)
+    for answer in ("first", "second"):
+        recorder.record("llm", "same", answer, 0.0)
+
+    player = Cassette(path, MODE_REPLAY)
+    # Once the recorded responses run out the last one is reused
+    assert [player.replay("llm", "same")[0] for _ in range(3)] == ["first", "second", "second"]
+
+
+def test_key_ignores_dict_order_but_not_kind():
+    assert Cassette.make_key("llm", {"a": 1, "b": 2}) == Cassette.make_key("llm", {"b": 2, "a": 1})
+    assert Cassette.make_key("llm", "x") != Cassette.make_key("speech", "x")
+
+
+def test_unrecorded_request_raises_miss(path):
+    Cassette(path, MODE_RECORD).record("llm", "known", "answer", 0.0)
+    player = Cassette(path, MODE_REPLAY)
+
+    with pytest.raises(CassetteMiss):
+        player.replay("llm", "unknown")
+    with pytest.raises(KeyError):
+        player.call("speech", "known", lambda: "live")
+
+
+def test_replay_delay_is_scaled_by_timing(path):
+    Cassette(path, MODE_RECORD).record("llm", "request", "answer", 2.0)
+
+    assert Cassette(path, MODE_REPLAY).replay("llm", "request") == ("answer", 0.0)
+    assert Cassette(path, MODE_REPLAY, timing=0.5).replay("llm", "request") == ("answer", 1.0)
+
+
+def test_invalid_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "session.jsonl"), "playback")
+
+
+def test_off_mode_passes_calls_through(tmp_path):
+    path = tmp_path / "session.jsonl"
+    cassette = Cassette(str(path), MODE_OFF)
+
+    async def live():
+        return "async live"
+
+    assert not cassette.active
+    assert cassette.call("llm", "request", lambda: "live") == "live"
+    assert asyncio.run(cassette.acall("llm", "request", live)) == "async live"
+    assert not path.exists()
+
+
+def test_async_record_then_replay(path):
+    async def live():
+        return {"text": "streamed"}
+
+    recorder = Cassette(path, MODE_RECORD)
+    assert asyncio.run(recorder.acall("llm", "request", live)) == {"text": "streamed"}
+
+    async def unexpected():
+        pytest.fail("live call in replay")
+
+    player = Cassette(path, MODE_REPLAY)
+    assert asyncio.run(player.acall("llm", "request", unexpected)) == {"text": "streamed"}
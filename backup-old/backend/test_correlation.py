@@ -0,0 +1,74 @@
+"""Tests for the vectorized correlation engine, checked against the original pandas implementation."""
+
+import random
+
+import pytest
+
+from benchmarks.benchmark_correlation import check_equal, legacy_correlation_matrix, make_candidates
+from src.utils.correlation import CorrelationEngine
+
+JOB_FIELDS = [
+    {"field": "Data Analysis", "score": 80},
+    {"field": "Machine Learning", "score": 60},
+    {"field": "Technical Writing", "score": 25},
+]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_random_candidates_match_pandas(seed):
+    rng = random.Random(seed)
+    job_fields = [{"field": f"Field {index}", "score": rng.randint(20, 100)} for index in range(6)]
+    candidates = make_candidates(job_fields, 50, rng)
+
+    for want, got in zip([legacy_correlation_matrix(job_fields, c) for c in candidates], CorrelationEngine(job_fields).score(candidates)):
+        check_equal(want, got)
+
+
+def test_missing_and_extra_fields():
+    candidate = [
+        {"field": "Machine Learning", "score": 90, "evidence": "Built models"},
+        {"field": "Cooking", "score": 100, "evidence": "Chef"},
+    ]
+    result = CorrelationEngine(JOB_FIELDS).score([candidate])[0]
+
+    check_equal(legacy_correlation_matrix(JOB_FIELDS, candidate), result)
+    assert [row["field"] for row in result["visualization_data"]] == ["Data Analysis", "Machine Learning", "Technical Writing"]
+    assert result["visualization_data"][0]["evidence"] == "No matching evidence found"
+
+
+def test_duplicate_field_names_match_pandas():
+    job_fields = JOB_FIELDS + [{"field": "Data Analysis", "score": 40}]
+    candidate = [
+        {"field": "Data Analysis", "score": 70, "evidence": "SQL"},
+        {"field": "Data Analysis", "score": 50, "evidence": "Excel"},
+    ]
+    check_equal(legacy_correlation_matrix(job_fields, candidate), CorrelationEngine(job_fields).score([candidate])[0])
+
+
+def test_perfect_candidate_scores_by_importance():
+    candidate = [{"field": jf["field"], "score": 100} for jf in JOB_FIELDS]
+    # sum(importance^2) / 100 / total importance * 100
+    expected = round(sum(jf["score"] ** 2 for jf in JOB_FIELDS) / sum(jf["score"] for jf in JOB_FIELDS), 1)
+    assert CorrelationEngine(JOB_FIELDS).score([candidate])[0]["correlation_score"] == expected
+
+
+def test_candidate_without_fields_scores_zero():
+    result = CorrelationEngine(JOB_FIELDS).score([[]])[0]
+    assert result["correlation_score"] == 0
+    assert all(row["score_candidate"] == 0 for row in result["visualization_data"])
+
+
+def test_zero_importance_scores_zero():
+    job_fields = [{"field": "Data Analysis", "score": 0}]
+    result = CorrelationEngine(job_fields).score([[{"field": "Data Analysis", "score": 90}]])[0]
+    assert result["correlation_score"] == 0
+
+
+def test_scores_only_skips_visualization():
+    results = CorrelationEngine(JOB_FIELDS).score([[], [{"field": "Data Analysis", "score": 50}]], visualization=False)
+    assert [list(result) for result in results] == [["correlation_score"], ["correlation_score"]]
+    assert results[1]["correlation_score"] > 0
+
+
+def test_no_candidates():
+    assert CorrelationEngine(JOB_FIELDS).score([]) == []
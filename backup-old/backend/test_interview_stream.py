@@ -0,0 +1,125 @@
+"""Tests for streamed interview creation and the per-job question bank."""
+
+import threading
+import time
+
+import pytest
+
+from src.agents.question_generator import FALLBACK_QUESTIONS, QuestionGeneratorAgent
+from src.services.interview_manager import InterviewManager
+from src.utils.database import SupabaseClient
+from src.utils.minhash_lsh import MinHashLSH
+
+
+def make_questions(count):
+    return [{"question": f"Question {index}?", "type": "technical", "skill_assessed": "python"} for index in range(count)]
+
+
+class FakeQuestionGenerator:
+    question_bank_hash = QuestionGeneratorAgent.question_bank_hash
+
+    def __init__(self, questions, delay=0.0, fail_after=None):
+        self.questions = questions
+        self.delay = delay
+        self.fail_after = fail_after
+        self.generations = 0
+
+    def stream_questions(self, job_description, required_skills=None, count=5):
+        self.generations += 1
+        for index, question in enumerate(self.questions[:count]):
+            if index == self.fail_after:
+                raise RuntimeError("connection reset")
+            time.sleep(self.delay)
+            yield question
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    return SupabaseClient()
+
+
+@pytest.fixture
+def job(db):
+    return db.create_job_description("default", "Backend Engineer", "Build APIs in Python.", required_skills=["Python"])
+
+
+def make_manager(db, generator):
+    manager = object.__new__(InterviewManager)
+    manager.db = db
+    manager.question_generator = generator
+    manager.job_index = MinHashLSH()
+    return manager
+
+
+def test_stream_sends_interview_then_each_question(db, job):
+    manager = make_manager(db, FakeQuestionGenerator(make_questions(5)))
+    candidate = db.create_candidate("Jane", "jane@example.com")
+
+    events = list(manager.stream_interview(job["id"], candidate["id"]))
+
+    assert [event["event"] for event in events] == ["interview"] + ["question"] * 5 + ["done"]
+    assert [event["data"]["order_index"] for event in events[1:-1]] == [0, 1, 2, 3, 4]
+    assert events[-1]["data"]["question_count"] == 5
+    assert not events[-1]["data"]["fallback"]
+    # The generated bank is stored for the next interview
+    assert db.get_job_description(job["id"])["question_bank_hash"]
+
+
+def test_stored_bank_is_reused(db, job):
+    generator = FakeQuestionGenerator(make_questions(5))
+    manager = make_manager(db, generator)
+    candidate = db.create_candidate("Jane", "jane@example.com")
+
+    list(manager.stream_interview(job["id"], candidate["id"]))
+    events = list(manager.stream_interview(job["id"], candidate["id"]))
+
+    assert len([event for event in events if event["event"] == "question"]) == 5
+    assert generator.generations == 1
+
+
+def test_slow_consumer_does_not_block_other_requests(db, job):
+    manager = make_manager(db, FakeQuestionGenerator(make_questions(5), delay=0.02))
+    stream = manager.iter_question_bank(dict(job))
+    assert next(stream)["question"] == "Question 0?"
+
+    # The stream is paused mid-bank; another request for the job must still finish
+    result = {}
+    other = threading.Thread(target=lambda: result.update(bank=manager.get_question_bank(dict(job))))
+    other.start()
+    other.join(timeout=5)
+
+    assert not other.is_alive()
+    assert len(result["bank"]) == 5
+    assert [question["question"] for question in stream] == [f"Question {index}?" for index in range(1, 5)]
+
+
+def test_partial_generation_is_completed_with_fallback(db, job):
+    manager = make_manager(db, FakeQuestionGenerator(make_questions(5), fail_after=2))
+    candidate = db.create_candidate("Jane", "jane@example.com")
+
+    events = list(manager.stream_interview(job["id"], candidate["id"]))
+    texts = [event["data"]["text"] for event in events if event["event"] == "question"]
+
+    assert texts[:2] == ["Question 0?", "Question 1?"]
+    assert texts[2:] == [question["question"] for question in FALLBACK_QUESTIONS[:3]]
+    assert events[-1]["event"] == "done"
+    assert events[-1]["data"]["fallback"]
+    # A partial bank is never stored
+    assert not db.get_job_description(job["id"]).get("question_bank_hash")
+
+
+def test_storage_failure_marks_interview_failed(db, job, monkeypatch):
+    manager = make_manager(db, FakeQuestionGenerator(make_questions(5)))
+    candidate = db.create_candidate("Jane", "jane@example.com")
+
+    def fail(*args, **kwargs):
+        raise ValueError("insert failed")
+
+    monkeypatch.setattr(db, "create_questions", fail)
+    stream = manager.stream_interview(job["id"], candidate["id"])
+    interview = next(stream)["data"]
+
+    with pytest.raises(ValueError):
+        list(stream)
+    assert db.get_interview(interview["id"])["status"] == "failed"
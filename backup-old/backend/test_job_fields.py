@@ -0,0 +1,117 @@
+"""Tests for storing a job's professional fields and recomputing them on change."""
+
+import pytest
+
+from src.agents.resume_analyzer import FALLBACK_JOB_FIELDS, ResumeAnalyzer
+from src.services import job_warmup
+from src.services.interview_manager import InterviewManager
+from src.utils.database import SupabaseClient
+from src.utils.minhash_lsh import MinHashLSH
+
+FIELDS = [{"field": "Backend Development", "importance": 90}, {"field": "Databases", "importance": 60}]
+
+
+class FakeResumeAnalyzer:
+    description_hash = ResumeAnalyzer.description_hash
+
+    def __init__(self, fields=FIELDS):
+        self.fields = fields
+        self.calls = []
+
+    def identify_job_fields(self, job_description):
+        self.calls.append(job_description)
+        return [dict(field) for field in self.fields]
+
+
+class FakeQuestionGenerator:
+    def question_bank_hash(self, job_description, required_skills=None):
+        return "bank"
+
+    def stream_questions(self, job_description, required_skills=None, count=5):
+        return iter([])
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    return SupabaseClient()
+
+
+@pytest.fixture
+def job(db):
+    return db.create_job_description("default", "Backend Engineer", "Build APIs in Python.")
+
+
+def make_manager(db, analyzer):
+    manager = object.__new__(InterviewManager)
+    manager.db = db
+    manager.resume_analyzer = analyzer
+    manager.question_generator = FakeQuestionGenerator()
+    manager.job_index = MinHashLSH()
+    return manager
+
+
+def test_description_hash_ignores_case_and_whitespace():
+    analyzer = FakeResumeAnalyzer()
+    assert analyzer.description_hash("Build  APIs\nin Python.") == analyzer.description_hash("build apis in python.")
+    assert analyzer.description_hash("Build APIs") != analyzer.description_hash("Build UIs")
+
+
+def test_stored_fields_are_reused(db, job):
+    analyzer = FakeResumeAnalyzer()
+    manager = make_manager(db, analyzer)
+
+    assert manager.get_job_fields(dict(job)) == FIELDS
+    stored = db.get_job_description(job["id"])
+    assert stored["job_fields_hash"] == analyzer.description_hash(job["description"])
+
+    # A new request reads the stored fields instead of calling the LLM
+    assert make_manager(db, analyzer).get_job_fields(stored) == FIELDS
+    assert len(analyzer.calls) == 1
+
+
+def test_cosmetic_edit_keeps_stored_fields(db, job):
+    analyzer = FakeResumeAnalyzer()
+    manager = make_manager(db, analyzer)
+    manager.get_job_fields(dict(job))
+
+    db.update_job_description(job["id"], description="  build APIs in   PYTHON. ")
+    manager.get_job_fields(db.get_job_description(job["id"]))
+
+    assert len(analyzer.calls) == 1
+
+
+def test_fields_are_recomputed_after_the_description_changes(db, job):
+    from fastapi.testclient import TestClient
+    from src.api.app import app, get_db, get_interview_manager
+
+    analyzer = FakeResumeAnalyzer()
+    manager = make_manager(db, analyzer)
+    manager.get_job_fields(dict(job))
+
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_interview_manager] = lambda: manager
+    try:
+        response = TestClient(app).put(f"/jobs/{job['id']}", json={"description": "Build data pipelines in Scala."})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert job_warmup.wait_for_warmup(db, job["id"], timeout=5) == job_warmup.WARMUP_READY
+    assert analyzer.calls == ["Build APIs in Python.", "Build data pipelines in Scala."]
+    stored = db.get_job_description(job["id"])
+    assert stored["job_fields_hash"] == analyzer.description_hash("Build data pipelines in Scala.")
+
+
+def test_fallback_fields_are_not_stored(db, job):
+    analyzer = FakeResumeAnalyzer(fields=FALLBACK_JOB_FIELDS)
+    manager = make_manager(db, analyzer)
+
+    assert manager.get_job_fields(dict(job)) == FALLBACK_JOB_FIELDS
+    stored = db.get_job_description(job["id"])
+    assert not stored.get("job_fields")
+    assert not stored.get("job_fields_hash")
+
+    # The next request tries the LLM again
+    manager.get_job_fields(stored)
+    assert len(analyzer.calls) == 2
@@ -0,0 +1,91 @@
+"""Tests for background job warm-up and waiting on it."""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.services import job_warmup
+from src.utils.database import SupabaseClient
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    return SupabaseClient()
+
+
+@pytest.fixture
+def job(db):
+    return db.create_job_description("default", "Backend Engineer", "Build APIs in Python.")
+
+
+class FakeManager:
+    def __init__(self, db, release=None):
+        self.db = db
+        self.release = release
+        self.calls = []
+
+    def get_job_fields(self, job):
+        if self.release:
+            self.release.wait(5)
+        self.calls.append("job_fields")
+
+    def get_question_bank(self, job):
+        self.calls.append("question_bank")
+
+
+def started(seconds_ago):
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)).isoformat()
+
+
+def test_warmup_runs_both_stages_and_stores_status(db, job):
+    manager = FakeManager(db)
+    returned = job_warmup.start_warmup(manager, job)
+
+    assert returned["warmup_status"] == job_warmup.WARMUP_RUNNING
+    assert db.get_job_description(job["id"])["warmup_started_at"]
+    assert job_warmup.wait_for_warmup(db, job["id"], timeout=5) == job_warmup.WARMUP_READY
+    assert sorted(manager.calls) == ["job_fields", "question_bank"]
+    assert db.get_job_description(job["id"])["warmup_status"] == job_warmup.WARMUP_READY
+
+
+def test_local_warmup_is_awaited(db, job):
+    release = threading.Event()
+    job_warmup.start_warmup(FakeManager(db, release), job)
+
+    assert job_warmup.wait_for_warmup(db, job["id"], timeout=0.1) == job_warmup.WARMUP_RUNNING
+    release.set()
+    assert job_warmup.wait_for_warmup(db, job["id"], timeout=5) == job_warmup.WARMUP_READY
+
+
+def test_stale_warmup_counts_as_failed(db, job):
+    # Left behind by a process that died mid-warm-up
+    db.update_job_status(job["id"], job_warmup.WARMUP_RUNNING, started(job_warmup.JOB_WARMUP_STALE_SECONDS + 60))
+
+    began = time.monotonic()
+    assert job_warmup.wait_for_warmup(db, job["id"], timeout=30) == job_warmup.WARMUP_FAILED
+    assert time.monotonic() - began < 1
+
+
+def test_warmup_without_start_time_counts_as_failed(db, job):
+    db.update_job_status(job["id"], job_warmup.WARMUP_RUNNING)
+    assert job_warmup.wait_for_warmup(db, job["id"], timeout=30) == job_warmup.WARMUP_FAILED
+
+
+def test_other_process_warmup_is_polled(db, job, monkeypatch):
+    monkeypatch.setattr(job_warmup, "POLL_SECONDS", 0.01)
+    db.update_job_status(job["id"], job_warmup.WARMUP_RUNNING, started(1))
+    finish = threading.Timer(0.1, db.update_job_status, (job["id"], job_warmup.WARMUP_READY))
+    finish.start()
+
+    assert job_warmup.wait_for_warmup(db, job["id"], timeout=5) == job_warmup.WARMUP_READY
+    finish.join()
+
+
+def test_fresh_warmup_gives_up_after_timeout(db, job, monkeypatch):
+    monkeypatch.setattr(job_warmup, "POLL_SECONDS", 0.01)
+    db.update_job_status(job["id"], job_warmup.WARMUP_RUNNING, started(1))
+
+    assert job_warmup.wait_for_warmup(db, job["id"], timeout=0.05) == job_warmup.WARMUP_RUNNING
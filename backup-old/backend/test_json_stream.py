@@ -0,0 +1,197 @@
+"""Tests for incremental JSON parsing and streamed structured prompts."""
+
+import asyncio
+
+import pytest
+
+from src.utils.json_stream import IncrementalJSONParser, extract_json
+from src.utils.llm import LLMClient
+from src.utils.llm_cache import LLMResponseCache, make_cache_key
+from src.utils.llm_scheduler import LLMScheduler
+
+RESPONSE = '```json\n{"questions": [{"q": "a, [b]"}, {"q": "c \\"}\\""}], "count": 2}\n```'
+
+
+def feed_in_chunks(parser, text, size):
+    elements = []
+    for start in range(0, len(text), size):
+        elements.extend(parser.feed(text[start:start + size]))
+    return elements
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_elements_are_emitted_as_they_close(size):
+    parser = IncrementalJSONParser()
+    elements = feed_in_chunks(parser, RESPONSE, size)
+
+    assert elements == [{"q": "a, [b]"}, {"q": 'c "}"'}]
+    assert parser.done
+    assert parser.result() == {"questions": elements, "count": 2}
+
+
+def test_top_level_array_of_scalars():
+    parser = IncrementalJSONParser()
+    assert parser.feed("[1, 2") == [1]
+    assert parser.feed(", 3]") == [2, 3]
+    assert parser.result() == [1, 2, 3]
+
+
+def test_nested_arrays_are_not_split():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"a": {"b": [1, 2]}, "c": [[1], [2]]}') == [[1], [2]]
+
+
+def test_text_after_the_value_is_ignored():
+    parser = IncrementalJSONParser()
+    parser.feed('[1]\nHope this helps! [2]')
+    assert parser.result() == [1]
+    assert parser.feed("[3]") == []
+
+
+def test_incomplete_json_fails():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"questions": [{"q": 1}, {"q"') == [{"q": 1}]
+    assert not parser.done
+    with pytest.raises(ValueError):
+        parser.result()
+
+
+def test_extract_json_skips_prose_and_braces_in_strings():
+    assert extract_json('Sure! {"a": "}{", "b": [1, {"c": 2}]} done') == {"a": "}{", "b": [1, {"c": 2}]}
+    with pytest.raises(ValueError):
+        extract_json("no json here")
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class Chunk:
+    def __init__(self, content):
+        self.content = content
+
+
+class FakeStreamingModel:
+    """Streams scripted responses; an exception in the script is raised on the first chunk."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def stream(self, messages):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        for index in range(0, len(response), 5):
+            yield Chunk(response[index:index + 5])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.delenv("LLM_CACHE_PATH", raising=False)
+    monkeypatch.setenv("LLM_BACKOFF_BASE", "0.01")
+    monkeypatch.setenv("LLM_BACKOFF_CAP", "0.01")
+    client = LLMClient()
+    monkeypatch.setattr(client, "cache", LLMResponseCache())
+    monkeypatch.setattr(client, "scheduler", LLMScheduler())
+    return client
+
+
+def use_model(client, monkeypatch, responses):
+    model = FakeStreamingModel(responses)
+    monkeypatch.setattr(client, "get_llm", lambda *args: model)
+    return model
+
+
+def test_stream_is_retried_before_the_first_chunk(client, monkeypatch):
+    model = use_model(client, monkeypatch, [RateLimited("slow down"), '[{"q": 1}, {"q": 2}]'])
+
+    assert list(client.stream_structured_prompt("Questions", "job")) == [{"q": 1}, {"q": 2}]
+    assert model.calls == 2
+    assert client.scheduler_stats()[client._resolve_model_name(None)]["throttled"] == 1
+
+
+def test_complete_stream_is_cached_and_replayed(client, monkeypatch):
+    model = use_model(client, monkeypatch, ['[{"q": 1}, {"q": 2}]'])
+
+    first = list(client.stream_structured_prompt("Questions", "job"))
+    assert list(client.stream_structured_prompt("Questions", "job")) == first
+    assert model.calls == 1
+
+
+def test_unclosed_stream_is_not_cached(client, monkeypatch):
+    model = use_model(client, monkeypatch, ['[{"q": 1}, {"q"', '[{"q": 3}]'])
+
+    stream = client.stream_structured_prompt("Questions", "job")
+    assert next(stream) == {"q": 1}
+    with pytest.raises(ValueError):
+        list(stream)
+
+    assert list(client.stream_structured_prompt("Questions", "job")) == [{"q": 3}]
+    assert model.calls == 2
+
+
+def test_unclosed_cache_entry_is_dropped(client, monkeypatch):
+    model = use_model(client, monkeypatch, ['[{"q": 3}]'])
+    system_prompt = client._json_system_prompt("Questions")
+    key = make_cache_key(client._resolve_model_name(None), system_prompt, "job", 0.2)
+    client.cache.set(key, '[{"q": 1}, {"q"')
+
+    assert list(client.stream_structured_prompt("Questions", "job")) == [{"q": 3}]
+    assert model.calls == 1
+
+
+class FakeAsyncStream:
+    def __init__(self, text):
+        self.events = [
+            type("Event", (), {"choices": [type("Choice", (), {"delta": type("Delta", (), {"content": text[i:i + 5]})()})()]})()
+            for i in range(0, len(text), 5)
+        ]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.events:
+            raise StopAsyncIteration
+        return self.events.pop(0)
+
+
+class FakeAsyncClient:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+        self.chat = type("Chat", (), {"completions": self})()
+
+    async def create(self, **params):
+        self.calls += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return FakeAsyncStream(response)
+
+
+def collect(client, *args):
+    async def run():
+        return [element async for element in client.astream_structured_prompt(*args)]
+    return asyncio.run(run())
+
+
+def test_async_stream_is_retried_and_cached(client, monkeypatch):
+    fake = FakeAsyncClient([RateLimited("slow down"), '{"questions": [1, 2]}'])
+    monkeypatch.setattr(client, "get_async_client", lambda *args: fake)
+
+    assert collect(client, "Questions", "job") == [1, 2]
+    assert collect(client, "Questions", "job") == [1, 2]
+    assert fake.calls == 2
+    assert all(stats["in_flight"] == 0 for stats in client.concurrency.stats().values())
+
+
+def test_async_unclosed_stream_is_not_cached(client, monkeypatch):
+    fake = FakeAsyncClient(['{"questions": [1, 2', '{"questions": [3]}'])
+    monkeypatch.setattr(client, "get_async_client", lambda *args: fake)
+
+    with pytest.raises(ValueError):
+        collect(client, "Questions", "job")
+    assert collect(client, "Questions", "job") == [3]
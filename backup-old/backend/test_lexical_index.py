@@ -0,0 +1,115 @@
+"""Tests for the incremental BM25 index and the lexical pre-filter."""
+
+import pytest
+
+from src.agents.resume_analyzer import ResumeAnalyzer
+from src.utils.lexical_index import LexicalIndex, resume_text, tokenize
+
+JOB = "Senior Python engineer to build Django APIs on PostgreSQL"
+
+
+@pytest.fixture
+def index():
+    index = LexicalIndex()
+    index.add("python", "Python developer, Django and PostgreSQL APIs")
+    index.add("java", "Java developer, Spring and Oracle")
+    index.add("chef", "Pastry chef with restaurant experience")
+    return index
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    analyzer = ResumeAnalyzer()
+    analyzer.resume_index = LexicalIndex()
+    return analyzer
+
+
+def test_tokenize_drops_stopwords_and_keeps_symbols():
+    assert tokenize("The C++ and C# engineer") == ["c++", "c#", "engineer"]
+
+
+def test_resume_text_flattens_nested_data():
+    text = resume_text({"skills": ["Python"], "experience": [{"title": "Engineer", "years": 3}]})
+    assert text.split("\n") == ["Python", "Engineer"]
+
+
+def test_bm25_ranks_relevant_documents_first(index):
+    scores = index.score(JOB)
+    assert max(scores, key=scores.get) == "python"
+    assert "chef" not in scores
+    assert index.score(JOB, ["chef"]) == {"chef": 0.0}
+
+
+def test_replacing_a_document_updates_statistics(index):
+    index.add("chef", "Python Django PostgreSQL")
+    assert index.score(JOB, ["chef"])["chef"] > 0
+    assert len(index) == 3
+
+    index.remove("chef")
+    assert "chef" not in index
+    assert index.stats()["documents"] == 2
+
+
+def test_unchanged_text_is_not_reindexed(index, monkeypatch):
+    calls = []
+    monkeypatch.setattr("src.utils.lexical_index.tokenize", lambda text: calls.append(text) or text.split())
+    index.add("python", "Python developer, Django and PostgreSQL APIs")
+    assert calls == []
+
+
+def test_score_text_matches_indexing_without_keeping_the_document(index):
+    text = "Python Django engineer"
+    scores = index.score_text(JOB, text)
+    assert len(index) == 3
+
+    index.add("probe", text)
+    assert scores["bm25"] == pytest.approx(index.score(JOB, ["probe"])["probe"])
+    assert scores["match"] == pytest.approx(index.match_ratio(JOB, "probe"))
+
+
+def test_score_text_on_empty_index():
+    scores = LexicalIndex().score_text(JOB, "Python")
+    assert 0 < scores["match"] < 1
+    assert scores["bm25"] > 0
+    assert LexicalIndex().score_text("", "Python") == {"match": 0.0, "bm25": 0.0}
+
+
+def test_prefilter_leaves_the_index_unchanged(analyzer):
+    for index in range(5):
+        analyzer.prefilter(f"Python engineer number {index}", JOB)
+    assert len(analyzer.resume_index) == 0
+
+
+def test_prefilter_is_off_by_default(analyzer):
+    result = analyzer.prefilter("Pastry chef", JOB)
+    assert result["min_match"] == 0
+    assert result["passed"]
+    assert not analyzer.prefilter("Pastry chef", JOB, min_match=0.05)["passed"]
+
+
+def test_filtered_resume_is_marked(analyzer):
+    result = analyzer.analyze_resume_for_job("Pastry chef", JOB, min_match=0.05)
+    assert result["filtered"]
+    assert result["correlation"]["correlation_score"] == 0.0
+    assert result["prefilter"]["min_match"] == 0.05
+
+
+def test_prefilter_candidates_ranks_and_cuts(analyzer):
+    candidates = [
+        ("chef", {"skills": ["Pastry"]}),
+        ("python", {"skills": ["Python", "Django", "PostgreSQL"]}),
+        ("partial", {"skills": ["Python"]}),
+    ]
+    passed, details = analyzer.prefilter_candidates(candidates, JOB, top_n=1, min_match=0.05)
+
+    assert [candidate_id for candidate_id, _ in passed] == ["python"]
+    assert details["python"]["rank"] == 1
+    assert not details["partial"]["passed"]
+    assert not details["chef"]["passed"]
+
+
+def test_prefilter_candidates_reindexes_changed_resumes(analyzer):
+    analyzer.prefilter_candidates([("jane", {"skills": ["Pastry"]})], JOB)
+    _, details = analyzer.prefilter_candidates([("jane", {"skills": ["Python", "Django"]})], JOB)
+    assert details["jane"]["match"] > 0
@@ -0,0 +1,153 @@
+"""Tests for the async LLM client API against the local OpenRouter stand-in."""
+
+import asyncio
+
+import pytest
+
+from src.utils import llm
+from src.utils.llm import LLMClient
+from src.utils.llm_cache import LLMResponseCache
+from src.utils.llm_hedging import HedgingPolicy
+from src.utils.llm_pool import ModelClientRegistry, ModelConcurrencyLimiter
+from src.utils.llm_scheduler import LLMScheduler
+from src.utils.openrouter_standin import StandinConfig, start_server
+from src.utils.single_flight import SingleFlight
+
+MODEL = "standin/model"
+
+
+class FlakyConfig(StandinConfig):
+    """Answers the first `failures` requests with a 429."""
+
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+        self.server = None
+
+    def for_model(self, model_name, key):
+        if key == "error_429":
+            return 1.0 if self.server.counters["injected_429"] < self.failures else 0.0
+        return super().for_model(model_name, key)
+
+
+@pytest.fixture
+def serve(monkeypatch):
+    servers = []
+
+    def start(config):
+        server = start_server(config)
+        servers.append(server)
+        monkeypatch.setattr(llm, "OPENROUTER_BASE_URL", f"http://127.0.0.1:{server.server_port}/api/v1")
+        return server
+
+    monkeypatch.setenv("OPENROUTER_API_KEY", "standin")
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.delenv("LLM_CACHE_PATH", raising=False)
+    client = LLMClient()
+    scheduler = LLMScheduler()
+    scheduler.backoff_base = 0.0
+    monkeypatch.setattr(client, "registry", ModelClientRegistry())
+    monkeypatch.setattr(client, "cache", LLMResponseCache())
+    monkeypatch.setattr(client, "concurrency", ModelConcurrencyLimiter())
+    monkeypatch.setattr(client, "single_flight", SingleFlight())
+    monkeypatch.setattr(client, "hedging", HedgingPolicy())
+    monkeypatch.setattr(client, "scheduler", scheduler)
+    monkeypatch.setattr(client, "use_mock", False)
+    return client
+
+
+def in_flight(client):
+    return client.concurrency.stats()[MODEL]["in_flight"]
+
+
+def test_repeat_prompt_is_served_from_cache(serve, client):
+    server = serve(StandinConfig(script=[{"match": "ping", "response": "pong"}]))
+
+    async def run():
+        first = await client.asimple_prompt("system", "ping", MODEL)
+        second = await client.asimple_prompt("system", "ping", MODEL)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == "pong"
+    assert not first.cache_hit
+    assert second.cache_hit
+    assert server.counters["requests"] == 1
+
+
+def test_structured_prompt_parses_json(serve, client):
+    serve(StandinConfig(script=[{"match": "rate", "response": '{"score": 7}'}]))
+
+    assert asyncio.run(client.astructured_prompt("system", "rate this", MODEL)) == {"score": 7}
+
+
+def test_slot_is_released_after_success_and_error(serve, client):
+    server = serve(StandinConfig(script=[{"match": "", "response": "ok"}], models={"broken": {"error_500": 1.0}}))
+    client.scheduler.max_retries = 0
+
+    async def run():
+        await client.asimple_prompt("system", "hello", MODEL)
+        assert in_flight(client) == 0
+        with pytest.raises(Exception):
+            await client.asimple_prompt("system", "hello", "broken")
+        assert client.concurrency.stats()["broken"]["in_flight"] == 0
+        assert client.concurrency.semaphore("broken").in_use == 0
+
+    asyncio.run(run())
+    assert server.counters["injected_500"] == 1
+
+
+def test_429_is_retried_by_the_scheduler(serve, client):
+    config = FlakyConfig(failures=2, retry_after=0, script=[{"match": "", "response": "finally"}])
+    server = serve(config)
+    config.server = server
+
+    assert asyncio.run(client.asimple_prompt("system", "hello", MODEL)) == "finally"
+    assert server.counters["injected_429"] == 2
+    assert client.scheduler_stats()[MODEL]["retries"] == 2
+    assert client.scheduler_stats()[MODEL]["throttled"] == 2
+    assert in_flight(client) == 0
+
+
+def test_async_client_is_rebuilt_for_a_new_event_loop(serve, client):
+    serve(StandinConfig(script=[{"match": "", "response": "ok"}]))
+
+    async def get_twice():
+        first = client.get_async_client(MODEL)
+        assert client.get_async_client(MODEL) is first
+        return first
+
+    first = asyncio.run(get_twice())
+    second = asyncio.run(get_twice())
+
+    assert second is not first
+    stats = client.pool_stats()[MODEL]
+    assert stats["pool_misses"] == 2
+    assert stats["pool_hits"] == 2
+
+    # The rebuilt client is usable on its loop
+    assert asyncio.run(client.asimple_prompt("system", "hello", MODEL, use_cache=False)) == "ok"
+
+
+def test_generate_and_classify(serve, client):
+    serve(StandinConfig(script=[
+        {"match": "Classify", "response": "Technical"},
+        {"match": "", "response": "generated {model}"}
+    ]))
+
+    assert asyncio.run(client.agenerate_text("write something")) == f"generated {llm.GENERATION_MODEL}"
+    assert asyncio.run(client.aclassify_text("Designed an API", ["technical", "behavioral"])) == "technical"
+
+
+def test_async_score_extracts_number(serve, client):
+    serve(StandinConfig(script=[{"match": "", "response": "Score: 14"}]))
+
+    assert asyncio.run(client.aanalyze_text_with_score("answer", "clarity", model_name=MODEL)) == 14
@@ -0,0 +1,130 @@
+"""Tests for the two-tier LLM response cache."""
+
+import os
+import stat
+import time
+
+import pytest
+
+from src.utils.llm import LLMClient
+from src.utils.llm_cache import LLMResponseCache, MemoryCacheTier, SQLiteCacheTier, make_cache_key
+
+
+def test_cache_key_depends_on_every_input():
+    key = make_cache_key("model", "system", "user", 0.2)
+    assert key == make_cache_key("model", "system", "user", 0.2)
+    assert key != make_cache_key("other", "system", "user", 0.2)
+    assert key != make_cache_key("model", "system", "user", 0.7)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = MemoryCacheTier(max_entries=2, ttl=0)
+    tier.set("a", "1")
+    tier.set("b", "2")
+    tier.get("a")
+    tier.set("c", "3")
+
+    assert tier.get("a") == "1"
+    assert tier.get("b") is None
+    assert tier.get("c") == "3"
+
+
+def test_memory_tier_expires_entries():
+    tier = MemoryCacheTier(max_entries=10, ttl=60)
+    tier.set("a", "1", stored_at=time.time() - 120)
+    assert tier.get("a") is None
+
+
+def test_disk_tier_is_owner_only(tmp_path):
+    path = tmp_path / "cache" / "llm.sqlite3"
+    SQLiteCacheTier(str(path), max_entries=10, ttl=0).set("a", "1")
+
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(path.parent).st_mode) == 0o700
+
+
+def test_disk_tier_evicts_in_batches(tmp_path):
+    tier = SQLiteCacheTier(str(tmp_path / "llm.sqlite3"), max_entries=20, ttl=0)
+    for index in range(20):
+        tier.set(f"key-{index}", "value")
+    assert len(tier) == 20
+
+    tier.get("key-0")
+    tier.set("key-20", "value")
+
+    # One pass drops the overflow plus a 10% margin, oldest access first
+    assert len(tier) == 18
+    assert tier.get("key-0") is not None
+    assert tier.get("key-1") is None
+    assert tier.get("key-20") is not None
+
+
+def test_disk_tier_survives_reopen_and_delete(tmp_path):
+    path = str(tmp_path / "llm.sqlite3")
+    SQLiteCacheTier(path, max_entries=10, ttl=0).set("a", "1")
+
+    tier = SQLiteCacheTier(path, max_entries=10, ttl=0)
+    assert tier.get("a")[1] == "1"
+    tier.delete("a")
+    assert tier.get("a") is None
+    assert len(tier) == 0
+
+
+def test_disk_tier_is_opt_in(monkeypatch, tmp_path):
+    monkeypatch.delenv("LLM_CACHE_PATH", raising=False)
+    assert LLMResponseCache().disk is None
+
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.sqlite3"))
+    cache = LLMResponseCache()
+    cache.set("a", "1")
+    cache.memory.clear()
+    assert cache.get("a") == ("1", "disk")
+
+
+class FakeChatModel:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return type("Message", (), {"content": self.responses.pop(0)})()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.delenv("LLM_CACHE_PATH", raising=False)
+    client = LLMClient()
+    monkeypatch.setattr(client, "cache", LLMResponseCache())
+    return client
+
+
+def test_structured_prompt_caches_valid_json(client, monkeypatch):
+    model = FakeChatModel(['{"score": 7}'])
+    monkeypatch.setattr(client, "get_llm", lambda *args: model)
+
+    assert client.structured_prompt("Rate it", "resume text") == {"score": 7}
+    assert client.structured_prompt("Rate it", "resume text") == {"score": 7}
+    assert model.calls == 1
+
+
+def test_structured_prompt_does_not_cache_invalid_json(client, monkeypatch):
+    model = FakeChatModel(['{"score": 7', '{"score": 8}'])
+    monkeypatch.setattr(client, "get_llm", lambda *args: model)
+
+    with pytest.raises(ValueError):
+        client.structured_prompt("Rate it", "resume text")
+    # The retry reaches the model instead of replaying the truncated reply
+    assert client.structured_prompt("Rate it", "resume text") == {"score": 8}
+    assert model.calls == 2
+
+
+def test_invalid_cached_entry_is_dropped(client, monkeypatch):
+    model = FakeChatModel(['{"score": 9}'])
+    monkeypatch.setattr(client, "get_llm", lambda *args: model)
+    system_prompt = client._json_system_prompt("Rate it")
+    key = make_cache_key(client._resolve_model_name(None), system_prompt, "resume text", 0.2)
+    client.cache.set(key, "not json")
+
+    assert client.structured_prompt("Rate it", "resume text") == {"score": 9}
+    assert model.calls == 1
@@ -0,0 +1,130 @@
+"""Tests for hedging slow LLM calls to a secondary model."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.llm_hedging import HedgingPolicy, LatencyTracker
+from src.utils.llm_scheduler import LLMScheduler
+
+
+@pytest.fixture
+def policy(monkeypatch):
+    for name in ("LLM_HEDGE_MODELS", "LLM_HEDGE_FALLBACK_MODEL"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("LLM_HEDGE_INITIAL_DELAY", "0.05")
+    policy = HedgingPolicy()
+    policy.set_secondary("primary", "secondary")
+    return policy
+
+
+def responder(delays, answers=None):
+    def send(model):
+        time.sleep(delays[model])
+        value = (answers or {}).get(model, f"answer from {model}")
+        if isinstance(value, Exception):
+            raise value
+        return value
+    return send
+
+
+def test_latency_percentiles():
+    tracker = LatencyTracker(window=100)
+    for value in range(1, 101):
+        tracker.record("model", value / 100)
+    assert tracker.count("model") == 100
+    assert tracker.percentile("model", 50) == pytest.approx(0.5, abs=0.02)
+    assert tracker.percentile("other", 50) is None
+
+
+def test_models_without_secondary_are_not_hedged(policy):
+    assert policy.call("solo", responder({"solo": 0.1})) == "answer from solo"
+    assert policy.stats()["hedges_sent"] == 0
+
+
+def test_fast_primary_wins_without_hedging(policy):
+    assert policy.call("primary", responder({"primary": 0, "secondary": 0})) == "answer from primary"
+    assert policy.stats()["hedges_sent"] == 0
+    assert policy.stats()["primary_wins"] == 1
+
+
+def test_slow_primary_is_hedged(policy):
+    assert policy.call("primary", responder({"primary": 0.5, "secondary": 0})) == "answer from secondary"
+    stats = policy.stats()
+    assert stats["hedges_sent"] == 1
+    assert stats["secondary_wins"] == 1
+
+
+def test_failed_primary_falls_back_immediately(policy):
+    send = responder({"primary": 0, "secondary": 0}, {"primary": RuntimeError("500")})
+    assert policy.call("primary", send) == "answer from secondary"
+
+
+def test_empty_answers_do_not_win(policy):
+    send = responder({"primary": 0, "secondary": 0.01}, {"primary": "  "})
+    assert policy.call("primary", send) == "answer from secondary"
+
+
+def test_both_failing_raises_the_first_error(policy):
+    send = responder({"primary": 0, "secondary": 0}, {"primary": RuntimeError("primary down"), "secondary": RuntimeError("secondary down")})
+    with pytest.raises(RuntimeError, match="primary down"):
+        policy.call("primary", send)
+
+
+def test_delay_follows_observed_latency(policy):
+    assert policy.delay_for("primary") == 0.05
+    for _ in range(policy.min_samples):
+        policy.latency.record("primary", 1.0)
+    assert policy.delay_for("primary") == pytest.approx(1.0)
+
+
+def test_async_loser_is_cancelled(policy):
+    cancelled = []
+
+    async def send(model):
+        try:
+            await asyncio.sleep(0.5 if model == "primary" else 0)
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        return f"answer from {model}"
+
+    assert asyncio.run(policy.acall("primary", send)) == "answer from secondary"
+    assert cancelled == ["primary"]
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after):
+        super().__init__("429")
+        self.response = SimpleNamespace(status_code=429, headers={"retry-after": str(retry_after)})
+
+
+def test_scheduler_backoff_is_not_counted_as_latency(policy):
+    scheduler = LLMScheduler()
+    failures = [RateLimited(0.2)]
+
+    def upstream():
+        if failures:
+            raise failures.pop()
+        return "ok"
+
+    def send(model):
+        return scheduler.call(model, lambda: policy.timed(model, upstream), 1)
+
+    assert policy.call("solo", send) == "ok"
+    # Only the successful upstream attempt is sampled, without the 0.2s backoff
+    assert policy.latency.count("solo") == 1
+    assert policy.latency.percentile("solo", 100) < 0.1
+
+
+def test_async_latency_is_recorded_by_atimed(policy):
+    async def send(model):
+        await asyncio.sleep(0.2)
+        return await policy.atimed(model, lambda: asyncio.sleep(0, result="ok"))
+
+    assert asyncio.run(policy.acall("solo", send)) == "ok"
+    assert policy.latency.percentile("solo", 100) < 0.1
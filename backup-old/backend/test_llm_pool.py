@@ -0,0 +1,155 @@
+"""Tests for pooled LLM clients and per-model concurrency limits."""
+
+import asyncio
+
+import pytest
+
+from src.utils import llm
+from src.utils.llm import LLMClient
+from src.utils.llm_pool import ModelClientRegistry, ModelConcurrencyLimiter, ResizableSemaphore
+from src.utils.openrouter_standin import StandinConfig, start_server
+
+
+def test_semaphore_admits_waiters_in_order():
+    async def main():
+        semaphore = ResizableSemaphore(1)
+        order = []
+
+        async def worker(name):
+            await semaphore.acquire()
+            order.append(name)
+            await asyncio.sleep(0.01)
+            semaphore.release()
+
+        await asyncio.gather(*(worker(name) for name in "abc"))
+        return order, semaphore.in_use
+
+    assert asyncio.run(main()) == (list("abc"), 0)
+
+
+def test_growing_the_limit_admits_waiters():
+    async def main():
+        semaphore = ResizableSemaphore(1)
+        await semaphore.acquire()
+        waiter = asyncio.create_task(semaphore.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        semaphore.resize(2)
+        await asyncio.wait_for(waiter, 1)
+        return semaphore.in_use
+
+    assert asyncio.run(main()) == 2
+
+
+def test_shrinking_the_limit_keeps_held_slots_counted():
+    async def main():
+        semaphore = ResizableSemaphore(3)
+        for _ in range(3):
+            await semaphore.acquire()
+        semaphore.resize(1)
+        waiter = asyncio.create_task(semaphore.acquire())
+
+        semaphore.release()
+        semaphore.release()
+        await asyncio.sleep(0)
+        # Still one held of a limit of one
+        assert not waiter.done()
+
+        semaphore.release()
+        await asyncio.wait_for(waiter, 1)
+        return semaphore.in_use
+
+    assert asyncio.run(main()) == 1
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def main():
+        semaphore = ResizableSemaphore(1)
+        await semaphore.acquire()
+        waiter = asyncio.create_task(semaphore.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        semaphore.release()
+        return semaphore.in_use, semaphore.locked()
+
+    assert asyncio.run(main()) == (0, False)
+
+
+def test_set_limit_resizes_the_existing_semaphore():
+    limiter = ModelConcurrencyLimiter()
+
+    async def main():
+        async with limiter.slot("model"):
+            semaphore = limiter.semaphore("model")
+            limiter.set_limit("model", 1)
+            assert limiter.semaphore("model") is semaphore
+            assert semaphore.locked()
+            assert limiter.stats()["model"] == {"limit": 1, "in_flight": 1}
+        return semaphore.in_use
+
+    assert asyncio.run(main()) == 0
+
+
+def test_client_for_a_new_loop_closes_the_old_one():
+    registry = ModelClientRegistry()
+    old_loop = asyncio.new_event_loop()
+
+    async def get_client():
+        return registry.get_async("model", lambda http_client: http_client)
+
+    old_client = old_loop.run_until_complete(get_client())
+    new_client = asyncio.run(get_client())
+    # The close was handed to the old loop; let it run
+    old_loop.run_until_complete(asyncio.sleep(0.01))
+    old_loop.close()
+
+    assert new_client is not old_client
+    assert old_client.is_closed
+    assert registry.stats()["model"]["pool_misses"] == 2
+
+
+def test_same_loop_reuses_the_client():
+    registry = ModelClientRegistry()
+
+    async def main():
+        first = registry.get_async("model", lambda http_client: http_client)
+        second = registry.get_async("model", lambda http_client: http_client)
+        return first is second
+
+    assert asyncio.run(main())
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    server = start_server(StandinConfig(script=[{"match": "", "response": "pooled answer"}]))
+    monkeypatch.setattr(llm, "OPENROUTER_BASE_URL", f"http://127.0.0.1:{server.server_port}/api/v1")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "standin")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_sync_calls_share_one_pooled_client(standin, monkeypatch):
+    client = LLMClient()
+    registry = ModelClientRegistry()
+    monkeypatch.setattr(client, "registry", registry)
+    model_name = "standin/model"
+
+    first = client.get_llm(model_name, 0.2)
+    assert client.get_llm(model_name, 0.2) is first
+    assert client.get_llm(model_name, 0.7) is not first
+
+    assert client.simple_prompt("system", "first prompt", model_name, use_cache=False) == "pooled answer"
+    assert client.simple_prompt("system", "second prompt", model_name, use_cache=False) == "pooled answer"
+
+    stats = registry.stats()[model_name]
+    assert stats["pool_misses"] == 2
+    assert stats["pool_hits"] == 3
+    assert stats["temperatures"] == [0.2, 0.7]
+    # Both requests went over one keep-alive connection
+    assert stats["requests"] == 2
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 1
+    registry.close()
@@ -0,0 +1,230 @@
+"""Tests for LLM admission control: token buckets, priorities and retries."""
+
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from src.utils import llm_scheduler
+from src.utils.llm_scheduler import (
+    PRIORITY_BULK, PRIORITY_INTERACTIVE, LLMScheduler, TokenBucket, llm_priority, current_priority,
+    llm_deadline, remaining_time
+)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    for name in ("LLM_RPM", "LLM_TPM", "LLM_MODEL_RATE_LIMITS"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("LLM_BACKOFF_BASE", "0.01")
+    monkeypatch.setenv("LLM_BACKOFF_CAP", "0.01")
+    return LLMScheduler()
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(60)
+    now = bucket.updated
+    assert bucket.wait_time(60, now) == 0
+    bucket.consume(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1) == pytest.approx(0.0)
+
+
+def test_unlimited_bucket_only_waits_after_drain():
+    bucket = TokenBucket(0)
+    now = time.monotonic()
+    bucket.consume(10 ** 9)
+    assert bucket.wait_time(10 ** 9, now) == 0
+    bucket.drain(5)
+    assert 4 < bucket.wait_time(1, time.monotonic()) <= 5
+
+
+def test_defaults_are_unlimited(scheduler):
+    started = time.monotonic()
+    for _ in range(200):
+        scheduler.acquire("model", tokens=10000)
+    assert time.monotonic() - started < 1
+    assert scheduler.stats()["model"]["admitted"] == 200
+
+
+def test_configured_limits_throttle(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL_RATE_LIMITS", "slow=600:0")
+    scheduler = LLMScheduler()
+    started = time.monotonic()
+    # 600/minute allows a burst of 600, then one every 0.1s
+    for _ in range(602):
+        scheduler.acquire("slow", tokens=1)
+    assert time.monotonic() - started >= 0.15
+
+
+def test_priority_context_is_scoped():
+    assert current_priority() == llm_scheduler.PRIORITY_DEFAULT
+    with llm_priority(PRIORITY_BULK):
+        assert current_priority() == PRIORITY_BULK
+    assert current_priority() == llm_scheduler.PRIORITY_DEFAULT
+
+
+def test_waiters_are_admitted_in_priority_order(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL_RATE_LIMITS", "model=60:0")
+    scheduler = LLMScheduler()
+    queue = scheduler._queue("model")
+    queue.requests.tokens = 0
+    order = []
+
+    def call(priority, name):
+        scheduler.acquire("model", 1, priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=call, args=(PRIORITY_BULK, "bulk"))]
+    threads[0].start()
+    time.sleep(0.05)
+    threads.append(threading.Thread(target=call, args=(PRIORITY_INTERACTIVE, "interactive")))
+    threads[1].start()
+    time.sleep(0.05)
+    with scheduler._condition:
+        queue.requests.tokens = 2
+        scheduler._notify()
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["interactive", "bulk"]
+
+
+def test_queued_threads_wait_without_polling(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL_RATE_LIMITS", "model=60:0")
+    scheduler = LLMScheduler()
+    scheduler._queue("model").requests.tokens = 0
+    checks = []
+    try_admit = scheduler._try_admit
+    monkeypatch.setattr(scheduler, "_try_admit", lambda *args: checks.append(args[1]) or try_admit(*args))
+
+    head = threading.Thread(target=scheduler.acquire, args=("model", 1))
+    head.start()
+    time.sleep(0.02)
+    behind = threading.Thread(target=scheduler.acquire, args=("model", 1))
+    behind.start()
+    time.sleep(0.3)
+
+    # The ticket behind the head checked once and is asleep until the head moves
+    tickets = sorted(set(checks))
+    assert checks.count(tickets[1]) == 1
+    with scheduler._condition:
+        scheduler._queue("model").requests.tokens = 2
+        scheduler._notify()
+    head.join(5)
+    behind.join(5)
+    assert not behind.is_alive()
+
+
+def test_async_waiters_are_woken(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL_RATE_LIMITS", "model=60:0")
+    scheduler = LLMScheduler()
+    scheduler._queue("model").requests.tokens = 1
+
+    async def main():
+        first = asyncio.create_task(scheduler.aacquire("model", 1))
+        second = asyncio.create_task(scheduler.aacquire("model", 1))
+        await first
+        await asyncio.sleep(0.05)
+        assert not second.done()
+        with scheduler._condition:
+            scheduler._queue("model").requests.tokens = 1
+            scheduler._notify()
+        await asyncio.wait_for(second, 1)
+
+    asyncio.run(main())
+    assert scheduler._async_waiters == set()
+
+
+def test_cancelled_waiter_leaves_the_queue(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL_RATE_LIMITS", "model=60:0")
+    scheduler = LLMScheduler()
+    scheduler._queue("model").requests.tokens = 0
+
+    async def main():
+        waiter = asyncio.create_task(scheduler.aacquire("model", 1))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(main())
+    assert sum(scheduler.stats()["model"]["queue_depth"].values()) == 0
+
+
+def test_rate_limited_call_is_retried_and_logged(scheduler, caplog):
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RateLimited("slow down")
+        return "ok"
+
+    with caplog.at_level(logging.WARNING, logger="src.utils.llm_scheduler"):
+        assert scheduler.call("model", flaky, tokens=1) == "ok"
+
+    assert len(attempts) == 3
+    assert scheduler.stats()["model"]["throttled"] == 2
+    assert len([record for record in caplog.records if "retrying" in record.getMessage()]) == 2
+
+
+def test_client_errors_are_not_retried(scheduler):
+    attempts = []
+
+    def bad():
+        attempts.append(1)
+        raise BadRequest("invalid")
+
+    with pytest.raises(BadRequest):
+        scheduler.call("model", bad, tokens=1)
+    assert len(attempts) == 1
+
+
+def test_retries_give_up_after_max(scheduler):
+    scheduler.max_retries = 2
+
+    async def always_limited():
+        raise RateLimited("slow down")
+
+    with pytest.raises(RateLimited):
+        asyncio.run(scheduler.acall("model", always_limited, tokens=1))
+    assert scheduler.stats()["model"]["retries"] == 2
+
+
+def test_deadline_stops_admission_waits(monkeypatch):
+    monkeypatch.setenv("LLM_MODEL_RATE_LIMITS", "model=60:0")
+    scheduler = LLMScheduler()
+    scheduler._queue("model").requests.tokens = 0
+
+    started = time.monotonic()
+    with llm_deadline(0.1):
+        with pytest.raises(TimeoutError):
+            scheduler.acquire("model", 1)
+
+        async def main():
+            with pytest.raises(TimeoutError):
+                await scheduler.aacquire("model", 1)
+
+        asyncio.run(main())
+
+    assert time.monotonic() - started < 0.5
+    assert sum(scheduler.stats()["model"]["queue_depth"].values()) == 0
+
+
+def test_nested_deadline_keeps_the_earlier_one():
+    assert remaining_time() is None
+    with llm_deadline(0.5):
+        with llm_deadline(10):
+            assert remaining_time() <= 0.5
+    assert remaining_time() is None
@@ -0,0 +1,106 @@
+"""Tests for batched multi-criteria scoring."""
+
+import json
+
+import pytest
+
+from src.utils import llm
+from src.utils.llm import LLMClient
+
+
+class FakeScorer:
+    """Stands in for structured_prompt and the single-criterion fallback."""
+
+    def __init__(self, responses, fallback=5):
+        self.responses = list(responses)
+        self.fallback = fallback
+        self.prompts = []
+        self.rescored = []
+
+    def structured_prompt(self, system_prompt, user_prompt, model_name=None, use_cache=True):
+        self.prompts.append(user_prompt)
+        return self.responses.pop(0)
+
+    def analyze_text_with_score(self, text, criteria, scale="0-20", model_name=None):
+        self.rescored.append((text, criteria))
+        return self.fallback
+
+
+@pytest.fixture
+def client():
+    return LLMClient()
+
+
+def use(client, monkeypatch, scorer):
+    monkeypatch.setattr(client, "structured_prompt", scorer.structured_prompt)
+    monkeypatch.setattr(client, "analyze_text_with_score", scorer.analyze_text_with_score)
+    return scorer
+
+
+def test_pairs_share_one_request(client, monkeypatch):
+    scorer = use(client, monkeypatch, FakeScorer([
+        {"0": {"empathy": 12, "confidence": 15}, "1": {"professionalism": 17}}
+    ]))
+
+    results = client.analyze_texts_with_scores([("first", ["empathy", "confidence"]), ("second", ["professionalism"])])
+
+    assert results == [{"empathy": 12, "confidence": 15}, {"professionalism": 17}]
+    assert len(scorer.prompts) == 1
+    assert scorer.rescored == []
+
+
+def test_prompt_budget_splits_requests(client, monkeypatch):
+    monkeypatch.setattr(llm, "BATCH_SCORE_MAX_PROMPT_CHARS", len(client._batch_score_system_prompt("0-20")) + 300)
+    scorer = use(client, monkeypatch, FakeScorer([{"0": {"clarity": 10}}] * 3))
+
+    results = client.analyze_texts_with_scores([("x" * 200, ["clarity"])] * 3)
+
+    # Each text fits the budget on its own but no two fit together
+    assert len(scorer.prompts) == 3
+    assert all(prompt.startswith("Text 0\n") for prompt in scorer.prompts)
+    assert results == [{"clarity": 10}] * 3
+
+
+def test_oversized_text_still_gets_a_request(client, monkeypatch):
+    monkeypatch.setattr(llm, "BATCH_SCORE_MAX_PROMPT_CHARS", 10)
+    scorer = use(client, monkeypatch, FakeScorer([{"0": {"clarity": 10}}]))
+
+    assert client.analyze_texts_with_scores([("a long answer", ["clarity"])]) == [{"clarity": 10}]
+    assert len(scorer.prompts) == 1
+
+
+def test_scores_are_clamped_to_the_scale(client, monkeypatch):
+    use(client, monkeypatch, FakeScorer([{"0": {"empathy": 35, "confidence": -4, "clarity": "12.6"}}]))
+
+    scores = client.analyze_text_with_scores("answer", ["empathy", "confidence", "clarity"])
+
+    assert scores == {"empathy": 20, "confidence": 0, "clarity": 13}
+
+
+def test_criterion_names_match_loosely(client, monkeypatch):
+    use(client, monkeypatch, FakeScorer([{"0": {" Empathy ": 9}}]))
+
+    assert client.analyze_text_with_scores("answer", ["empathy"]) == {"empathy": 9}
+
+
+def test_missing_criterion_is_rescored(client, monkeypatch):
+    scorer = use(client, monkeypatch, FakeScorer([{"0": {"empathy": 12}, "1": "not an object"}], fallback=7))
+
+    results = client.analyze_texts_with_scores([("first", ["empathy", "confidence"]), ("second", ["clarity"])])
+
+    assert results == [{"empathy": 12, "confidence": 7}, {"clarity": 7}]
+    assert scorer.rescored == [("first", "confidence"), ("second", "clarity")]
+
+
+@pytest.mark.parametrize("value", ["Infinity", "-Infinity", "NaN"])
+def test_non_finite_scores_are_rescored(client, monkeypatch, value):
+    response = json.loads('{"0": {"empathy": %s}}' % value)
+    scorer = use(client, monkeypatch, FakeScorer([response], fallback=11))
+
+    assert client.analyze_text_with_scores("answer", ["empathy"]) == {"empathy": 11}
+    assert scorer.rescored == [("answer", "empathy")]
+
+
+def test_invalid_scale_is_rejected(client):
+    with pytest.raises(ValueError):
+        client._parse_scale("low to high")
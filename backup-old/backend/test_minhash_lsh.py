@@ -0,0 +1,99 @@
+"""Tests for MinHash signatures and the banded LSH job index."""
+
+import numpy as np
+
+from src.utils import minhash_lsh
+from src.utils.minhash_lsh import MinHashLSH, NUM_PERM, shingles, signature
+
+JOB = (
+    "We are hiring a senior backend engineer to design and build Python services, "
+    "own our PostgreSQL data model, review code, mentor junior engineers and work "
+    "with product managers on the roadmap for the payments platform in Berlin."
+)
+
+
+def jaccard(a, b):
+    a, b = shingles(a), shingles(b)
+    return len(a & b) / len(a | b)
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert shingles("Build Python APIs.") == shingles("build, python apis")
+    assert len(shingles("one two three four")) == 2
+    assert len(shingles("short")) == 1
+    assert shingles("") == set()
+
+
+def test_signature_is_deterministic():
+    assert np.array_equal(signature(JOB), signature(JOB))
+    assert signature(JOB).shape == (NUM_PERM,)
+    assert np.all(signature("") == np.iinfo(np.uint64).max)
+
+
+def test_signature_estimates_jaccard():
+    other = JOB.replace("Berlin", "Munich").replace("mentor junior engineers", "lead a small team")
+    estimate = float(np.mean(signature(JOB) == signature(other)))
+    assert abs(estimate - jaccard(JOB, other)) < 0.15
+
+
+def test_near_duplicate_is_found():
+    index = MinHashLSH(threshold=0.8)
+    index.add("berlin", JOB)
+    index.add("chef", "Pastry chef for a busy restaurant kitchen, early shifts, weekends")
+
+    matches = index.query(JOB.replace("Berlin", "Munich"))
+    assert [key for key, _ in matches] == ["berlin"]
+    assert matches[0][1] >= 0.8
+
+
+def test_unrelated_text_is_not_found():
+    index = MinHashLSH(threshold=0.5)
+    index.add("berlin", JOB)
+    assert index.query("Pastry chef for a busy restaurant kitchen, early shifts, weekends") == []
+
+
+def test_results_are_sorted_and_exclude_the_query_key():
+    index = MinHashLSH(threshold=0.3)
+    index.add("same", JOB)
+    index.add("close", JOB.replace("Berlin", "Munich"))
+
+    matches = index.query(JOB)
+    assert [key for key, _ in matches] == ["same", "close"]
+    assert matches[0][1] == 1.0 > matches[1][1]
+    assert [key for key, _ in index.query(JOB, exclude="same")] == ["close"]
+
+
+def test_replace_and_remove_update_the_buckets():
+    index = MinHashLSH(threshold=0.8)
+    index.add("job", JOB)
+    index.add("job", "Pastry chef for a busy restaurant kitchen")
+    assert len(index) == 1
+    assert index.query(JOB) == []
+
+    index.remove("job")
+    index.remove("job")
+    assert len(index) == 0
+    assert all(not buckets for buckets in index._buckets)
+
+
+def test_job_index_is_loaded_once(monkeypatch):
+    monkeypatch.setattr(minhash_lsh, "_job_index", None)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return [("berlin", JOB)]
+
+    index = minhash_lsh.get_job_index(loader)
+    assert minhash_lsh.get_job_index(loader) is index
+    assert len(index) == 1
+    assert calls == [1]
+
+
+def test_failed_load_leaves_an_empty_index(monkeypatch):
+    monkeypatch.setattr(minhash_lsh, "_job_index", None)
+
+    def loader():
+        raise RuntimeError("database down")
+
+    assert len(minhash_lsh.get_job_index(loader)) == 0
@@ -0,0 +1,126 @@
+"""Tests for the local OpenRouter-compatible stand-in server."""
+
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from src.utils.openrouter_standin import LatencyDistribution, StandinConfig, start_server
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(config):
+        server = start_server(config)
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}/api/v1", server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def post(base_url, body):
+    request = urllib.request.Request(
+        f"{base_url}/chat/completions",
+        data=json.dumps(body).encode(),
+        headers={"Content-Type": "application/json"}
+    )
+    return urllib.request.urlopen(request, timeout=5)
+
+
+def chat(prompt, **extra):
+    return {"model": "standin", "messages": [{"role": "user", "content": prompt}], **extra}
+
+
+def test_latency_specs_are_parsed():
+    assert LatencyDistribution.parse("fixed:0.5").sample() == 0.5
+    assert 0.2 <= LatencyDistribution.parse("uniform:0.2:0.3").sample() <= 0.3
+    assert LatencyDistribution.parse("normal:-5:0.1").sample() == 0.0
+    with pytest.raises(ValueError):
+        LatencyDistribution.parse("pareto:1").sample()
+
+
+def test_model_overrides_fall_back_to_defaults():
+    config = StandinConfig(error_429=0.1, models={"slow": {"error_429": 0.5}})
+
+    assert config.for_model("slow", "error_429") == 0.5
+    assert config.for_model("other", "error_429") == 0.1
+
+
+def test_config_file_parses_latency(tmp_path):
+    path = tmp_path / "standin.json"
+    path.write_text(json.dumps({"latency": "fixed:0.25", "models": {"slow": {"latency": "fixed:1"}}}))
+
+    config = StandinConfig.from_file(str(path))
+    assert config.latency.sample() == 0.25
+    assert config.for_model("slow", "latency").sample() == 1.0
+
+
+def test_scripted_completion(serve):
+    base_url, server = serve(StandinConfig(script=[{"match": "ping", "response": "pong from {model}"}]))
+
+    with post(base_url, chat("ping")) as response:
+        body = json.load(response)
+
+    assert body["choices"][0]["message"]["content"] == "pong from standin"
+    assert body["usage"]["completion_tokens"] == 3
+    assert server.counters["requests"] == 1
+
+
+def test_max_tokens_truncates(serve):
+    base_url, _ = serve(StandinConfig(script=[{"match": "", "response": "one two three four"}]))
+
+    with post(base_url, chat("anything", max_tokens=2)) as response:
+        assert json.load(response)["choices"][0]["message"]["content"] == "one two "
+
+
+def test_streamed_completion(serve):
+    base_url, server = serve(StandinConfig(script=[{"match": "", "response": "one two three"}]))
+
+    with post(base_url, chat("anything", stream=True)) as response:
+        lines = [line.decode().strip() for line in response if line.strip()]
+
+    assert lines[-1] == "data: [DONE]"
+    chunks = [json.loads(line[len("data: "):]) for line in lines[:-1]]
+    assert "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks) == "one two three"
+    assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+    assert server.counters["streamed"] == 1
+
+
+def test_injected_errors(serve):
+    base_url, server = serve(StandinConfig(error_429=1.0, retry_after=2, models={"flaky": {"error_429": 0.0, "error_500": 1.0}}))
+
+    with pytest.raises(urllib.error.HTTPError) as rate_limited:
+        post(base_url, chat("anything"))
+    assert rate_limited.value.code == 429
+    assert rate_limited.value.headers["Retry-After"] == "2"
+
+    with pytest.raises(urllib.error.HTTPError) as failed:
+        post(base_url, {**chat("anything"), "model": "flaky"})
+    assert failed.value.code == 500
+    assert server.counters["injected_429"] == 1
+    assert server.counters["injected_500"] == 1
+
+
+def test_default_responses_match_agent_prompts(serve):
+    base_url, _ = serve(StandinConfig())
+
+    with post(base_url, chat("Generate 5 interview questions for this job")) as response:
+        questions = json.loads(json.load(response)["choices"][0]["message"]["content"])
+    assert len(questions) == 5
+    assert {"question", "type", "skill_assessed"} <= set(questions[0])
+
+
+def test_unknown_paths_are_not_found(serve):
+    base_url, _ = serve(StandinConfig())
+
+    with urllib.request.urlopen(f"{base_url}/health", timeout=5) as response:
+        assert json.load(response) == {"status": "ok"}
+    with pytest.raises(urllib.error.HTTPError) as missing:
+        urllib.request.urlopen(f"{base_url}/embeddings", timeout=5)
+    assert missing.value.code == 404
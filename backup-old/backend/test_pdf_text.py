@@ -0,0 +1,99 @@
+"""Tests for budgeted, page-by-page PDF text extraction."""
+
+import io
+
+from pypdf import PdfReader, PdfWriter
+
+from src.utils.pdf_text import extract_pdf_text, iter_pdf_pages
+
+LINE = "Senior Python engineer building data pipelines"
+
+
+def text_page(*lines):
+    """A one-page PDF that draws each line of text in Helvetica."""
+    text = "".join(f"({line}) Tj 0 -16 Td " for line in lines)
+    stream = f"BT /F1 12 Tf 72 720 Td {text}ET".encode("latin-1")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+def make_pdf(*pages):
+    """Combine pages into one PDF; None adds a blank page with no fonts, like a scan."""
+    writer = PdfWriter()
+    for page in pages:
+        if page is None:
+            writer.add_blank_page(612, 792)
+        else:
+            writer.add_page(PdfReader(io.BytesIO(page)).pages[0])
+    output = io.BytesIO()
+    writer.write(output)
+    output.seek(0)
+    return output
+
+
+def test_extracts_text_from_every_page():
+    result = extract_pdf_text(make_pdf(text_page(LINE), text_page("Led a team of five engineers")))
+
+    assert LINE in result["text"]
+    assert "Led a team of five engineers" in result["text"]
+    assert result["page_count"] == 2
+    assert [page["page"] for page in result["pages"]] == [1, 2]
+    assert not result["truncated"]
+
+
+def test_page_without_fonts_is_skipped():
+    pages = list(iter_pdf_pages(make_pdf(None, text_page(LINE))))
+
+    assert pages[0].skipped == "no_text_layer"
+    assert pages[0].text == ""
+    assert pages[1].skipped is None
+    assert LINE in pages[1].text
+
+
+def test_page_with_too_little_text_counts_as_empty():
+    pages = list(iter_pdf_pages(make_pdf(text_page("Hi"), text_page(LINE))))
+
+    assert pages[0].skipped == "empty"
+    assert pages[1].skipped is None
+
+
+def test_page_budget_stops_reading():
+    result = extract_pdf_text(make_pdf(text_page(LINE), text_page(LINE), text_page(LINE)), max_pages=2)
+
+    assert len(result["pages"]) == 2
+    assert result["page_count"] == 3
+    assert result["truncated"]
+
+
+def test_character_budget_truncates_and_stops():
+    result = extract_pdf_text(make_pdf(text_page(LINE), text_page(LINE)), max_chars=20)
+
+    assert len(result["text"]) == 20
+    assert result["text"] == LINE[:20]
+    # The second page is never read once the budget is spent
+    assert len(result["pages"]) == 1
+    assert result["truncated"]
+
+
+def test_iteration_is_lazy():
+    pages = iter_pdf_pages(make_pdf(text_page(LINE), text_page(LINE)))
+
+    first = next(pages)
+    assert first.number == 1
+    assert set(first.stats()) == {"page", "chars", "seconds", "skipped"}
+    assert next(pages).number == 2
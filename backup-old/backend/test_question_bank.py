@@ -0,0 +1,142 @@
+"""Tests for per-job question banks, sampling and regeneration."""
+
+import gc
+
+import pytest
+
+from src.agents.question_generator import FALLBACK_QUESTIONS, QuestionGeneratorAgent
+from src.services import interview_manager
+from src.services.interview_manager import InterviewManager
+from src.utils.database import SupabaseClient
+from src.utils.minhash_lsh import MinHashLSH
+
+
+def make_bank(technical, behavioral):
+    return (
+        [{"question": f"Technical {index}?", "type": "technical", "skill_assessed": "python"} for index in range(technical)]
+        + [{"question": f"Behavioral {index}?", "type": "behavioral", "skill_assessed": "teamwork"} for index in range(behavioral)]
+    )
+
+
+class FakeQuestionGenerator:
+    question_bank_hash = QuestionGeneratorAgent.question_bank_hash
+
+    def __init__(self, questions):
+        self.questions = questions
+        self.generations = 0
+
+    def stream_questions(self, job_description, required_skills=None, count=5):
+        self.generations += 1
+        return iter([dict(question) for question in self.questions[:count]])
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    return SupabaseClient()
+
+
+@pytest.fixture
+def job(db):
+    return db.create_job_description("default", "Backend Engineer", "Build APIs in Python.", required_skills=["Python"])
+
+
+@pytest.fixture
+def sampling(monkeypatch):
+    monkeypatch.setattr(interview_manager, "QUESTION_BANK_SIZE", 10)
+    monkeypatch.setattr(interview_manager, "QUESTIONS_PER_INTERVIEW", 5)
+
+
+def make_manager(db, generator):
+    manager = object.__new__(InterviewManager)
+    manager.db = db
+    manager.question_generator = generator
+    manager.job_index = MinHashLSH()
+    return manager
+
+
+def test_sample_is_seeded_by_interview(db, sampling):
+    manager = make_manager(db, None)
+    bank = make_bank(6, 4)
+
+    first = manager.select_questions(bank, "interview-1")
+    assert manager.select_questions(bank, "interview-1") == first
+    assert len(first) == 5
+    samples = {tuple(q["question"] for q in manager.select_questions(bank, f"interview-{index}")) for index in range(20)}
+    assert len(samples) > 1
+
+
+def test_sample_keeps_type_mix_and_bank_order(db, sampling):
+    manager = make_manager(db, None)
+    bank = make_bank(6, 4)
+
+    for index in range(20):
+        sample = manager.select_questions(bank, f"interview-{index}")
+        assert [q["type"] for q in sample].count("technical") == 3
+        assert [q["type"] for q in sample].count("behavioral") == 2
+        assert sample == sorted(sample, key=bank.index)
+
+
+def test_small_bank_is_asked_whole(db):
+    bank = make_bank(3, 2)
+    assert make_manager(db, None).select_questions(bank, "interview-1") == bank
+
+
+def test_bank_hash_ignores_cosmetic_changes():
+    generator = FakeQuestionGenerator([])
+    assert generator.question_bank_hash("Build  APIs", ["Python", "SQL"]) == generator.question_bank_hash("build apis", ["sql", "python"])
+    assert generator.question_bank_hash("Build APIs", ["Python"]) != generator.question_bank_hash("Build APIs", ["Go"])
+
+
+def test_bank_is_generated_once(db, job, sampling):
+    generator = FakeQuestionGenerator(make_bank(6, 4))
+    manager = make_manager(db, generator)
+
+    bank = manager.get_question_bank(dict(job))
+    assert len(bank) == 10
+    assert manager.get_question_bank(db.get_job_description(job["id"])) == bank
+    assert generator.generations == 1
+
+
+def test_bank_is_regenerated_when_skills_change(db, job):
+    generator = FakeQuestionGenerator(make_bank(3, 2))
+    manager = make_manager(db, generator)
+    manager.get_question_bank(dict(job))
+
+    db.update_job_description(job["id"], required_skills=["Go"])
+    manager.get_question_bank(db.get_job_description(job["id"]))
+
+    assert generator.generations == 2
+
+
+def test_refresh_regenerates_a_current_bank(db, job):
+    generator = FakeQuestionGenerator(make_bank(3, 2))
+    manager = make_manager(db, generator)
+    manager.get_question_bank(dict(job))
+
+    generator.questions = make_bank(2, 3)
+    bank = manager.get_question_bank(db.get_job_description(job["id"]), refresh=True)
+
+    assert generator.generations == 2
+    assert bank == make_bank(2, 3)
+    assert manager.get_question_bank(db.get_job_description(job["id"])) == bank
+
+
+def test_fallback_questions_are_not_stored(db, job):
+    generator = FakeQuestionGenerator(FALLBACK_QUESTIONS)
+    manager = make_manager(db, generator)
+
+    assert manager.get_question_bank(dict(job)) == FALLBACK_QUESTIONS
+    stored = db.get_job_description(job["id"])
+    assert not stored.get("question_bank")
+    assert not stored.get("question_bank_hash")
+
+    manager.get_question_bank(stored)
+    assert generator.generations == 2
+
+
+def test_job_locks_are_released(db, job):
+    make_manager(db, FakeQuestionGenerator(make_bank(3, 2))).get_question_bank(dict(job))
+    gc.collect()
+
+    assert job["id"] not in interview_manager._question_bank_locks
@@ -0,0 +1,174 @@
+"""Tests for per-job candidate rankings."""
+
+import threading
+import time
+
+import pytest
+
+from src.services import ranking_service
+from src.services.ranking_service import METRIC_ASSESSMENT, METRIC_CORRELATION, RankingService, SortedScores
+from src.utils.database import SupabaseClient
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    return SupabaseClient()
+
+
+@pytest.fixture
+def job(db):
+    return db.create_job_description("default", "Backend Engineer", "Build APIs in Python.")
+
+
+def test_sorted_scores_rank_highest_first():
+    scores = SortedScores()
+    for candidate_id, score in [("a", 50), ("b", 90), ("c", 70)]:
+        scores.update(candidate_id, score)
+
+    assert scores.page(0, 10) == [(1, "b", 90), (2, "c", 70), (3, "a", 50)]
+    assert scores.page(1, 1) == [(2, "c", 70)]
+    assert scores.rank_of("a") == 3
+    assert scores.rank_of("missing") is None
+
+
+def test_sorted_scores_ties_keep_insertion_order():
+    scores = SortedScores()
+    for candidate_id in ["a", "b", "c"]:
+        scores.update(candidate_id, 80)
+
+    assert [candidate_id for _, candidate_id, _ in scores.page(0, 3)] == ["a", "b", "c"]
+    assert scores.rank_of("c") == 3
+
+
+def test_sorted_scores_update_and_remove():
+    scores = SortedScores()
+    scores.update("a", 50)
+    scores.update("b", 60)
+    scores.update("a", 70)
+
+    assert scores.rank_of("a") == 1
+    assert len(scores) == 2
+    scores.remove("a")
+    scores.remove("a")
+    assert scores.page(0, 10) == [(1, "b", 60)]
+
+
+def test_ranking_reports_both_scores(db, job):
+    service = RankingService(db)
+    service.record_score(job["id"], "c1", METRIC_CORRELATION, 80)
+    service.record_score(job["id"], "c2", METRIC_CORRELATION, 90)
+    service.record_score(job["id"], "c1", METRIC_ASSESSMENT, 70)
+
+    ranking = service.get_ranking(job["id"], METRIC_CORRELATION)
+    assert ranking["total"] == 2
+    assert ranking["candidates"][0] == {"rank": 1, "candidate_id": "c2", "correlation_score": 90, "assessment_score": None}
+    assert ranking["candidates"][1]["assessment_score"] == 70
+
+
+def test_scores_survive_a_new_service(db, job):
+    RankingService(db).record_score(job["id"], "c1", METRIC_CORRELATION, 80)
+    RankingService(db).record_score(job["id"], "c2", METRIC_CORRELATION, 90)
+
+    # A restarted process (or another worker) loads the stored scores
+    ranking = RankingService(db).get_ranking(job["id"])
+    assert [entry["candidate_id"] for entry in ranking["candidates"]] == ["c2", "c1"]
+
+
+def test_stale_ranking_is_reloaded(db, job, monkeypatch):
+    reader = RankingService(db)
+    RankingService(db).record_score(job["id"], "c1", METRIC_CORRELATION, 80)
+    assert reader.get_ranking(job["id"])["total"] == 1
+
+    RankingService(db).record_score(job["id"], "c2", METRIC_CORRELATION, 90)
+    assert reader.get_ranking(job["id"])["total"] == 1
+
+    monkeypatch.setattr(ranking_service, "RANKING_RELOAD_SECONDS", 0)
+    assert reader.get_ranking(job["id"])["total"] == 2
+
+
+def test_reads_do_not_create_entries(db, job):
+    service = RankingService(db)
+
+    assert service.get_ranking("unknown-job")["total"] == 0
+    assert service.get_rank("unknown-job", "c1") is None
+    assert service._jobs == {}
+    assert service._loaded_at == {}
+
+
+def test_removed_candidate_stays_removed(db, job):
+    service = RankingService(db)
+    service.record_score(job["id"], "c1", METRIC_CORRELATION, 80)
+    service.record_score(job["id"], "c1", METRIC_ASSESSMENT, 60)
+    service.remove_candidate(job["id"], "c1")
+
+    assert service.get_rank(job["id"], "c1") is None
+    assert RankingService(db).get_ranking(job["id"])["total"] == 0
+
+
+def test_unknown_metric_is_rejected(db, job):
+    with pytest.raises(ValueError):
+        RankingService(db).record_score(job["id"], "c1", "salary", 1)
+
+
+def test_ranking_of_unknown_job_is_404(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    monkeypatch.setenv("OPENROUTER_API_KEY", "test-key")
+    from fastapi.testclient import TestClient
+    from src.api.app import app
+
+    assert TestClient(app).get("/jobs/unknown-job/ranking").status_code == 404
+
+
+class SlowScores:
+    """Wraps the database so list_candidate_scores blocks until released."""
+
+    def __init__(self, db):
+        self.db = db
+        self.fetching = threading.Event()
+        self.release = threading.Event()
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    def list_candidate_scores(self, job_id):
+        rows = self.db.list_candidate_scores(job_id)
+        self.fetching.set()
+        self.release.wait(5)
+        return rows
+
+
+def test_reload_does_not_block_other_jobs(db, job):
+    other = db.create_job_description("default", "Data Engineer", "Build pipelines.")
+    RankingService(db).record_score(other["id"], "c2", METRIC_CORRELATION, 70)
+    slow = SlowScores(db)
+    service = RankingService(slow)
+    slow.release.set()
+    assert service.get_ranking(other["id"])["total"] == 1
+    slow.release.clear()
+
+    reload = threading.Thread(target=service.get_ranking, args=(job["id"],))
+    slow.fetching.clear()
+    reload.start()
+    assert slow.fetching.wait(5)
+
+    began = time.monotonic()
+    assert service.get_rank(other["id"], "c2") == 1
+    assert time.monotonic() - began < 1
+    slow.release.set()
+    reload.join(5)
+
+
+def test_write_during_reload_is_kept(db, job):
+    slow = SlowScores(db)
+    service = RankingService(slow)
+    reload = threading.Thread(target=service.get_ranking, args=(job["id"],))
+    reload.start()
+    assert slow.fetching.wait(5)
+
+    # Stored after the fetch read the table, so the fetched rows miss it
+    service.record_score(job["id"], "c1", METRIC_CORRELATION, 80)
+    slow.release.set()
+    reload.join(5)
+
+    assert service.get_rank(job["id"], "c1") == 1
@@ -0,0 +1,118 @@
+"""Tests for content-hash deduplication of resume uploads."""
+
+import pytest
+
+from src.services.interview_manager import InterviewManager
+from src.utils.database import SupabaseClient
+from src.utils.lexical_index import LexicalIndex
+from src.utils.resume_dedup import ResumeDedupIndex, has_resume_content, text_hash
+
+PARSED = {"skills": ["Python"], "experience": [{"title": "Engineer"}], "education": []}
+EMPTY = {"skills": [], "experience": [], "education": []}
+
+
+class FakeResumeAnalyzer:
+    def __init__(self, extractions):
+        self.extractions = list(extractions)
+        self.parsed = 0
+        self.extracted = 0
+        self.resume_index = LexicalIndex()
+
+    def parse_pdf_resume(self, path):
+        self.parsed += 1
+        return "Jane Doe\nPython engineer"
+
+    def extract_resume_data(self, text):
+        self.extracted += 1
+        return self.extractions.pop(0)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("USE_MOCK_DATA", "true")
+    return SupabaseClient()
+
+
+def make_manager(db, extractions):
+    manager = object.__new__(InterviewManager)
+    manager.db = db
+    manager.dedup = ResumeDedupIndex(db)
+    manager.resume_analyzer = FakeResumeAnalyzer(extractions)
+    return manager
+
+
+def test_text_hash_ignores_case_and_whitespace():
+    assert text_hash("Jane  Doe\nPython") == text_hash("jane doe python")
+    assert text_hash("Jane Doe") != text_hash("John Doe")
+
+
+def test_empty_extraction_has_no_content():
+    assert not has_resume_content(EMPTY)
+    assert not has_resume_content(None)
+    assert has_resume_content(PARSED)
+
+
+def test_identical_file_skips_parsing_and_extraction(db):
+    manager = make_manager(db, [PARSED])
+    first = db.create_candidate("Jane", "jane@example.com")["id"]
+    second = db.create_candidate("Jane Again", "jane2@example.com")["id"]
+
+    manager.upload_and_parse_resume(first, b"%PDF resume", "resume.pdf")
+    result = manager.upload_and_parse_resume(second, b"%PDF resume", "resume.pdf")
+
+    assert result["dedup"] == "file"
+    assert result["resume_data"] == PARSED
+    assert manager.resume_analyzer.parsed == 1
+    assert manager.resume_analyzer.extracted == 1
+
+
+def test_file_hit_stores_its_own_copy(db):
+    manager = make_manager(db, [PARSED])
+    first = db.create_candidate("Jane", "jane@example.com")["id"]
+    second = db.create_candidate("Jane Again", "jane2@example.com")["id"]
+
+    original = manager.upload_and_parse_resume(first, b"%PDF resume", "resume.pdf")
+    copy = manager.upload_and_parse_resume(second, b"%PDF resume", "resume.pdf")
+
+    assert copy["resume_url"] != original["resume_url"]
+    assert f"/{second}/" in copy["resume_url"]
+    assert db.get_candidate(second)["resume_url"] == copy["resume_url"]
+
+
+def test_same_text_skips_extraction(db):
+    manager = make_manager(db, [PARSED])
+    first = db.create_candidate("Jane", "jane@example.com")["id"]
+    second = db.create_candidate("Jane Again", "jane2@example.com")["id"]
+
+    manager.upload_and_parse_resume(first, b"%PDF export one", "resume.pdf")
+    result = manager.upload_and_parse_resume(second, b"%PDF export two", "resume.pdf")
+
+    assert result["dedup"] == "text"
+    assert manager.resume_analyzer.parsed == 2
+    assert manager.resume_analyzer.extracted == 1
+
+
+def test_failed_extraction_is_not_reused(db):
+    manager = make_manager(db, [EMPTY, PARSED])
+    first = db.create_candidate("Jane", "jane@example.com")["id"]
+    second = db.create_candidate("Jane Again", "jane2@example.com")["id"]
+
+    manager.upload_and_parse_resume(first, b"%PDF resume", "resume.pdf")
+    stored = db.get_candidate(first)
+    assert stored["resume_sha256"] is None
+    assert stored["resume_text_sha256"] is None
+
+    result = manager.upload_and_parse_resume(second, b"%PDF resume", "resume.pdf")
+    assert result["dedup"] is None
+    assert result["resume_data"] == PARSED
+    assert manager.resume_analyzer.extracted == 2
+
+
+def test_index_skips_candidates_with_empty_data(db):
+    candidate = db.create_candidate("Jane", "jane@example.com")["id"]
+    # A row written before failed extractions were kept out of the index
+    db.update_candidate_resume(candidate, "https://example.com/r.pdf", EMPTY, "abc", "def")
+
+    index = ResumeDedupIndex(db)
+    assert index.find_by_file("abc") is None
+    assert index.find_by_text("def") is None
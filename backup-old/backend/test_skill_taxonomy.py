@@ -0,0 +1,109 @@
+"""Tests for the skill taxonomy and local skill matching."""
+
+import json
+
+import pytest
+
+from src.utils import skill_taxonomy
+from src.utils.skill_taxonomy import SKILL_MATCH_SCORE, SkillTaxonomy, normalize_skill
+
+
+@pytest.fixture
+def taxonomy():
+    return SkillTaxonomy()
+
+
+def test_normalize_skill():
+    assert normalize_skill("  Node.JS ") == "node.js"
+    assert normalize_skill("C++ / C#") == "c++ c#"
+
+
+@pytest.mark.parametrize("name, canonical", [
+    ("golang", "Go"),
+    ("K8s", "Kubernetes"),
+    ("Python Programming", "Python"),
+    ("Front End Development", "Front-end Development"),
+    ("node.js", "Node.js"),
+    ("C#", "C#"),
+    (".NET Core", ".NET"),
+    ("Underwater Basket Weaving", None),
+    ("", None),
+])
+def test_canonical_resolves_aliases_and_suffixes(taxonomy, name, canonical):
+    assert taxonomy.canonical(name) == canonical
+
+
+def test_scan_prefers_the_longest_match(taxonomy):
+    assert taxonomy.scan("Built Google Cloud Platform services with Spring Boot") == ["Google Cloud", "Spring"]
+
+
+def test_scan_skips_ambiguous_words_in_text(taxonomy):
+    # "go", "r" and "rest" are ordinary words in running text
+    assert taxonomy.scan("Ready to go the extra mile; R and rest") == []
+    assert taxonomy.canonical("Go") == "Go"
+
+
+def test_scan_reports_each_skill_once_in_mention_order(taxonomy):
+    assert taxonomy.scan("Docker, Python, docker, PyTorch and python3") == ["Docker", "Python", "PyTorch"]
+
+
+def test_listed_skills_handles_whole_entries_and_lists(taxonomy):
+    listed = taxonomy.listed_skills({"skills": ["Go", "Python (Django, Flask)", 42]})
+    assert listed == {"Go": "Go", "Python": "Python (Django, Flask)", "Django": "Python (Django, Flask)", "Flask": "Python (Django, Flask)"}
+
+
+def test_match_fields_resolves_listed_skills_only(taxonomy):
+    resume = {"skills": ["golang", "Kubernetes"]}
+    fields = [
+        {"field": "Go Programming", "score": 90},
+        {"field": "Kubernetes", "score": 70},
+        {"field": "Stakeholder Communication", "score": 50},
+        {"field": "Terraform", "score": 40},
+    ]
+    resolved, pending = taxonomy.match_fields(resume, fields)
+
+    assert set(resolved) == {"Go Programming", "Kubernetes"}
+    assert resolved["Go Programming"]["score"] == SKILL_MATCH_SCORE
+    assert resolved["Go Programming"]["evidence"] == 'Lists "golang" as a skill'
+    assert [field["field"] for field in pending] == ["Stakeholder Communication", "Terraform"]
+
+
+def test_match_required_reads_experience(taxonomy):
+    resume = {
+        "skills": ["Python"],
+        "experience": [{"title": "Engineer", "description": "Ran services on AWS with Docker"}],
+        "education": "not a list",
+    }
+    result = taxonomy.match_required(resume, ["python3", "Docker", "Kubernetes", "Underwater Basket Weaving"])
+
+    assert result == {
+        "matched": ["python3", "Docker"],
+        "missing": ["Kubernetes"],
+        "unrecognized": ["Underwater Basket Weaving"],
+    }
+    assert taxonomy.match_required(resume, None) == {"matched": [], "missing": [], "unrecognized": []}
+
+
+def test_custom_skills_extend_the_taxonomy(taxonomy):
+    taxonomy.add("Elixir", ["ex"])
+    assert taxonomy.canonical("ex") == "Elixir"
+    assert taxonomy.scan("Elixir and Phoenix") == ["Elixir"]
+    assert len(SkillTaxonomy({"Elixir": []})) == 1
+
+
+def test_taxonomy_file_is_loaded(monkeypatch, tmp_path):
+    path = tmp_path / "skills.json"
+    path.write_text(json.dumps({"Elixir": ["ex"]}))
+    monkeypatch.setattr(skill_taxonomy, "SKILL_TAXONOMY_PATH", str(path))
+    monkeypatch.setattr(skill_taxonomy, "_taxonomy", None)
+
+    taxonomy = skill_taxonomy.get_skill_taxonomy()
+    assert taxonomy.canonical("ex") == "Elixir"
+    assert taxonomy.canonical("golang") == "Go"
+    assert skill_taxonomy.get_skill_taxonomy() is taxonomy
+
+
+def test_unreadable_taxonomy_file_keeps_the_defaults(monkeypatch, tmp_path):
+    monkeypatch.setattr(skill_taxonomy, "SKILL_TAXONOMY_PATH", str(tmp_path / "missing.json"))
+    monkeypatch.setattr(skill_taxonomy, "_taxonomy", None)
+    assert skill_taxonomy.get_skill_taxonomy().canonical("golang") == "Go"
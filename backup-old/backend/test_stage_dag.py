@@ -0,0 +1,67 @@
+"""Tests for running dependent analysis stages concurrently."""
+
+import time
+
+import pytest
+
+from src.utils.llm_scheduler import PRIORITY_BULK, current_priority, llm_priority
+from src.utils.stage_dag import StageDAG
+
+
+def sleeper(seconds, value):
+    def stage(*args):
+        time.sleep(seconds)
+        return value
+    return stage
+
+
+def test_dependencies_receive_results_in_declared_order():
+    dag = StageDAG()
+    dag.add("a", lambda: 2).add("b", lambda: 3).add("sum", lambda b, a: f"{b}-{a}", depends_on=["b", "a"])
+
+    results, timings = dag.run()
+    assert results == {"a": 2, "b": 3, "sum": "3-2"}
+    assert set(timings["stages"]) == {"a", "b", "sum"}
+
+
+def test_independent_stages_run_concurrently():
+    dag = StageDAG()
+    dag.add("a", sleeper(0.2, 1)).add("b", sleeper(0.2, 2)).add("c", lambda a, b: a + b, depends_on=["a", "b"])
+
+    results, timings = dag.run()
+    assert results["c"] == 3
+    assert timings["total"] < 0.35
+    assert timings["stages"]["c"]["start"] >= 0.2
+
+
+def test_invalid_graphs_are_rejected():
+    dag = StageDAG().add("a", lambda: 1)
+    with pytest.raises(ValueError):
+        dag.add("a", lambda: 2)
+    with pytest.raises(ValueError):
+        dag.add("b", lambda c: c, depends_on=["c"])
+
+
+def test_failure_propagates_and_skips_dependents():
+    calls = []
+
+    def fail():
+        raise RuntimeError("extraction failed")
+
+    dag = StageDAG().add("a", fail).add("b", lambda a: calls.append(a), depends_on=["a"])
+    with pytest.raises(RuntimeError):
+        dag.run()
+    assert calls == []
+
+
+def test_stages_inherit_the_callers_priority():
+    dag = StageDAG().add("priority", current_priority)
+    with llm_priority(PRIORITY_BULK):
+        results, _ = dag.run()
+    assert results["priority"] == PRIORITY_BULK
+
+
+def test_empty_graph():
+    results, timings = StageDAG().run()
+    assert results == {}
+    assert timings["stages"] == {}
@@ -17,6 +17,12 @@ CREATE TABLE IF NOT EXISTS job_descriptions (
   department TEXT,
   required_skills JSONB,
   soft_skills_priorities JSONB,
+  job_fields JSONB,
+  job_fields_hash TEXT,
+  question_bank JSONB,
+  question_bank_hash TEXT,
+  warmup_status TEXT,
+  warmup_started_at TIMESTAMP WITH TIME ZONE,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
@@ -27,9 +33,15 @@ CREATE TABLE IF NOT EXISTS candidates (
   email TEXT UNIQUE NOT NULL,
   resume_url TEXT,
   resume_parsed JSONB,
+  resume_sha256 TEXT,
+  resume_text_sha256 TEXT,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Content-hash lookups for resume deduplication
+CREATE INDEX IF NOT EXISTS candidates_resume_sha256_idx ON candidates (resume_sha256);
+CREATE INDEX IF NOT EXISTS candidates_resume_text_sha256_idx ON candidates (resume_text_sha256);
+
 -- Interviews Table
 CREATE TABLE IF NOT EXISTS interviews (
   id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -76,6 +88,15 @@ CREATE TABLE IF NOT EXISTS assessments (
   created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Candidate Scores Table (ranking scores per job, loaded by the ranking service)
+CREATE TABLE IF NOT EXISTS candidate_scores (
+  job_id UUID REFERENCES job_descriptions(id) ON DELETE CASCADE,
+  candidate_id UUID REFERENCES candidates(id) ON DELETE CASCADE,
+  metric TEXT NOT NULL,
+  score REAL NOT NULL,
+  PRIMARY KEY (job_id, candidate_id, metric)
+);
+
 -- Row Level Security Policies
 ALTER TABLE companies ENABLE ROW LEVEL SECURITY;
 ALTER TABLE job_descriptions ENABLE ROW LEVEL SECURITY;
@@ -84,6 +105,7 @@ ALTER TABLE interviews ENABLE ROW LEVEL SECURITY;
 ALTER TABLE questions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE responses ENABLE ROW LEVEL SECURITY;
 ALTER TABLE assessments ENABLE ROW LEVEL SECURITY;
+ALTER TABLE candidate_scores ENABLE ROW LEVEL SECURITY;
 
 -- Create Storage Bucket for Resume and Audio Files
 -- Note: Execute these directly in Supabase dashboard or API